@@ -0,0 +1,173 @@
+"""
+WanVideo Wakawave Architecture Check
+Identify which Wan variants a LoRA fits from its safetensors header, before any tensor data is read
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from .WanVideoWakawaveLoraIndex import LoraIndex, LoraEntry
+from .WanVideoWakawaveSafetensors import read_safetensors_header, tensor_specs, SafetensorsHeaderError
+
+# Bump when signature detection changes so signatures cached in the index are recomputed
+ARCH_SIGNATURE_VERSION = 1
+
+# Transformer shapes of the Wan releases (hidden size, FFN size, block count) and whether the
+# cross-attention has the extra image key/value projections of Wan 2.1 I2V
+WAN_VARIANTS: Dict[str, Dict[str, Any]] = {
+    "wan2.1_t2v_1.3b": {"dim": 1536, "ffn_dim": 8960, "num_layers": 30, "img_attn": False},
+    "wan2.1_t2v_14b": {"dim": 5120, "ffn_dim": 13824, "num_layers": 40, "img_attn": False},
+    "wan2.1_i2v_14b": {"dim": 5120, "ffn_dim": 13824, "num_layers": 40, "img_attn": True},
+    "wan2.2_ti2v_5b": {"dim": 3072, "ffn_dim": 14336, "num_layers": 30, "img_attn": False},
+    "wan2.2_a14b": {"dim": 5120, "ffn_dim": 13824, "num_layers": 40, "img_attn": False},
+}
+
+# <block>.<layer>.<projection> in diffusers-style ("blocks.3.self_attn.q") and kohya-style ("blocks_3_self_attn_q") names
+_WAN_MODULE_RE = re.compile(
+    r"(?:^|[._])blocks[._](?P<block>\d+)[._](?P<layer>self_attn|cross_attn|ffn)[._]"
+    r"(?P<proj>k_img|v_img|q|k|v|o|0|2)(?=[._])"
+)
+
+# Module names that only appear in LoRAs for other model families
+_FOREIGN_MARKERS = (
+    ("double_blocks", "flux/hunyuan"),
+    ("single_blocks", "flux/hunyuan"),
+    ("single_transformer_blocks", "flux"),
+    ("joint_blocks", "sd3"),
+    ("down_blocks", "sd/sdxl"),
+    ("input_blocks", "sd/sdxl"),
+    ("lora_te", "sd/sdxl"),
+    ("transformer_blocks", "dit (non-wan)"),
+)
+
+_DOWN_RE = re.compile(r"[._](?:lora_down|lora_A|lora\.down)(?:\.[A-Za-z_]+)?\.weight$")
+_UP_RE = re.compile(r"[._](?:lora_up|lora_B|lora\.up)(?:\.[A-Za-z_]+)?\.weight$")
+_DIFF_RE = re.compile(r"\.diff$")
+
+
+def signature_from_header(header: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Architecture signature of a LoRA: model family, the hidden/FFN sizes its
+    projections imply, the blocks it touches, whether it targets Wan 2.1 I2V
+    image-attention layers, and the Wan variants all of that fits.
+    """
+    dims: Dict[str, set] = {"dim": set(), "ffn_dim": set()}
+    max_block = -1
+    img_attn = False
+    wan_tensors = 0
+    foreign = None
+
+    for name, spec in tensor_specs(header).items():
+        match = _WAN_MODULE_RE.search(name)
+        if match is None:
+            if foreign is None:
+                foreign = next((family for marker, family in _FOREIGN_MARKERS if marker in name), None)
+            continue
+        wan_tensors += 1
+        max_block = max(max_block, int(match.group("block")))
+        layer, proj = match.group("layer"), match.group("proj")
+        img_attn = img_attn or proj in ("k_img", "v_img")
+
+        shape = [int(d) for d in spec.get("shape") or []]
+        if len(shape) != 2:
+            continue
+        # (in_features, out_features) of the targeted linear layer
+        if _DOWN_RE.search(name):
+            in_features, out_features = shape[1], None
+        elif _UP_RE.search(name):
+            in_features, out_features = None, shape[0]
+        elif _DIFF_RE.search(name):
+            out_features, in_features = shape
+        else:
+            continue
+        if layer == "ffn" and proj == "0":
+            in_key, out_key = "dim", "ffn_dim"
+        elif layer == "ffn":
+            in_key, out_key = "ffn_dim", "dim"
+        else:
+            in_key, out_key = "dim", "dim"
+        if in_features is not None:
+            dims[in_key].add(in_features)
+        if out_features is not None:
+            dims[out_key].add(out_features)
+
+    if not wan_tensors:
+        return {"version": ARCH_SIGNATURE_VERSION, "family": foreign or "unknown", "variants": []}
+
+    dim = dims["dim"].pop() if len(dims["dim"]) == 1 else None
+    ffn_dim = dims["ffn_dim"].pop() if len(dims["ffn_dim"]) == 1 else None
+    consistent = not dims["dim"] and not dims["ffn_dim"]  # Leftovers mean conflicting sizes
+    variants = [
+        variant for variant, spec in WAN_VARIANTS.items()
+        if consistent
+        and (dim is None or dim == spec["dim"])
+        and (ffn_dim is None or ffn_dim == spec["ffn_dim"])
+        and max_block < spec["num_layers"]
+        and (spec["img_attn"] or not img_attn)
+    ]
+    return {
+        "version": ARCH_SIGNATURE_VERSION,
+        "family": "wan",
+        "dim": dim,
+        "ffn_dim": ffn_dim,
+        "blocks": max_block + 1,
+        "img_attn": img_attn,
+        "variants": variants,
+    }
+
+
+def get_arch_signature(index: LoraIndex, entry: Optional[LoraEntry], path: str) -> Dict[str, Any]:
+    """Signature of a LoRA file, cached in the LoRA index by (path, size, mtime) when it is indexed."""
+    if entry is not None:
+        cached = index.cache_get("arch", entry)
+        if cached is not None and cached.get("version") == ARCH_SIGNATURE_VERSION:
+            return cached
+    if not path.endswith(".safetensors"):
+        return {"version": ARCH_SIGNATURE_VERSION, "family": "unknown", "variants": [],
+                "error": "not a safetensors file"}
+    try:
+        signature = signature_from_header(read_safetensors_header(path))
+    except (OSError, SafetensorsHeaderError) as e:
+        # Don't cache failures - the file may still be mid-copy
+        return {"version": ARCH_SIGNATURE_VERSION, "family": "unknown", "variants": [], "error": str(e)}
+    if entry is not None:
+        index.cache_put("arch", entry, signature)
+    return signature
+
+
+def check_compatibility(signature: Dict[str, Any], target: str) -> Tuple[bool, str]:
+    """
+    Whether a LoRA with this signature fits target ("any" or a WAN_VARIANTS
+    key), with a one-line description. LoRAs that can't be identified pass,
+    since an unusual key layout is not proof of a mismatch.
+    """
+    family = signature.get("family")
+    if family == "unknown":
+        return True, f"could not identify architecture{': ' + signature['error'] if signature.get('error') else ''}"
+    if family != "wan":
+        return False, f"LoRA is for {family}, not Wan"
+
+    described = describe_signature(signature)
+    if target == "any":
+        if not signature["variants"]:
+            return True, f"{described} (matches no known Wan variant)"
+        return True, described
+    if target in signature["variants"]:
+        return True, described
+    return False, f"{described}, target is {target}"
+
+
+def describe_signature(signature: Dict[str, Any]) -> str:
+    parts = []
+    if signature.get("dim"):
+        parts.append(f"dim {signature['dim']}")
+    if signature.get("blocks"):
+        parts.append(f"{signature['blocks']} blocks")
+    if signature.get("img_attn"):
+        parts.append("I2V image attention")
+    fits = ", ".join(signature.get("variants") or []) or "no known variant"
+    return f"fits {fits}" + (f" ({', '.join(parts)})" if parts else "")
+
+
+def variant_names() -> List[str]:
+    return list(WAN_VARIANTS)
@@ -0,0 +1,104 @@
+"""
+WanVideo Wakawave Index Events
+Coalesced, rate-limited WebSocket push of LoRA index changes to connected clients
+"""
+
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from .WanVideoWakawaveLoraIndex import LoraEntry, LoraIndex
+
+# Event name the frontend listens for (api.addEventListener)
+INDEX_EVENT = "wakawave.lora_index"
+
+
+class IndexChangeBroadcaster:
+    """
+    Collects LoRA index changes and hash completions, and sends them as one
+    compact diff at most once per interval.
+
+    The first change after a quiet period opens a window; everything that
+    arrives before it closes is merged per name (a file added and removed in
+    the same window is simply dropped), so a bulk copy of hundreds of files
+    goes out as a handful of messages. Diffs larger than max_items are sent
+    as {"reset": true}, telling clients to re-fetch the catalog instead.
+    """
+
+    def __init__(self, index: LoraIndex, send: Callable[[str, Dict[str, Any]], None],
+                 interval: float = 1.0, max_items: int = 1000):
+        self.index = index
+        self.send = send
+        self.interval = interval
+        self.max_items = max_items
+        self.messages_sent = 0
+        self._lock = threading.Lock()
+        self._changed: set = set()
+        self._added: set = set()  # Names first seen in the current window
+        self._removed: set = set()
+        self._hashed: Dict[str, str] = {}
+        self._timer: Optional[threading.Timer] = None
+
+    def on_index_change(self, changes: Dict[str, Any]) -> None:
+        """LoraIndex listener: changes = {"full", "added", "updated", "removed"}."""
+        with self._lock:
+            for name in changes.get("added", []):
+                if name not in self._removed:
+                    self._added.add(name)
+                self._removed.discard(name)
+                self._changed.add(name)
+            for name in changes.get("updated", []):
+                self._changed.add(name)
+            for name in changes.get("removed", []):
+                self._changed.discard(name)
+                self._hashed.pop(name, None)
+                if name in self._added:
+                    self._added.discard(name)  # Came and went within the window
+                else:
+                    self._removed.add(name)
+        self._schedule()
+
+    def on_hashed(self, entry: LoraEntry, sha256: str) -> None:
+        """LoraHasher listener."""
+        with self._lock:
+            self._hashed[entry.name] = sha256
+        self._schedule()
+
+    def _schedule(self) -> None:
+        with self._lock:
+            if self._timer is not None:
+                return
+            self._timer = threading.Timer(self.interval, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self) -> Optional[Dict[str, Any]]:
+        """Send whatever is pending now. Returns the message sent, if any."""
+        with self._lock:
+            self._timer = None
+            changed, removed, hashed = self._changed, self._removed, self._hashed
+            self._changed, self._added, self._removed, self._hashed = set(), set(), set(), {}
+
+        if len(changed) + len(removed) + len(hashed) > self.max_items:
+            message: Dict[str, Any] = {"reset": True}
+        else:
+            items = []
+            for name in sorted(changed):
+                entry = self.index.get(name)
+                if entry is None:
+                    removed.add(name)
+                    continue
+                items.append({"name": name, "size": entry.size, "mtime": entry.mtime})
+            message = {
+                "changed": items,
+                "removed": sorted(removed),
+                "hashed": [{"name": name, "sha256": digest} for name, digest in sorted(hashed.items())],
+            }
+            if not (items or removed or hashed):
+                return None
+        message["total"] = len(self.index)
+        try:
+            self.send(INDEX_EVENT, message)
+            self.messages_sent += 1
+        except Exception as e:
+            print(f"[Wakawave] Could not push LoRA index changes: {e}")
+        return message
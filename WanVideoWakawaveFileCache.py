@@ -0,0 +1,168 @@
+"""
+WanVideo Wakawave File Cache
+Size-capped, LRU-evicted directory of derived files (merged stacks, slim extracts, converted copies)
+"""
+
+import os
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class FileCache:
+    """
+    Content-addressed file cache on disk.
+
+    Files are named <key><suffix>. A hit refreshes the file's mtime, so the
+    mtime doubles as the LRU clock and survives restarts. Writes go to a
+    temporary file that is renamed into place, and the directory is trimmed
+    to max_bytes (least recently used first) after every write.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, suffix: str = ".safetensors"):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes_written = 0
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, Tuple[threading.Lock, int]] = {}  # key -> (lock, holders + waiters)
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.directory, key + self.suffix)
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached file for key (marking it recently used), or None."""
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def get_or_create(self, key: str, create: Callable[[str], None]) -> str:
+        """Return the cached file for key, calling create(tmp_path) to build it on a miss.
+
+        Concurrent callers for the same key wait for the first one rather
+        than building the file twice.
+        """
+        with self._lock:
+            key_lock, waiters = self._key_locks.get(key, (threading.Lock(), 0))
+            self._key_locks[key] = (key_lock, waiters + 1)
+        try:
+            with key_lock:
+                path = self.get(key)
+                if path is not None:
+                    self.hits += 1
+                    return path
+                self.misses += 1
+
+                os.makedirs(self.directory, exist_ok=True)
+                path = self.path_for(key)
+                tmp_path = path + ".tmp"
+                try:
+                    create(tmp_path)
+                    os.replace(tmp_path, path)
+                finally:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+                self.bytes_written += os.path.getsize(path)
+        finally:
+            # Drop the key's lock once nobody holds or waits for it, so the dict doesn't grow per key
+            with self._lock:
+                key_lock, waiters = self._key_locks[key]
+                if waiters > 1:
+                    self._key_locks[key] = (key_lock, waiters - 1)
+                else:
+                    del self._key_locks[key]
+        self.trim(keep=path)
+        return path
+
+    def trim(self, keep: Optional[str] = None) -> int:
+        """Evict least recently used files until the cache fits max_bytes. Returns files evicted."""
+        if self.max_bytes <= 0:
+            return 0
+        with self._lock:
+            files = []
+            try:
+                with os.scandir(self.directory) as it:
+                    for entry in it:
+                        if entry.is_file() and entry.name.endswith(self.suffix):
+                            st = entry.stat()
+                            files.append((st.st_mtime, st.st_size, entry.path))
+            except OSError:
+                return 0
+
+            total = sum(size for _, size, _ in files)
+            evicted = 0
+            for _, size, path in sorted(files):
+                if total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                evicted += 1
+            self.evictions += evicted
+            return evicted
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters plus current on-disk usage."""
+        files = 0
+        size = 0
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if entry.is_file() and entry.name.endswith(self.suffix):
+                        files += 1
+                        size += entry.stat().st_size
+        except OSError:
+            pass
+        lookups = self.hits + self.misses
+        return {
+            "directory": self.directory,
+            "files": files,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "bytes_written": self.bytes_written,
+        }
+
+
+# Shared caches, one subdirectory per kind ("merged", ...) under a common base directory
+_cache_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache")
+_cache_max_bytes: Dict[str, int] = {}
+_default_max_bytes = 20 * 1024 ** 3
+_caches: Dict[str, FileCache] = {}
+
+
+def configure_file_caches(directory: Optional[str] = None, max_bytes: Optional[Dict[str, int]] = None) -> None:
+    """Set the base directory and per-kind size caps for caches created afterwards."""
+    global _cache_dir
+    if directory:
+        _cache_dir = directory
+    if max_bytes:
+        _cache_max_bytes.update(max_bytes)
+        for kind, cache in _caches.items():
+            cache.max_bytes = _cache_max_bytes.get(kind, cache.max_bytes)
+
+
+def get_file_cache(kind: str) -> FileCache:
+    """Return the shared cache for kind, creating it on first use."""
+    cache = _caches.get(kind)
+    if cache is None:
+        cache = FileCache(os.path.join(_cache_dir, kind), _cache_max_bytes.get(kind, _default_max_bytes))
+        _caches[kind] = cache
+    return cache
+
+
+def all_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Stats for every cache used so far in this session."""
+    return {kind: cache.stats() for kind, cache in _caches.items()}
@@ -0,0 +1,203 @@
+"""
+WanVideo Wakawave LoRA Hashing
+Background SHA-256 / AutoV2 hashing of LoRA files, cached in the LoRA index
+"""
+
+import queue
+import hashlib
+import threading
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Iterable
+
+from .WanVideoWakawaveLoraIndex import LoraEntry, LoraIndex, get_lora_index
+
+# Fixed read size for streaming hashes - large enough for sequential throughput, small enough to stay cheap on RAM
+HASH_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+class HashCancelled(Exception):
+    """Raised when a hash is abandoned because the hasher is stopping."""
+
+
+def sha256_file(path: str, chunk_size: int = HASH_CHUNK_SIZE,
+                cancel: Optional[threading.Event] = None) -> str:
+    """Stream a file through SHA-256 in fixed-size chunks. Returns the lowercase hex digest."""
+    digest = hashlib.sha256()
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    with open(path, "rb", buffering=0) as f:
+        while True:
+            if cancel is not None and cancel.is_set():
+                raise HashCancelled(path)
+            read = f.readinto(buffer)
+            if not read:
+                break
+            digest.update(view[:read])
+    return digest.hexdigest()
+
+
+def autov2_hash(sha256: str) -> str:
+    """AutoV2 short hash as shown by CivitAI / A1111: first 10 hex chars, uppercase."""
+    return sha256[:10].upper()
+
+
+class LoraHasher:
+    """
+    Hashes LoRA files on background daemon threads.
+
+    Digests are stored in the LoRA index under "sha256", keyed by
+    (path, size, mtime), so each file is hashed once until it changes.
+    """
+
+    def __init__(self, index: LoraIndex, workers: int = 2):
+        self.index = index
+        self.workers = max(1, int(workers))
+        self.hashed_count = 0
+        self.hashed_bytes = 0
+        self._queue: "queue.Queue[LoraEntry]" = queue.Queue()
+        self._pending: set = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._listeners: List[Any] = []
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def add_listener(self, callback) -> None:
+        """Call callback(entry, sha256) whenever a file finishes hashing."""
+        self._listeners.append(callback)
+
+    def get(self, entry: LoraEntry) -> Optional[str]:
+        """Cached SHA-256 for entry, or None if it has not been hashed yet."""
+        return self.index.cache_get("sha256", entry)
+
+    def hash_now(self, entry: LoraEntry) -> str:
+        """Return entry's SHA-256, hashing it on the calling thread if needed."""
+        digest = self.get(entry)
+        if digest is None:
+            digest = sha256_file(entry.path)
+            self._store(entry, digest)
+        return digest
+
+    def submit(self, entry: LoraEntry) -> bool:
+        """Queue entry for background hashing. Returns False if already hashed or queued."""
+        if self.get(entry) is not None:
+            return False
+        key = (entry.path, entry.size, entry.mtime)
+        with self._lock:
+            if key in self._pending:
+                return False
+            self._pending.add(key)
+        self._ensure_threads()
+        self._queue.put(entry)
+        return True
+
+    def submit_all(self, entries: Iterable[LoraEntry]) -> int:
+        """Queue every entry not hashed yet. Returns how many were queued."""
+        return sum(1 for entry in entries if self.submit(entry))
+
+    def stop(self) -> None:
+        """Abandon queued and in-progress hashes."""
+        self._stop.set()
+
+    def hash_index(self) -> Dict[str, List[LoraEntry]]:
+        """Map SHA-256 -> indexed entries with that content (hashed entries only)."""
+        by_hash: Dict[str, List[LoraEntry]] = defaultdict(list)
+        for entry in self.index.entries():
+            digest = self.get(entry)
+            if digest is not None:
+                by_hash[digest].append(entry)
+        return dict(by_hash)
+
+    def find_duplicates(self, queue_missing: bool = True) -> Dict[str, Any]:
+        """Find LoRA files with identical content stored under different names.
+
+        Only files sharing a byte size can be duplicates, so only those are
+        ever hashed (queued in the background when queue_missing is set).
+        Hard links to the same inode are reported without hashing.
+        """
+        by_size: Dict[int, List[LoraEntry]] = defaultdict(list)
+        for entry in self.index.entries():
+            by_size[entry.size].append(entry)
+        candidates = [group for group in by_size.values() if len(group) > 1]
+
+        groups = []
+        unhashed = 0
+        for group in candidates:
+            by_hash: Dict[str, List[LoraEntry]] = defaultdict(list)
+            for entry in group:
+                digest = self.get(entry)
+                if digest is None:
+                    # Same file reached through another name needs no hash
+                    twin = next((e for e in group if e is not entry and e.inode == entry.inode and e.inode), None)
+                    digest = f"inode:{entry.inode}" if twin is not None else None
+                if digest is None:
+                    unhashed += 1
+                    if queue_missing:
+                        self.submit(entry)
+                    continue
+                by_hash[digest].append(entry)
+            for digest, entries in by_hash.items():
+                if len(entries) > 1:
+                    groups.append({
+                        "sha256": None if digest.startswith("inode:") else digest,
+                        "same_inode": digest.startswith("inode:"),
+                        "size": entries[0].size,
+                        "names": [e.name for e in entries],
+                        "paths": [e.path for e in entries],
+                    })
+
+        groups.sort(key=lambda g: g["size"], reverse=True)
+        return {
+            "groups": groups,
+            "wasted_bytes": sum(g["size"] * (len(g["names"]) - 1) for g in groups if not g["same_inode"]),
+            "candidates": sum(len(group) for group in candidates),
+            "unhashed": unhashed,
+            "pending": self.pending,
+        }
+
+    def _store(self, entry: LoraEntry, digest: str) -> None:
+        self.index.cache_put("sha256", entry, digest)
+        self.hashed_count += 1
+        self.hashed_bytes += entry.size
+        for callback in list(self._listeners):
+            try:
+                callback(entry, digest)
+            except Exception as e:
+                print(f"[Wakawave] Hash listener error: {e}")
+
+    def _ensure_threads(self) -> None:
+        with self._lock:
+            self._threads = [t for t in self._threads if t.is_alive()]
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._run, name="WakawaveHasher", daemon=True)
+                self._threads.append(thread)
+                thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            entry = self._queue.get()
+            key = (entry.path, entry.size, entry.mtime)
+            try:
+                if self.get(entry) is None:
+                    self._store(entry, sha256_file(entry.path, cancel=self._stop))
+            except HashCancelled:
+                return
+            except OSError as e:
+                print(f"[Wakawave] Could not hash {entry.name}: {e}")
+            finally:
+                with self._lock:
+                    self._pending.discard(key)
+
+
+_hasher: Optional[LoraHasher] = None
+
+
+def get_hasher() -> LoraHasher:
+    """Return the process-wide hasher for the shared LoRA index."""
+    global _hasher
+    if _hasher is None:
+        _hasher = LoraHasher(get_lora_index())
+    return _hasher
@@ -0,0 +1,138 @@
+"""
+WanVideo Wakawave LoRA Dtype Conversion
+One-time CPU conversion of fp32 LoRA files to cached fp16/bf16 copies
+"""
+
+import json
+import struct
+import hashlib
+from typing import Any, Dict, Optional, Tuple
+
+from .WanVideoWakawaveSafetensors import read_safetensors_header, tensor_specs, tensor_nbytes, SafetensorsHeaderError
+from .WanVideoWakawaveLoraMerge import content_hash
+from .WanVideoWakawaveFileCache import get_file_cache
+from .WanVideoWakawaveLoraIndex import get_lora_index
+
+# Bump when the converted file layout changes so old cache entries are not reused
+DTYPE_FORMAT_VERSION = 1
+
+# Target dtype option -> safetensors dtype name
+TARGET_DTYPES = {"fp16": "F16", "bf16": "BF16"}
+
+# Source dtypes worth converting
+_WIDE_DTYPES = ("F32", "F64")
+
+# Dtype used when a loader doesn't choose one ("off" unless configured)
+_default_dtype = "off"
+
+
+def configure_dtype_conversion(dtype: Optional[str]) -> None:
+    """Set the process-wide target dtype ("fp16", "bf16" or "off")."""
+    global _default_dtype
+    _default_dtype = dtype if dtype in TARGET_DTYPES else "off"
+
+
+def resolve_target_dtype(option: Optional[str]) -> str:
+    """The loader option, with "default" (or no option) meaning the process-wide setting."""
+    return _default_dtype if option in (None, "", "default") else option
+
+
+def _is_converted(spec: Dict[str, Any]) -> bool:
+    """Wide float tensors are converted; scalars (alpha) keep full precision."""
+    if spec.get("dtype") not in _WIDE_DTYPES:
+        return False
+    count = 1
+    for dim in spec.get("shape", []):
+        count *= int(dim)
+    return count > 1
+
+
+def wide_tensor_bytes(item: Dict[str, Any]) -> int:
+    """
+    Bytes of the tensors conversion would narrow in a WANVIDLORA item's file
+    (0 = nothing to convert). Cached in the LoRA index by (path, size, mtime)
+    for indexed files, so repeated loads don't re-read headers.
+    """
+    path = str(item.get("path", ""))
+    if not path.endswith(".safetensors"):
+        return 0
+    index = get_lora_index()
+    entry = index.lookup(item.get("name", "")) if item.get("name") else None
+    if entry is not None and entry.path != path:
+        entry = None
+    if entry is not None:
+        cached = index.cache_get("wide_bytes", entry)
+        if cached is not None:
+            return cached
+    try:
+        specs = tensor_specs(read_safetensors_header(path))
+    except (OSError, SafetensorsHeaderError):
+        return 0  # Don't cache failures - the file may still be mid-copy
+    wide = sum(tensor_nbytes(spec) for spec in specs.values() if _is_converted(spec))
+    if entry is not None:
+        index.cache_put("wide_bytes", entry, wide)
+    return wide
+
+
+def convert_lora_file(path: str, out_path: str, target: str) -> None:
+    """
+    Write a copy of path with every non-scalar fp32/fp64 tensor cast to target.
+
+    Tensors are read, cast and written one at a time, so peak memory is one
+    tensor rather than the whole file. Other tensors are copied unchanged.
+    """
+    import torch
+    from safetensors import safe_open
+
+    torch_dtype = {"F16": torch.float16, "BF16": torch.bfloat16}[TARGET_DTYPES[target]]
+    header = read_safetensors_header(path)
+    specs = tensor_specs(header)
+    names = sorted(specs, key=lambda name: specs[name]["data_offsets"][0])
+
+    out_header: Dict[str, Any] = {}
+    metadata = header.get("__metadata__")
+    metadata = dict(metadata) if isinstance(metadata, dict) else {}
+    metadata.update({"wakawave_dtype_version": str(DTYPE_FORMAT_VERSION), "wakawave_converted_to": target})
+    out_header["__metadata__"] = metadata
+    offset = 0
+    for name in names:
+        spec = specs[name]
+        start, end = spec["data_offsets"]
+        size = end - start
+        if _is_converted(spec):
+            spec = {**spec, "dtype": TARGET_DTYPES[target]}
+            size = size // (4 if specs[name]["dtype"] == "F32" else 8) * 2
+        out_header[name] = {**spec, "data_offsets": [offset, offset + size]}
+        offset += size
+
+    raw = json.dumps(out_header, separators=(",", ":")).encode("utf-8")
+    raw += b" " * (-len(raw) % 8)  # Pad so tensor data stays 8-byte aligned
+
+    with safe_open(path, framework="pt", device="cpu") as src, open(path, "rb") as src_raw, \
+            open(out_path, "wb") as dst:
+        (header_size,) = struct.unpack("<Q", src_raw.read(8))
+        data_start = 8 + header_size
+        dst.write(struct.pack("<Q", len(raw)))
+        dst.write(raw)
+        for name in names:
+            if _is_converted(specs[name]):
+                tensor = src.get_tensor(name).to(torch_dtype).contiguous()
+                dst.write(tensor.view(torch.uint8).numpy().tobytes())
+            else:
+                start, end = specs[name]["data_offsets"]
+                src_raw.seek(data_start + start)
+                dst.write(src_raw.read(end - start))
+
+
+def convert_lora(item: Dict[str, Any], target: str) -> Tuple[str, str, bool]:
+    """
+    Return (converted file path, cache key, cache hit) for a WANVIDLORA item,
+    converting on a cache miss. The key identifies the converted file's content.
+    """
+    cache = get_file_cache("dtype")
+    payload = json.dumps({"version": DTYPE_FORMAT_VERSION, "source": content_hash(item), "dtype": target},
+                         separators=(",", ":"))
+    key = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    hits_before = cache.hits
+    path = cache.get_or_create(key, lambda tmp_path: convert_lora_file(item["path"], tmp_path, target))
+    return path, key, cache.hits > hits_before
@@ -0,0 +1,866 @@
+"""
+WanVideo Wakawave LoRA Index
+Recursive, path-keyed index of every LoRA file under ComfyUI's configured loras directories
+"""
+
+import os
+import json
+import time
+import hashlib
+import asyncio
+import sqlite3
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import folder_paths  # type: ignore
+from typing import Any, Callable, Dict, List, Optional, NamedTuple, Iterable, Tuple
+
+
+class LoraEntry(NamedTuple):
+    """A single indexed LoRA file."""
+    name: str     # Relative name as accepted by folder_paths.get_full_path("loras", name)
+    path: str     # Absolute path on disk
+    root: str     # Configured loras directory the file was found under
+    size: int     # Size in bytes
+    mtime: float  # Modification time (seconds since epoch)
+    inode: int    # st_ino, used to spot the same file reached through different names
+
+
+def normalize_lora_name(name: str) -> str:
+    """Normalize a LoRA name to the forward-slash relative form used as index key."""
+    return name.replace("\\", "/").strip("/")
+
+
+def get_lora_roots() -> List[str]:
+    """Return all configured loras directories, in ComfyUI's lookup order.
+
+    Uses ComfyUI's folder_names_and_paths which respects extra_model_paths.yaml,
+    falling back to <models_dir>/loras.
+    """
+    roots: List[str] = []
+
+    # folder_names_and_paths is a dict where:
+    # key = folder type (e.g., "loras")
+    # value = (list_of_paths, set_of_extensions)
+    folder_map = getattr(folder_paths, 'folder_names_and_paths', None)
+    if isinstance(folder_map, dict) and 'loras' in folder_map:
+        paths_tuple = folder_map['loras']
+        if isinstance(paths_tuple, (tuple, list)) and paths_tuple:
+            paths_list = paths_tuple[0] if isinstance(paths_tuple[0], (list, tuple)) else paths_tuple
+            if isinstance(paths_list, (list, tuple)):
+                for path in paths_list:
+                    if isinstance(path, str) and path not in roots:
+                        roots.append(path)
+
+    if not roots:
+        roots.append(os.path.join(folder_paths.models_dir, "loras"))
+
+    return roots
+
+
+def get_lora_extensions() -> set:
+    """Return the file extensions ComfyUI lists for loras (empty set = accept all)."""
+    folder_map = getattr(folder_paths, 'folder_names_and_paths', None)
+    if isinstance(folder_map, dict) and 'loras' in folder_map:
+        paths_tuple = folder_map['loras']
+        if isinstance(paths_tuple, (tuple, list)) and len(paths_tuple) > 1:
+            exts = paths_tuple[1]
+            if isinstance(exts, (set, list, tuple)):
+                return {e.lower() for e in exts if isinstance(e, str)}
+    return set()
+
+
+# Directories with at least this many files are stat'ed in parallel
+_PARALLEL_STAT_MIN = 32
+
+# Upper bound on threads used for filesystem work (parallel stats and API handlers)
+_fs_workers = 8
+_fs_executor: Optional[ThreadPoolExecutor] = None
+
+
+def configure_fs_workers(workers: int) -> None:
+    """Set the thread count for filesystem work. Takes effect for executors created afterwards."""
+    global _fs_workers
+    _fs_workers = max(1, int(workers))
+
+
+def get_fs_executor() -> ThreadPoolExecutor:
+    """Bounded executor for filesystem calls made on behalf of API handlers."""
+    global _fs_executor
+    if _fs_executor is None:
+        _fs_executor = ThreadPoolExecutor(max_workers=_fs_workers, thread_name_prefix="WakawaveFS")
+    return _fs_executor
+
+
+async def run_fs(func, *args, **kwargs):
+    """Run blocking filesystem work on the bounded executor, off the aiohttp event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_fs_executor(), functools.partial(func, *args, **kwargs))
+
+
+def _parallel_stat(dir_entries: List[os.DirEntry]) -> List[Any]:
+    """stat() each DirEntry, fanning out over up to _fs_workers daemon threads.
+
+    Returns a list aligned with dir_entries holding os.stat_result or the OSError raised.
+    """
+    results: List[Any] = [None] * len(dir_entries)
+
+    def stat_range(indices):
+        for i in indices:
+            try:
+                results[i] = dir_entries[i].stat(follow_symlinks=True)
+            except OSError as e:
+                results[i] = e
+
+    if len(dir_entries) < _PARALLEL_STAT_MIN or _fs_workers <= 1:
+        stat_range(range(len(dir_entries)))
+        return results
+
+    thread_count = min(_fs_workers, len(dir_entries) // (_PARALLEL_STAT_MIN // 2))
+    threads = [threading.Thread(target=stat_range, args=(range(i, len(dir_entries), thread_count),), daemon=True)
+               for i in range(thread_count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+_SCHEMA_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE dirs (path TEXT PRIMARY KEY, root TEXT, rel_dir TEXT, mtime REAL, dev INTEGER, ino INTEGER, subdirs TEXT);
+CREATE TABLE files (name TEXT, dir TEXT, path TEXT, root TEXT, size INTEGER, mtime REAL, inode INTEGER);
+CREATE TABLE derived (kind TEXT, path TEXT, size INTEGER, mtime REAL, value TEXT);
+"""
+
+
+class LoraIndex:
+    """
+    In-memory index of all LoRA files, keyed by normalized relative name.
+
+    The first root containing a given relative name wins, matching the
+    resolution order of folder_paths.get_full_path.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._refresh_lock = threading.Lock()
+        self._entries: Dict[str, LoraEntry] = {}
+        self._dirs: Dict[str, _DirState] = {}
+        self._roots: List[str] = []
+        self._extensions: set = set()
+        self._scanned = False
+        self._last_refresh: Optional[Dict[str, Any]] = None
+        self._save_lock = threading.Lock()
+        self.persist_path: Optional[str] = None  # Saved after every scan/refresh that changed something
+        self.root_timeout: float = 30.0  # Seconds before a root is marked unavailable (<= 0 waits forever)
+        self._root_status: Dict[str, Dict[str, Any]] = {}
+        self._busy_roots: set = set()
+        # Data derived from file contents (headers, hashes, ...), keyed by (kind, path, size, mtime)
+        self._derived: Dict[Tuple[str, str, int, float], Any] = {}
+        self._dirty = False
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+        self._version = 0  # Bumped whenever entries change
+        self._fingerprint: Tuple[int, str] = (-1, "")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, name: str) -> bool:
+        return normalize_lora_name(name) in self._entries
+
+    @property
+    def scanned(self) -> bool:
+        return self._scanned
+
+    @property
+    def version(self) -> int:
+        """Counter bumped whenever entries change (in-process only; see fingerprint() for a stable value)."""
+        return self._version
+
+    @property
+    def roots(self) -> List[str]:
+        """Roots of the last scan, or the currently configured roots before the first scan."""
+        return list(self._roots) if self._scanned else get_lora_roots()
+
+    def entries(self) -> List[LoraEntry]:
+        """Snapshot of all indexed entries."""
+        with self._lock:
+            return list(self._entries.values())
+
+    def get(self, name: str) -> Optional[LoraEntry]:
+        """O(1) lookup by relative name, without touching the filesystem."""
+        if not name or not isinstance(name, str):
+            return None
+        return self._entries.get(normalize_lora_name(name))
+
+    def lookup(self, name: str, verify: bool = False) -> Optional[LoraEntry]:
+        """Lookup by relative name, resolving through ComfyUI on an index miss.
+
+        A miss falls back to folder_paths.get_full_path (which handles path
+        traversal checks) and adds the resolved file to the index. With
+        verify=True a hit is re-stat'ed so callers about to open the file
+        never get a stale entry.
+        """
+        if not name or not isinstance(name, str) or name == "None":
+            return None
+
+        entry = self.get(name)
+        if entry is not None:
+            if not verify:
+                return entry
+            try:
+                st = os.stat(entry.path)
+            except OSError:
+                with self._lock:
+                    self._entries.pop(entry.name, None)
+                    self._version += 1
+                entry = None
+            else:
+                if st.st_size != entry.size or st.st_mtime != entry.mtime or st.st_ino != entry.inode:
+                    entry = entry._replace(size=st.st_size, mtime=st.st_mtime, inode=st.st_ino)
+                    with self._lock:
+                        self._entries[entry.name] = entry
+                        self._version += 1
+                return entry
+
+        try:
+            full_path = folder_paths.get_full_path("loras", name)
+        except Exception:
+            full_path = None
+        if not full_path:
+            return None
+
+        try:
+            st = os.stat(full_path)
+        except OSError:
+            return None
+
+        root = ""
+        for candidate in self.roots:
+            try:
+                if os.path.commonpath([os.path.abspath(candidate), os.path.abspath(full_path)]) == os.path.abspath(candidate):
+                    root = candidate
+                    break
+            except ValueError:
+                continue
+
+        key = normalize_lora_name(name)
+        entry = LoraEntry(key, full_path, root, st.st_size, st.st_mtime, st.st_ino)
+        with self._lock:
+            self._entries[key] = entry
+            self._version += 1
+        return entry
+
+    def fingerprint(self) -> str:
+        """Hash of every entry's (name, size, mtime); changes only when the indexed files do.
+
+        Computed from content rather than a counter so it is stable across
+        restarts, and cached until the entries next change.
+        """
+        with self._lock:
+            version, cached = self._fingerprint
+            if version == self._version:
+                return cached
+            version = self._version
+            entries = sorted((e.name, e.size, e.mtime) for e in self._entries.values())
+        digest = hashlib.sha256(json.dumps(entries, separators=(",", ":")).encode("utf-8")).hexdigest()
+        with self._lock:
+            self._fingerprint = (version, digest)
+        return digest
+
+    def add_listener(self, callback: Callable[[Dict[str, Any]], None]) -> None:
+        """Call callback(changes) after every scan/refresh that changed entries.
+
+        changes = {"full": bool, "added": [names], "updated": [names], "removed": [names]}
+        """
+        self._listeners.append(callback)
+
+    def _notify(self, full: bool, added: List[str], updated: List[str], removed: List[str]) -> None:
+        if not (added or updated or removed):
+            return
+        with self._lock:
+            self._version += 1
+        changes = {"full": full, "added": added, "updated": updated, "removed": removed}
+        for callback in list(self._listeners):
+            try:
+                callback(changes)
+            except Exception as e:
+                print(f"[Wakawave] LoRA index listener error: {e}")
+
+    def cache_get(self, kind: str, entry: LoraEntry) -> Any:
+        """Return data of the given kind derived from entry's current contents, or None."""
+        return self._derived.get((kind, entry.path, entry.size, entry.mtime))
+
+    def cache_put(self, kind: str, entry: LoraEntry, value: Any) -> None:
+        """Store JSON-serializable data derived from entry's contents.
+
+        Keyed by (path, size, mtime), so a replaced file never sees stale data.
+        Persisted with the index on the next save.
+        """
+        with self._lock:
+            self._derived[(kind, entry.path, entry.size, entry.mtime)] = value
+            self._dirty = True
+
+    def scan(self, roots: Optional[Iterable[str]] = None, verbose: bool = False) -> int:
+        """Walk every root recursively and rebuild the index. Returns the entry count.
+
+        Roots are walked concurrently, each on its own thread. A root that does
+        not finish within root_timeout is marked unavailable and keeps whatever
+        listings it had before, so one dead mount cannot stall the scan.
+        """
+        roots = list(roots) if roots is not None else get_lora_roots()
+        extensions = get_lora_extensions()
+
+        with self._refresh_lock:
+            with self._lock:
+                previous = {root: {p: d for p, d in self._dirs.items() if d.root == root} for root in roots}
+            results = self._run_per_root(roots, lambda root: self._scan_root(root, extensions, verbose))
+
+            # Roots are merged in order and dicts keep insertion order, so
+            # setdefault gives the first root precedence
+            dirs: Dict[str, _DirState] = {}
+            for root in roots:
+                dirs.update(results[root] if root in results else previous[root])
+            entries: Dict[str, LoraEntry] = {}
+            for state in dirs.values():
+                for name, entry in state.files.items():
+                    entries.setdefault(name, entry)
+
+            with self._lock:
+                old_entries = self._entries
+                self._entries = entries
+                self._dirs = dirs
+                self._roots = roots
+                self._extensions = extensions
+                self._scanned = True
+        self._autosave()
+        self._notify(True,
+                     [n for n in entries if n not in old_entries],
+                     [n for n, e in entries.items() if n in old_entries and old_entries[n] != e],
+                     [n for n in old_entries if n not in entries])
+        return len(entries)
+
+    def refresh(self, verbose: bool = False) -> Dict[str, Any]:
+        """Incrementally bring the index up to date.
+
+        Only directories whose mtime changed are re-listed; files in them are
+        re-stat'ed, new subfolders are walked and vanished ones are evicted.
+        Falls back to a full scan if the configured roots changed. Files
+        overwritten in place (which leaves the directory mtime alone) are
+        picked up by lookup(verify=True) or a full scan. Roots are checked
+        concurrently with the same per-root timeout as scan().
+
+        Returns:
+            Dictionary with counts of checked/changed dirs and added/updated/removed entries
+        """
+        started = time.perf_counter()
+        roots = get_lora_roots()
+        if not self._scanned or roots != self._roots or get_lora_extensions() != self._extensions:
+            count = self.scan(roots, verbose)
+            stats = {"full": True, "entries": count, "checked_dirs": len(self._dirs),
+                     "changed_dirs": len(self._dirs), "added": count, "updated": 0, "removed": 0}
+            stats["seconds"] = round(time.perf_counter() - started, 4)
+            self._last_refresh = stats
+            return stats
+
+        with self._refresh_lock:
+            with self._lock:
+                by_root = {root: {p: d for p, d in self._dirs.items() if d.root == root} for root in self._roots}
+            results = self._run_per_root(self._roots, lambda root: self._refresh_root(root, by_root[root], verbose))
+
+            dirs: Dict[str, _DirState] = {}
+            touched: set = set()
+            checked = changed = 0
+            for root in self._roots:
+                if root in results:
+                    root_dirs, root_touched, root_checked, root_changed = results[root]
+                    touched.update(root_touched)
+                    checked += root_checked
+                    changed += root_changed
+                else:
+                    root_dirs = by_root[root]  # Timed out - keep the previous listings
+                dirs.update(root_dirs)
+
+            added: List[str] = []
+            updated: List[str] = []
+            removed: List[str] = []
+            with self._lock:
+                self._dirs = dirs
+                for name in touched:
+                    old = self._entries.get(name)
+                    new = self._resolve(name)
+                    if new is None:
+                        if old is not None:
+                            del self._entries[name]
+                            removed.append(name)
+                    elif old is None:
+                        self._entries[name] = new
+                        added.append(name)
+                    elif old != new:
+                        self._entries[name] = new
+                        updated.append(name)
+
+        if changed or self._dirty:
+            self._autosave()
+        self._notify(False, added, updated, removed)
+        stats = {"full": False, "entries": len(self._entries), "checked_dirs": checked,
+                 "changed_dirs": changed, "added": len(added), "updated": len(updated), "removed": len(removed),
+                 "seconds": round(time.perf_counter() - started, 4)}
+        self._last_refresh = stats
+        return stats
+
+    @property
+    def root_status(self) -> Dict[str, Dict[str, Any]]:
+        """Per-root availability and latency of the most recent scan/refresh."""
+        return {root: dict(status) for root, status in self._root_status.items()}
+
+    def _scan_root(self, root: str, extensions: set, verbose: bool) -> Dict[str, "_DirState"]:
+        """Full walk of one root (runs on the root's worker thread)."""
+        dirs: Dict[str, _DirState] = {}
+        if not os.path.isdir(root):
+            print(f"[Wakawave]   ✗ {root} (not found)")
+            return dirs
+        self._scan_tree(root, root, "", extensions, dirs, set(), verbose)
+        print(f"[Wakawave]   ✓ {root}")
+        return dirs
+
+    def _refresh_root(self, root: str, dirs: Dict[str, "_DirState"], verbose: bool) -> Tuple[Dict[str, "_DirState"], set, int, int]:
+        """Incremental check of one root (runs on the root's worker thread).
+
+        Returns:
+            (updated listings for the root, affected names, checked dir count, changed dir count)
+        """
+        touched: set = set()
+        checked = changed = 0
+
+        # A root that was missing at scan time may have appeared since
+        if root not in dirs and os.path.isdir(root):
+            self._scan_tree(root, root, "", self._extensions, dirs, set(), verbose)
+            for state in dirs.values():
+                touched.update(state.files)
+            changed += 1
+
+        for path in list(dirs):
+            state = dirs.get(path)
+            if state is None:
+                continue  # Evicted together with a vanished parent
+            checked += 1
+            try:
+                mtime = os.stat(path).st_mtime
+            except OSError:
+                touched.update(self._evict_tree(path, dirs))
+                changed += 1
+                continue
+            if mtime == state.mtime:
+                continue
+            changed += 1
+            touched.update(self._rescan_dir(state, dirs, verbose))
+        return dirs, touched, checked, changed
+
+    def _run_per_root(self, roots: List[str], func) -> Dict[str, Any]:
+        """Run func(root) for every root concurrently, bounded by root_timeout.
+
+        Uses daemon threads rather than an executor so a stat that never
+        returns (hung NFS/SMB mount) cannot block interpreter shutdown. Roots
+        whose previous worker is still stuck are skipped.
+
+        Returns:
+            Dictionary mapping root to func's result, for the roots that finished
+        """
+        workers: Dict[str, Tuple[threading.Thread, Dict[str, Any]]] = {}
+        for root in roots:
+            if root in self._busy_roots:
+                self._root_status[root] = {"available": False, "seconds": None,
+                                           "error": "still unresponsive from a previous scan"}
+                print(f"[Wakawave]   ✗ {root} (still unresponsive, skipped)")
+                continue
+            holder: Dict[str, Any] = {}
+            thread = threading.Thread(target=self._root_worker, args=(root, func, holder),
+                                      name="WakawaveRootScan", daemon=True)
+            self._busy_roots.add(root)
+            workers[root] = (thread, holder)
+            thread.start()
+
+        results: Dict[str, Any] = {}
+        deadline = time.monotonic() + self.root_timeout if self.root_timeout > 0 else None
+        for root, (thread, holder) in workers.items():
+            thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+            if thread.is_alive():
+                self._root_status[root] = {"available": False, "seconds": None,
+                                           "error": f"timed out after {self.root_timeout}s"}
+                print(f"[Wakawave]   ✗ {root} (timed out after {self.root_timeout}s, marked unavailable)")
+            elif "error" in holder:
+                self._root_status[root] = {"available": False, "seconds": holder["seconds"], "error": holder["error"]}
+            else:
+                results[root] = holder["result"]
+                self._root_status[root] = {"available": holder["exists"], "seconds": holder["seconds"],
+                                           "error": None if holder["exists"] else "not found"}
+        return results
+
+    def _root_worker(self, root: str, func, holder: Dict[str, Any]) -> None:
+        started = time.perf_counter()
+        try:
+            holder["result"] = func(root)
+            holder["exists"] = os.path.isdir(root)
+        except Exception as e:
+            holder["error"] = str(e)
+        finally:
+            holder["seconds"] = round(time.perf_counter() - started, 4)
+            self._busy_roots.discard(root)
+
+    def save(self, path: str) -> None:
+        """Write the index (directory listings + entries) to a SQLite file.
+
+        The file is written next to the target and swapped in with os.replace,
+        so a crash mid-write never leaves a half-written index behind.
+        """
+        with self._lock:
+            roots = list(self._roots)
+            extensions = sorted(self._extensions)
+            dirs = list(self._dirs.values())
+            extras = [e for name, e in self._entries.items() if self._resolve(name) is None]
+            # Only keep derived data that still matches an indexed file
+            live = {(e.path, e.size, e.mtime) for e in self._entries.values()}
+            derived = [(k[0], k[1], k[2], k[3], json.dumps(v)) for k, v in self._derived.items() if k[1:] in live]
+            self._dirty = False
+
+        tmp_path = path + ".tmp"
+        with self._save_lock:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            conn = sqlite3.connect(tmp_path)
+            try:
+                conn.executescript(_SCHEMA)
+                conn.executemany("INSERT INTO meta VALUES (?, ?)", [
+                    ("version", str(_SCHEMA_VERSION)),
+                    ("roots", json.dumps(roots)),
+                    ("extensions", json.dumps(extensions)),
+                ])
+                conn.executemany(
+                    "INSERT INTO dirs VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(d.path, d.root, d.rel_dir, d.mtime, d.key[0], d.key[1], json.dumps(d.subdirs)) for d in dirs])
+                conn.executemany(
+                    "INSERT INTO files VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(e.name, d.path, e.path, e.root, e.size, e.mtime, e.inode) for d in dirs for e in d.files.values()]
+                    + [(e.name, None, e.path, e.root, e.size, e.mtime, e.inode) for e in extras])
+                conn.executemany("INSERT INTO derived VALUES (?, ?, ?, ?, ?)", derived)
+                conn.commit()
+            finally:
+                conn.close()
+            os.replace(tmp_path, path)
+
+    def load(self, path: str) -> bool:
+        """Load an index saved by save(). Returns False if the file is missing or unusable.
+
+        The loaded index is not validated against the filesystem; call refresh()
+        afterwards to pick up changes made while the server was down.
+        """
+        if not os.path.isfile(path):
+            return False
+        try:
+            conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+            try:
+                meta = dict(conn.execute("SELECT key, value FROM meta"))
+                if meta.get("version") != str(_SCHEMA_VERSION):
+                    print(f"[Wakawave] Ignoring LoRA index {path} (schema version {meta.get('version')})")
+                    return False
+                dirs: Dict[str, _DirState] = {}
+                for d_path, root, rel_dir, mtime, dev, ino, subdirs in conn.execute(
+                        "SELECT path, root, rel_dir, mtime, dev, ino, subdirs FROM dirs ORDER BY rowid"):
+                    state = _DirState(d_path, root, rel_dir, mtime, (dev, ino))
+                    state.subdirs = json.loads(subdirs)
+                    state.subdir_names = [f"{rel_dir}/{os.path.basename(d)}" if rel_dir else os.path.basename(d)
+                                          for d in state.subdirs]
+                    dirs[d_path] = state
+                extras: Dict[str, LoraEntry] = {}
+                for name, d_path, f_path, root, size, mtime, inode in conn.execute(
+                        "SELECT name, dir, path, root, size, mtime, inode FROM files ORDER BY rowid"):
+                    entry = LoraEntry(name, f_path, root, size, mtime, inode)
+                    if d_path is None:
+                        extras[name] = entry
+                    elif d_path in dirs:
+                        dirs[d_path].files[name] = entry
+                derived = {(kind, f_path, size, mtime): json.loads(value) for kind, f_path, size, mtime, value
+                           in conn.execute("SELECT kind, path, size, mtime, value FROM derived")}
+            finally:
+                conn.close()
+        except (sqlite3.Error, ValueError, TypeError) as e:
+            print(f"[Wakawave] Could not load LoRA index {path}: {e}")
+            return False
+
+        entries: Dict[str, LoraEntry] = {}
+        for state in dirs.values():
+            for name, entry in state.files.items():
+                entries.setdefault(name, entry)
+        for name, entry in extras.items():
+            entries.setdefault(name, entry)
+
+        with self._refresh_lock, self._lock:
+            self._dirs = dirs
+            self._entries = entries
+            self._roots = json.loads(meta.get("roots", "[]"))
+            self._extensions = set(json.loads(meta.get("extensions", "[]")))
+            self._derived = derived
+            self._scanned = True
+            self._version += 1
+        return True
+
+    def _autosave(self) -> None:
+        if not self.persist_path:
+            return
+        try:
+            self.save(self.persist_path)
+        except (OSError, sqlite3.Error) as e:
+            print(f"[Wakawave] Could not save LoRA index to {self.persist_path}: {e}")
+
+    @property
+    def last_refresh(self) -> Optional[Dict[str, Any]]:
+        """Stats of the most recent refresh() call, if any."""
+        return self._last_refresh
+
+    def _resolve(self, name: str) -> Optional[LoraEntry]:
+        """Find the winning entry for a relative name across roots (first root wins)."""
+        rel_dir = name.rpartition("/")[0]
+        for root in self._roots:
+            directory = os.path.join(root, *rel_dir.split("/")) if rel_dir else root
+            state = self._dirs.get(directory)
+            if state is not None and name in state.files:
+                return state.files[name]
+        return None
+
+    def _evict_tree(self, path: str, dirs: Dict[str, "_DirState"]) -> set:
+        """Remove a directory and its tracked subdirectories. Returns the affected names."""
+        state = dirs.pop(path, None)
+        if state is None:
+            return set()
+        names = set(state.files)
+        for subdir in state.subdirs:
+            names.update(self._evict_tree(subdir, dirs))
+        return names
+
+    def _rescan_dir(self, state: "_DirState", dirs: Dict[str, "_DirState"], verbose: bool) -> set:
+        """Re-list one changed directory in place. Returns the affected names."""
+        old_files = state.files
+        old_subdirs = set(state.subdirs)
+        visited = {other.key for other in dirs.values() if other.root == state.root}
+        new_state = self._list_dir(state.root, state.path, state.rel_dir, self._extensions, verbose)
+        if new_state is None:
+            return self._evict_tree(state.path, dirs)
+        dirs[state.path] = new_state
+
+        touched = set(old_files) | set(new_state.files)
+        for subdir in old_subdirs - set(new_state.subdirs):
+            touched.update(self._evict_tree(subdir, dirs))
+        for subdir, rel_dir in zip(new_state.subdirs, new_state.subdir_names):
+            if subdir in old_subdirs:
+                continue
+            new_dirs: Dict[str, _DirState] = {}
+            self._scan_tree(state.root, subdir, rel_dir, self._extensions, new_dirs, visited, verbose)
+            for sub_state in new_dirs.values():
+                touched.update(sub_state.files)
+            dirs.update(new_dirs)
+        # Subdirectories that turned out to be symlink loops are not tracked
+        new_state.subdirs = [d for d in new_state.subdirs if d in dirs]
+        return touched
+
+    def _scan_tree(self, root: str, directory: str, rel_dir: str, extensions: set,
+                   dirs: Dict[str, "_DirState"], visited: set, verbose: bool) -> None:
+        """Recursively list directory and everything below it into dirs."""
+        state = self._list_dir(root, directory, rel_dir, extensions, verbose)
+        if state is None or state.key in visited:
+            return  # Unreadable, or a symlink loop
+        visited.add(state.key)
+        dirs[directory] = state
+        for subdir, sub_rel in zip(state.subdirs, state.subdir_names):
+            self._scan_tree(root, subdir, sub_rel, extensions, dirs, visited, verbose)
+        state.subdirs = [d for d in state.subdirs if d in dirs]
+
+    @staticmethod
+    def _list_dir(root: str, directory: str, rel_dir: str, extensions: set,
+                  verbose: bool) -> Optional["_DirState"]:
+        """List a single directory (non-recursive) into a _DirState.
+
+        File stats run in parallel for large directories, which hides
+        per-call latency on network mounts.
+        """
+        try:
+            st = os.stat(directory)
+            with os.scandir(directory) as it:
+                dir_entries = list(it)
+        except OSError as e:
+            print(f"[Wakawave] Error scanning {directory}: {e}")
+            return None
+
+        state = _DirState(directory, root, rel_dir, st.st_mtime, (st.st_dev, st.st_ino))
+        candidates = []
+        for dir_entry in dir_entries:
+            rel_name = f"{rel_dir}/{dir_entry.name}" if rel_dir else dir_entry.name
+            try:
+                if dir_entry.is_dir(follow_symlinks=True):
+                    state.subdirs.append(dir_entry.path)
+                    state.subdir_names.append(rel_name)
+                    continue
+                if not dir_entry.is_file(follow_symlinks=True):
+                    continue
+            except OSError as e:
+                if verbose:
+                    print(f"[Wakawave] Error caching {rel_name}: {e}")
+                continue
+            if extensions and os.path.splitext(dir_entry.name)[1].lower() not in extensions:
+                continue
+            candidates.append((rel_name, dir_entry))
+
+        for (rel_name, dir_entry), file_st in zip(candidates, _parallel_stat([e for _, e in candidates])):
+            if isinstance(file_st, OSError):
+                if verbose:
+                    print(f"[Wakawave] Error caching {rel_name}: {file_st}")
+                continue
+            state.files[rel_name] = LoraEntry(rel_name, dir_entry.path, root, file_st.st_size,
+                                              file_st.st_mtime, file_st.st_ino)
+            if verbose:
+                print(f"[Wakawave]   Cached: '{rel_name}' = {file_st.st_size} bytes")
+        return state
+
+
+class _DirState:
+    """Listing of one indexed directory, used for mtime-based change detection."""
+
+    __slots__ = ("path", "root", "rel_dir", "mtime", "key", "files", "subdirs", "subdir_names")
+
+    def __init__(self, path: str, root: str, rel_dir: str, mtime: float, key: Tuple[int, int]):
+        self.path = path
+        self.root = root
+        self.rel_dir = rel_dir
+        self.mtime = mtime
+        self.key = key  # (st_dev, st_ino), for symlink loop detection
+        self.files: Dict[str, LoraEntry] = {}
+        self.subdirs: List[str] = []
+        self.subdir_names: List[str] = []
+
+
+class LoraIndexRefresher:
+    """Background thread that calls LoraIndex.refresh() once on start and then every interval seconds."""
+
+    def __init__(self, index: LoraIndex, interval: float, initial: bool = False):
+        self.index = index
+        self.interval = interval
+        self.initial = initial
+        self.initial_stats: Optional[Dict[str, Any]] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running or (self.interval <= 0 and not self.initial):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="WakawaveLoraRefresher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        if self.initial:
+            self.initial = False
+            self.initial_stats = self._refresh_once()
+        while self.interval > 0 and not self._stop.wait(self.interval):
+            self._refresh_once()
+
+    def _refresh_once(self) -> Optional[Dict[str, Any]]:
+        try:
+            stats = self.index.refresh()
+            if stats["added"] or stats["updated"] or stats["removed"]:
+                print(f"[Wakawave] LoRA index refreshed: +{stats['added']} ~{stats['updated']} "
+                      f"-{stats['removed']} ({stats['changed_dirs']} changed dirs, {stats['seconds']}s)")
+            return stats
+        except Exception as e:
+            print(f"[Wakawave] Error refreshing LoRA index: {e}")
+            return None
+
+
+# Shared index instance used by the API routes and the loader node
+_lora_index = LoraIndex()
+
+
+def get_lora_index() -> LoraIndex:
+    """Return the process-wide LoRA index."""
+    return _lora_index
+
+
+_refresher: Optional[LoraIndexRefresher] = None
+
+# Timing breakdown of initialize_lora_index(), reported by the debug endpoint
+startup_timings: Dict[str, Any] = {}
+
+
+def start_background_refresh(interval: float, initial: bool = False) -> Optional[LoraIndexRefresher]:
+    """Start (once) the background refresher for the shared index.
+
+    With initial=True the index is refreshed right away on the background
+    thread; interval <= 0 disables the periodic refreshes.
+    """
+    global _refresher
+    if interval <= 0 and not initial:
+        return None
+    if _refresher is None:
+        _refresher = LoraIndexRefresher(_lora_index, interval, initial)
+    else:
+        _refresher.interval = interval
+        _refresher.initial = _refresher.initial or initial
+    _refresher.start()
+    return _refresher
+
+
+def get_refresher() -> Optional[LoraIndexRefresher]:
+    return _refresher
+
+
+def initialize_lora_index(persist_path: Optional[str], interval: float,
+                          skip_startup_scan: bool = False, verbose: bool = False,
+                          root_timeout: float = 30.0) -> Dict[str, Any]:
+    """Bring up the shared index at server start without blocking on a full walk when possible.
+
+    1. Load the persisted index from persist_path (if any) - validated in the background
+    2. Otherwise scan synchronously, unless skip_startup_scan defers the scan to the background
+    3. Start the periodic refresher
+
+    Safe to call more than once; only the first call does any work.
+    Returns the startup timing breakdown.
+    """
+    if startup_timings:
+        return startup_timings
+
+    started = time.perf_counter()
+    _lora_index.persist_path = persist_path
+    _lora_index.root_timeout = root_timeout
+
+    loaded = False
+    if persist_path:
+        t0 = time.perf_counter()
+        loaded = _lora_index.load(persist_path)
+        startup_timings["load_seconds"] = round(time.perf_counter() - t0, 4)
+
+    if loaded:
+        startup_timings["source"] = "persisted"
+        startup_timings["entries"] = len(_lora_index)
+        start_background_refresh(interval, initial=True)
+    elif skip_startup_scan:
+        startup_timings["source"] = "deferred"
+        start_background_refresh(interval, initial=True)
+    else:
+        t0 = time.perf_counter()
+        startup_timings["entries"] = _lora_index.scan(verbose=verbose)
+        startup_timings["source"] = "scan"
+        startup_timings["scan_seconds"] = round(time.perf_counter() - t0, 4)
+        startup_timings["roots"] = _lora_index.root_status
+        start_background_refresh(interval)
+
+    startup_timings["blocking_seconds"] = round(time.perf_counter() - started, 4)
+    return startup_timings
@@ -6,10 +6,88 @@ Adapted from ND Super Nodes UI, outputs WANVIDLORA for WanVideo
 
 import os
 import json
-import folder_paths  # type: ignore
-from pathlib import Path
+import hashlib
 from typing import Union, Dict, Any, Tuple, List
 
+from .WanVideoWakawaveLoraIndex import get_lora_index
+from .WanVideoWakawaveSafetensors import get_header_info, read_safetensors_header, summarize_header, SafetensorsHeaderError
+from .WanVideoWakawaveLoraMerge import can_merge, merge_lora_stack, LoraMergeError
+from .WanVideoWakawavePrefetch import get_prefetcher
+from .WanVideoWakawaveLoraSearch import get_search_index
+from .WanVideoWakawaveLoraSlim import (
+    parse_blocks, parse_layer_filter, file_blocks, filtered_tensor_bytes, extract_slim_lora
+)
+from .WanVideoWakawaveLoraDtype import resolve_target_dtype, wide_tensor_bytes, convert_lora
+from .WanVideoWakawaveArch import get_arch_signature, check_compatibility, variant_names
+from .WanVideoWakawavePresets import PresetError, is_preset_reference, resolve_lora_reference
+
+try:
+    import psutil  # type: ignore
+except ImportError:
+    psutil = None
+
+# What the architecture check does with mismatching LoRAs unless the options node says otherwise
+DEFAULT_ON_MISMATCH = "skip"
+
+
+def _available_system_memory() -> int:
+    """Currently available system RAM in bytes (0 if it cannot be determined)."""
+    if psutil is not None:
+        return int(psutil.virtual_memory().available)
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return 0
+
+
+class WanVideoWakawaveLoraOptions:
+    """
+    WanVideo Wakawave LoRA Options
+
+    Optional settings for the Wakawave LoRA Loader, passed through its
+    "options" input so the loader's custom UI stays uncluttered.
+    """
+
+    CATEGORY = "WanVideo/Loaders"
+    RETURN_TYPES = ("WAKAWAVELORAOPTS",)
+    RETURN_NAMES = ("options",)
+    FUNCTION = "get_options"
+    DESCRIPTION = "Settings for the Wakawave LoRA Loader (memory budget, stack merging, ...)"
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "memory_budget_gb": ("FLOAT", {"default": 0.0, "min": 0.0, "max": 4096.0, "step": 0.5,
+                                               "tooltip": "Max memory for the LoRA stack in GB (0 = no limit)"}),
+                "memory_budget_percent": ("FLOAT", {"default": 0.0, "min": 0.0, "max": 100.0, "step": 1.0,
+                                                    "tooltip": "Max memory as % of currently available system RAM (0 = no limit). The smaller budget wins if both are set"}),
+                "over_budget": (["low_mem_load", "fail"], {"default": "low_mem_load",
+                                                           "tooltip": "low_mem_load: switch the largest LoRAs to low_mem_load until the stack fits; fail: stop before anything is loaded"}),
+                "merge_stack": ("BOOLEAN", {"default": False,
+                                            "tooltip": "Merge the whole stack into one cached delta file (built once per files + strengths + order) and output a single LoRA"}),
+                "prefetch": ("BOOLEAN", {"default": True,
+                                         "tooltip": "Read the LoRA files into the OS page cache in the background so the WanVideo loader doesn't wait on cold disk reads"}),
+                "canonicalize_stack": ("BOOLEAN", {"default": False,
+                                                   "tooltip": "Combine the whole chain (prev_lora + this node): merge duplicate files by adding their strengths, drop entries with zero net strength, and sort into a stable order"}),
+                "extract_filtered": ("BOOLEAN", {"default": False,
+                                                 "tooltip": "For LoRAs with blocks/layer_filter, write (and cache) a slim copy with only the selected tensors and load that instead of the full file"}),
+                "target_model": (["any"] + variant_names(), {"default": "any",
+                                                             "tooltip": "Wan variant the LoRAs will be applied to. Each LoRA's tensor names and shapes (header only) are checked against it before loading; 'any' only rejects LoRAs for other model families"}),
+                "on_mismatch": (["skip", "fail", "warn"], {"default": DEFAULT_ON_MISMATCH,
+                                                           "tooltip": "What to do with LoRAs that don't fit target_model: skip them, stop before anything is loaded, or only report"}),
+                "convert_dtype": (["default", "off", "fp16", "bf16"], {"default": "default",
+                                                                      "tooltip": "Convert fp32 LoRAs once into a cached fp16/bf16 copy and load that (halves disk reads and host RAM). default: the WAKAWAVE_CONVERT_DTYPE setting"}),
+            },
+        }
+
+    def get_options(self, **kwargs) -> Tuple[Dict[str, Any]]:
+        return (dict(kwargs),)
+
 
 class WanVideoWakawaveLoraLoader:
     """
@@ -41,64 +119,22 @@ class WanVideoWakawaveLoraLoader:
     def get_lora_file_sizes(lora_names: list) -> dict:
         """Get file sizes for a list of LoRA names.
         
-        Uses ComfyUI's folder_names_and_paths which respects extra_model_paths.yaml
+        Looks names up in the shared LoRA index, which covers every directory in
+        ComfyUI's folder_names_and_paths (including extra_model_paths.yaml)
         
         Args:
-            lora_names: List of LoRA filenames (e.g., ["model.safetensors", "lora.safetensors"])
+            lora_names: List of LoRA names (e.g., ["model.safetensors", "style/lora.safetensors"])
             
         Returns:
-            Dictionary mapping lora_name to file_size in bytes
+            Dictionary mapping lora_name to file_size in bytes (0 if not found)
         """
+        index = get_lora_index()
         sizes = {}
-        
-        # Collect all possible loras directories from ComfyUI's configuration
-        loras_dirs = []
-        
-        # Use ComfyUI's folder_names_and_paths which is populated from extra_model_paths.yaml
-        if hasattr(folder_paths, 'folder_names_and_paths') and 'loras' in folder_paths.folder_names_and_paths:
-            paths_tuple = folder_paths.folder_names_and_paths['loras']
-            if isinstance(paths_tuple, (tuple, list)):
-                # Extract the paths list (first element of tuple)
-                paths_list = paths_tuple[0] if isinstance(paths_tuple[0], (list, tuple)) else paths_tuple
-                if isinstance(paths_list, (list, tuple)):
-                    loras_dirs.extend(paths_list)
-        
-        # Fallback to default directory
-        if not loras_dirs:
-            default_loras_dir = os.path.join(folder_paths.models_dir, "loras")
-            if os.path.exists(default_loras_dir):
-                loras_dirs.append(default_loras_dir)
-        
-        # Now search for each lora file in all directories
         for lora_name in lora_names:
             if not lora_name or lora_name == "None":
                 continue
-            
-            found = False
-            
-            # First try ComfyUI's built-in path resolver
-            try:
-                lora_path = folder_paths.get_full_path("loras", lora_name)
-                if os.path.isfile(lora_path):
-                    sizes[lora_name] = os.path.getsize(lora_path)
-                    found = True
-            except:
-                pass
-            
-            # If not found, try searching in all collected directories
-            if not found:
-                for loras_dir in loras_dirs:
-                    if os.path.exists(loras_dir):
-                        lora_path = os.path.join(loras_dir, lora_name)
-                        if os.path.isfile(lora_path):
-                            sizes[lora_name] = os.path.getsize(lora_path)
-                            found = True
-                            break
-            
-            # If still not found, set size to 0
-            if not found:
-                sizes[lora_name] = 0
-        
+            entry = index.lookup(lora_name)
+            sizes[lora_name] = entry.size if entry is not None else 0
         return sizes
 
     @classmethod
@@ -107,6 +143,7 @@ class WanVideoWakawaveLoraLoader:
             "required": {},
             "optional": {
                 "prev_lora": ("WANVIDLORA",),
+                "options": ("WAKAWAVELORAOPTS", {"tooltip": "Settings from a Wakawave LoRA Options node"}),
             },
             "hidden": {
                 # Frontend provides JSON array of lora configs
@@ -115,7 +152,306 @@ class WanVideoWakawaveLoraLoader:
             }
         }
 
-    def load_loras(self, prev_lora=None, lora_bundle: Union[str, None] = None, **kwargs) -> Tuple[List]:
+    @staticmethod
+    def _memory_budget(options: Dict[str, Any]) -> int:
+        """Resolve the options' memory budget to bytes (0 = no budget)."""
+        budgets = []
+        try:
+            budget_gb = float(options.get("memory_budget_gb", 0) or 0)
+            budget_percent = float(options.get("memory_budget_percent", 0) or 0)
+        except (ValueError, TypeError):
+            print("  ⚠️  Invalid memory budget option, ignoring")
+            return 0
+        if budget_gb > 0:
+            budgets.append(int(budget_gb * 1024 ** 3))
+        if budget_percent > 0:
+            available = _available_system_memory()
+            if available:
+                budgets.append(int(available * budget_percent / 100))
+            else:
+                print("  ⚠️  Could not determine available memory, ignoring memory_budget_percent")
+        return min(budgets) if budgets else 0
+
+    @staticmethod
+    def _memory_footprint(item: Dict[str, Any]) -> Tuple[int, int]:
+        """Estimate (full_bytes, low_mem_peak_bytes) for a WANVIDLORA item.
+
+        Uses tensor shapes x dtype from the safetensors header; low_mem_load
+        streams weights, so its peak is approximated by the largest tensor.
+        With blocks/layer_filter set, only the tensors that survive the filter
+        count. Falls back to the file size when no header is available.
+        """
+        file_size = int(item.get("file_size", 0) or 0)
+        path = str(item.get("path", ""))
+        if (item.get("blocks") or item.get("layer_filter")) and path.endswith(".safetensors"):
+            try:
+                return filtered_tensor_bytes(path, parse_blocks(item.get("blocks")),
+                                             parse_layer_filter(item.get("layer_filter")))
+            except (OSError, ValueError):
+                return file_size, file_size
+        index = get_lora_index()
+        entry = index.lookup(item.get("name", "")) if item.get("name") else None
+        if entry is not None and entry.path == path:
+            info = get_header_info(index, entry)
+        elif path.endswith(".safetensors"):
+            # Not an indexed LoRA (e.g. a merged stack) - read its header directly
+            try:
+                info = summarize_header(read_safetensors_header(path))
+            except (OSError, SafetensorsHeaderError):
+                return file_size, file_size
+        else:
+            return file_size, file_size
+        if "error" in info:
+            return file_size, file_size
+        return info["tensor_bytes"], info.get("max_tensor_bytes", info["tensor_bytes"])
+
+    def _apply_memory_budget(self, lora_list: List[Dict[str, Any]], options: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Fit the stack into the memory budget before anything is loaded.
+
+        Switches the largest entries to low_mem_load until the estimate fits,
+        or raises with a per-LoRA report when over_budget is "fail".
+        """
+        budget = self._memory_budget(options)
+        if not budget:
+            return lora_list
+
+        footprints = [self._memory_footprint(item) for item in lora_list]
+
+        def resident(i):
+            return footprints[i][1] if lora_list[i].get("low_mem_load") else footprints[i][0]
+
+        total = sum(resident(i) for i in range(len(lora_list)))
+        print(f"🧮 Memory estimate: {self._format_file_size(total)} | Budget: {self._format_file_size(budget)}")
+        if total <= budget:
+            return lora_list
+
+        if options.get("over_budget") == "fail":
+            lines = [f"  - {item.get('name', '?')}: {self._format_file_size(footprints[i][0])}"
+                     f"{' (low_mem_load)' if item.get('low_mem_load') else ''}"
+                     for i, item in enumerate(lora_list)]
+            raise ValueError(
+                f"LoRA stack needs an estimated {self._format_file_size(total)} but the memory budget is "
+                f"{self._format_file_size(budget)}:\n" + "\n".join(lines))
+
+        # Largest savings first; items are copied so upstream outputs are never mutated
+        lora_list = list(lora_list)
+        for i in sorted(range(len(lora_list)), key=lambda i: footprints[i][0] - footprints[i][1], reverse=True):
+            if total <= budget:
+                break
+            if lora_list[i].get("low_mem_load"):
+                continue
+            total -= footprints[i][0] - footprints[i][1]
+            lora_list[i] = {**lora_list[i], "low_mem_load": True}
+            print(f"  🪶 low_mem_load: {lora_list[i].get('name', '?')[:50]} "
+                  f"(saves ~{self._format_file_size(footprints[i][0] - footprints[i][1])})")
+
+        if total > budget:
+            print(f"  ⚠️  Stack still exceeds the budget with every LoRA on low_mem_load "
+                  f"({self._format_file_size(total)} > {self._format_file_size(budget)})")
+        return lora_list
+
+    def _check_architecture(self, lora_list: List[Dict[str, Any]], target: str, on_mismatch: str) -> List[Dict[str, Any]]:
+        """
+        Pre-flight check of every entry against the target Wan variant, from the
+        safetensors header alone (signatures are cached in the LoRA index).
+        Mismatches are skipped, reported, or raise before any file is loaded.
+        """
+        index = get_lora_index()
+        kept = []
+        mismatches = []
+        for item in lora_list:
+            path = str(item.get("path", ""))
+            entry = index.lookup(item.get("name", "")) if item.get("name") else None
+            if entry is not None and entry.path != path:
+                entry = None
+            ok, reason = check_compatibility(get_arch_signature(index, entry, path), target)
+            if ok:
+                kept.append(item)
+            else:
+                mismatches.append(f"{item.get('name', '?')}: {reason}")
+
+        if not mismatches:
+            return lora_list
+        if on_mismatch == "fail":
+            raise ValueError(f"{len(mismatches)} LoRA(s) don't fit {target}:\n"
+                             + "\n".join(f"  - {line}" for line in mismatches))
+        print(f"🚫 {len(mismatches)} LoRA(s) don't fit {target}"
+              f"{' (skipped)' if on_mismatch == 'skip' else ''}:")
+        for line in mismatches:
+            print(f"  - {line}")
+        return kept if on_mismatch == "skip" else lora_list
+
+    def _canonicalize_stack(self, lora_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Equivalent, minimal form of the stack: entries for the same file with the
+        same block/layer filters are combined by adding their strengths, entries
+        whose net strength is zero are dropped, and the rest are sorted by name
+        and path, so chains that load the same thing produce identical outputs.
+        """
+        combined: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+        for item in lora_list:
+            key = (os.path.normpath(item.get("path", "")),
+                   json.dumps(item.get("blocks") or {}, sort_keys=True, default=str),
+                   json.dumps(item.get("layer_filter") or "", default=str))
+            existing = combined.get(key)
+            if existing is None:
+                combined[key] = dict(item)  # Copied so upstream outputs are never mutated
+            else:
+                existing["strength"] = existing.get("strength", 1.0) + item.get("strength", 1.0)
+                existing["low_mem_load"] = bool(existing.get("low_mem_load") or item.get("low_mem_load"))
+
+        canonical = sorted((item for item in combined.values() if abs(item.get("strength", 1.0)) > 1e-6),
+                           key=lambda item: (item.get("name", ""), item.get("path", "")))
+        for item in canonical:
+            item["strength"] = round(item.get("strength", 1.0), 6)  # Float sums of equal stacks compare equal
+
+        saved_entries = len(lora_list) - len(canonical)
+        if saved_entries:
+            saved_bytes = (sum(item.get("file_size", 0) for item in lora_list)
+                           - sum(item.get("file_size", 0) for item in canonical))
+            print(f"🧮 Canonicalized stack: {len(lora_list)} → {len(canonical)} entries "
+                  f"(saves {saved_entries} load(s), {self._format_file_size(saved_bytes)})")
+        return canonical
+
+    @staticmethod
+    def _config_strength(config: Dict[str, Any]) -> Tuple[float, Union[str, None]]:
+        """
+        Strength of a bundle entry, clamped to [-2.0, 2.0]. Negative strengths
+        are kept (so opposite entries can cancel when canonicalized) and 0
+        means the entry is disabled. Returns (strength, warning or None).
+        """
+        try:
+            strength = float(config.get('strength', config.get('strength_model', 1.0)))
+        except (ValueError, TypeError):
+            return 1.0, "Invalid strength value, using default 1.0"
+        # Validate strength is in reasonable range
+        if not -2.0 <= strength <= 2.0:
+            clamped = max(-2.0, min(2.0, strength))
+            return clamped, f"Strength {strength:.2f} out of range, clamping to {clamped:.2f}"
+        return strength, None
+
+    @staticmethod
+    def _parse_bundle(lora_bundle: str) -> Tuple[List[Any], str]:
+        """
+        Entries of a lora_bundle: a JSON list of entries, a dict of entries, or a
+        reference to a saved LoRA template, {"preset": "name", "overrides": {...}}
+        (overrides map a LoRA name to fields such as strength or enabled).
+        Returns (configs, source). Raises ValueError, json.JSONDecodeError or
+        PresetError when the bundle can't be used.
+        """
+        parsed = json.loads(lora_bundle)
+        if isinstance(parsed, list):
+            return parsed, "bundle"
+        if is_preset_reference(parsed):
+            return resolve_lora_reference(parsed), f"preset '{parsed['preset']}'"
+        if isinstance(parsed, dict):
+            return (list(parsed.values()) if parsed else []), "dict"
+        raise ValueError(f"lora_bundle has unexpected type: {type(parsed).__name__}")
+
+    @classmethod
+    def IS_CHANGED(cls, lora_bundle: Union[str, None] = None, **kwargs) -> str:
+        """
+        Fingerprint of what the bundle actually loads: the enabled entries after
+        normalisation (name, clamped strength, in order) plus the (size, mtime)
+        of each resolved file. Key order, whitespace and UI-only fields
+        (trigger words, tags, disabled rows) don't change it; overwriting a
+        LoRA file on disk, or editing a referenced preset, does.
+        """
+        try:
+            configs = cls._parse_bundle(lora_bundle)[0] if isinstance(lora_bundle, str) and lora_bundle.strip() else []
+        except ValueError:
+            return lora_bundle or ""
+
+        index = get_lora_index()
+        stack = []
+        for config in configs:
+            if not isinstance(config, dict) or not bool(config.get('enabled', config.get('on', False))):
+                continue
+            lora_name = config.get('lora', 'None')
+            if not lora_name or lora_name == "None" or not isinstance(lora_name, str):
+                continue
+            entry = index.lookup(lora_name, verify=True)
+            file_state = [entry.path, entry.size, entry.mtime] if entry is not None else None
+            stack.append([lora_name, cls._config_strength(config)[0], file_state,
+                          config.get('blocks') or None, config.get('layer_filter') or None])
+        return hashlib.sha256(json.dumps(stack, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+    def _extract_filtered(self, lora_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Swap every block/layer-filtered safetensors entry for a cached slim copy holding only its kept tensors."""
+        result = []
+        for item in lora_list:
+            if not (item.get("blocks") or item.get("layer_filter")) or not str(item.get("path", "")).endswith(".safetensors"):
+                result.append(item)
+                continue
+            try:
+                slim_path, slim_key, cache_hit = extract_slim_lora(item)
+            except (OSError, ValueError) as e:
+                print(f"  ⚠️  Could not extract {item.get('name', '?')}, loading it with filters instead: {e}")
+                result.append(item)
+                continue
+            slim = {**item, "path": slim_path, "blocks": {}, "layer_filter": "",
+                    "file_size": os.path.getsize(slim_path), "extracted_from": item["path"], "content_hash": slim_key}
+            slim["memory_estimate"] = self._memory_footprint(slim)[0]
+            print(f"  ✂️  {item.get('name', '?')[:50]}: {self._format_file_size(item.get('file_size', 0))} → "
+                  f"{self._format_file_size(slim['file_size'])} ({'cache hit' if cache_hit else 'extracted'})")
+            result.append(slim)
+        return result
+
+    def _convert_dtype(self, lora_list: List[Dict[str, Any]], target: str) -> List[Dict[str, Any]]:
+        """Swap every entry stored as fp32/fp64 for a cached copy converted to target (fp16 or bf16)."""
+        result = []
+        saved = 0
+        for item in lora_list:
+            if not wide_tensor_bytes(item):
+                result.append(item)
+                continue
+            try:
+                converted_path, converted_key, cache_hit = convert_lora(item, target)
+            except (OSError, ValueError, RuntimeError) as e:
+                print(f"  ⚠️  Could not convert {item.get('name', '?')} to {target}, loading the original: {e}")
+                result.append(item)
+                continue
+            converted = {**item, "path": converted_path, "file_size": os.path.getsize(converted_path),
+                         "converted_from": item["path"], "content_hash": converted_key}
+            converted["memory_estimate"] = self._memory_footprint(converted)[0]
+            saved += item.get("file_size", 0) - converted["file_size"]
+            print(f"  🔻 {item.get('name', '?')[:50]}: fp32 → {target}, {self._format_file_size(item.get('file_size', 0))} → "
+                  f"{self._format_file_size(converted['file_size'])} ({'cache hit' if cache_hit else 'converted'})")
+            result.append(converted)
+        if saved > 0:
+            print(f"🔻 Dtype conversion saves {self._format_file_size(saved)} of reads per load")
+        return result
+
+    def _merge_stack(self, lora_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Replace the stack with a single cached merged LoRA, or leave it unchanged if it cannot be merged."""
+        mergeable, reason = can_merge(lora_list)
+        if not mergeable:
+            print(f"  ℹ️  Not merging stack: {reason}")
+            return lora_list
+        try:
+            merged_path, cache_hit = merge_lora_stack(lora_list)
+        except (LoraMergeError, OSError, RuntimeError) as e:
+            print(f"  ⚠️  Could not merge stack, loading LoRAs separately: {e}")
+            return lora_list
+
+        merged = {
+            "path": merged_path,
+            "strength": 1.0,  # Strengths are baked into the merged file
+            "name": f"wakawave_merged_{os.path.basename(merged_path)[:12]}",
+            "blocks": {},
+            "layer_filter": "",
+            "low_mem_load": any(item.get("low_mem_load") for item in lora_list),
+            "merge_loras": False,
+            "file_size": os.path.getsize(merged_path),
+            "merged_from": [item.get("name", "") for item in lora_list],
+        }
+        merged["memory_estimate"] = self._memory_footprint(merged)[0]
+        print(f"🧬 Merged {len(lora_list)} LoRAs into one ({'cache hit' if cache_hit else 'built'}): "
+              f"{self._format_file_size(merged['file_size'])}")
+        return [merged]
+
+    def load_loras(self, prev_lora=None, lora_bundle: Union[str, None] = None,
+                   options: Union[Dict[str, Any], None] = None, **kwargs) -> Tuple[List]:
         """
         Load multiple LoRAs from Wakawave bundle and return WANVIDLORA structure.
         """
@@ -136,16 +472,18 @@ class WanVideoWakawaveLoraLoader:
 
         if isinstance(lora_bundle, str) and lora_bundle.strip():
             try:
-                parsed = json.loads(lora_bundle)
-                if isinstance(parsed, list):
-                    lora_configs = parsed
-                elif isinstance(parsed, dict):
+                lora_configs, source = self._parse_bundle(lora_bundle)
+                if source == "dict":
                     print("⚠️  lora_bundle is a dict, converting to list")
-                    lora_configs = list(parsed.values()) if parsed else []
-                else:
-                    print(f"⚠️  lora_bundle has unexpected type: {type(parsed).__name__}")
+                elif source != "bundle":
+                    print(f"📚 Using saved {source}")
             except json.JSONDecodeError as e:
                 print(f"⚠️  Failed to parse lora_bundle JSON: {e}")
+            except PresetError as e:
+                # A missing template must not silently load an empty stack
+                raise ValueError(f"Wakawave LoRA Loader: {e}") from e
+            except ValueError as e:
+                print(f"⚠️  {e}")
         else:
             # Fallback: try kwargs (for testing)
             for key, val in kwargs.items():
@@ -154,6 +492,7 @@ class WanVideoWakawaveLoraLoader:
 
         print(f"📦 Parsed {len(lora_configs)} LoRA configs from bundle")
 
+        index = get_lora_index()
         enabled_count = 0
 
         for idx, config in enumerate(lora_configs):
@@ -172,61 +511,83 @@ class WanVideoWakawaveLoraLoader:
                 continue
 
             # Get strength
+            strength, warning = self._config_strength(config)
+            if warning:
+                print(f"  ⚠️  {warning}")
+            if strength == 0:
+                print(f"  🚫 Skipping {lora_name}: strength 0")
+                continue
+
+            # Optional per-LoRA block selection ("0-9, 20") and layer names to leave out
             try:
-                strength = float(config.get('strength', config.get('strength_model', 1.0)))
-                # Validate strength is in reasonable range
-                if strength <= 0 or strength > 2.0:
-                    print(f"  ⚠️  Strength {strength:.2f} out of range, clamping to 1.0")
-                    strength = max(0.1, min(2.0, strength))
-            except (ValueError, TypeError):
-                print(f"  ⚠️  Invalid strength value, using default 1.0")
-                strength = 1.0
-
-            # Build LoRA path using ComfyUI's proper path resolver
-            try:
-                lora_path = folder_paths.get_full_path("loras", lora_name)
-            except:
-                # Fallback with path traversal protection
-                lora_path = os.path.join(folder_paths.models_dir, "loras", lora_name)
-                # Resolve to absolute path and verify it's within loras directory
-                loras_dir = Path(folder_paths.models_dir) / "loras"
-                try:
-                    resolved_path = Path(lora_path).resolve()
-                    if not resolved_path.is_relative_to(loras_dir):
-                        print(f"  ⚠️  Security: Rejected path outside loras directory: {lora_name}")
-                        continue
-                    lora_path = str(resolved_path)
-                except (ValueError, OSError) as e:
-                    print(f"  ⚠️  Invalid path: {lora_name} - {e}")
-                    continue
-
-            if lora_path and os.path.exists(lora_path):
-                # Get file size in bytes
-                file_size = os.path.getsize(lora_path) if os.path.isfile(lora_path) else 0
-                
-                lora_list.append({
-                    "path": lora_path,
+                blocks = parse_blocks(config.get('blocks'))
+                layer_filter = parse_layer_filter(config.get('layer_filter'))
+            except (ValueError, TypeError) as e:
+                print(f"  ⚠️  Ignoring blocks/layer_filter of {lora_name}: {e}")
+                blocks, layer_filter = {}, []
+
+            # Resolve through the LoRA index (falls back to ComfyUI's path resolver)
+            entry = index.lookup(lora_name, verify=True)
+
+            if entry is not None:
+                if layer_filter and not blocks and entry.path.endswith(".safetensors"):
+                    # WanVideo only applies layer_filter together with a block selection
+                    try:
+                        blocks = file_blocks(entry.path)
+                    except (OSError, ValueError) as e:
+                        print(f"  ⚠️  Could not read blocks of {lora_name}, ignoring layer_filter: {e}")
+                        layer_filter = []
+                item = {
+                    "path": entry.path,
                     "strength": strength,
                     "name": lora_name,
-                    "blocks": {},  # Empty dict - no block filtering
-                    "layer_filter": "",  # Empty string - no layer filtering
+                    "blocks": blocks,  # {"blocks.N.": True} - empty means every block
+                    "layer_filter": layer_filter or "",  # Layer name fragments to leave out
                     "low_mem_load": False,  # Don't use low mem mode
                     "merge_loras": False,  # Tell WanVideoSetLoRAs not to merge
-                    "file_size": file_size  # Add file size in bytes
-                })
+                    "file_size": entry.size  # Add file size in bytes
+                }
+                item["memory_estimate"] = self._memory_footprint(item)[0]  # Estimated bytes once loaded
+                lora_list.append(item)
                 enabled_count += 1
-                size_display = self._format_file_size(file_size)
-                print(f"  ✅ {enabled_count}. {lora_name[:50]:50s} @ {strength:.2f} ({size_display})")
+                size_display = self._format_file_size(entry.size)
+                filter_display = f" [{len(blocks)} blocks{', -' + ', -'.join(layer_filter) if layer_filter else ''}]" if blocks else ""
+                print(f"  ✅ {enabled_count}. {lora_name[:50]:50s} @ {strength:.2f} ({size_display}){filter_display}")
             else:
                 print(f"  ⚠️  LoRA not found: {lora_name}")
                 # Try to help debug
-                loras_dir = os.path.join(folder_paths.models_dir, "loras")
-                print(f"      Searched in: {loras_dir}")
-                # List similar files
-                if os.path.exists(loras_dir):
-                    similar = [f for f in os.listdir(loras_dir) if lora_name.split('.')[0].lower() in f.lower()]
-                    if similar:
-                        print(f"      Similar files found: {similar[:3]}")
+                print(f"      Searched in: {', '.join(index.roots) or 'no loras directories'}")
+                # Suggest similar indexed files
+                similar = get_search_index().similar(lora_name)
+                if similar:
+                    print(f"      Similar files found: {similar}")
+
+        # Architecture pre-flight (needs an options node, so plain loads read no extra headers)
+        if options:
+            lora_list = self._check_architecture(lora_list, options.get("target_model", "any"),
+                                                 options.get("on_mismatch", DEFAULT_ON_MISMATCH))
+
+        if options and options.get("canonicalize_stack"):
+            lora_list = self._canonicalize_stack(lora_list)
+
+        if options and options.get("extract_filtered"):
+            lora_list = self._extract_filtered(lora_list)
+
+        target_dtype = resolve_target_dtype((options or {}).get("convert_dtype"))
+        if target_dtype != "off":
+            lora_list = self._convert_dtype(lora_list, target_dtype)
+
+        if options and options.get("merge_stack"):
+            lora_list = self._merge_stack(lora_list)
+
+        if options:
+            lora_list = self._apply_memory_budget(lora_list, options)
+
+        # Readahead is opt-in through the options node; plain loads behave as before
+        if options and options.get("prefetch", True):
+            prefetch = get_prefetcher().prefetch(item["path"] for item in lora_list)
+            if prefetch["queued"]:
+                print(f"📥 Prefetching {len(prefetch['queued'])} LoRA file(s) into the page cache")
 
         print("="*75)
         # Calculate total size of all loaded LoRAs
@@ -241,8 +602,10 @@ class WanVideoWakawaveLoraLoader:
 # Node registration
 NODE_CLASS_MAPPINGS = {
     "WanVideoWakawaveLoraLoader": WanVideoWakawaveLoraLoader,
+    "WanVideoWakawaveLoraOptions": WanVideoWakawaveLoraOptions,
 }
 
 NODE_DISPLAY_NAME_MAPPINGS = {
     "WanVideoWakawaveLoraLoader": "🌊 WanVideo Wakawave LoRA Loader",
+    "WanVideoWakawaveLoraOptions": "🌊 WanVideo Wakawave LoRA Options",
 }
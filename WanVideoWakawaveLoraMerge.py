@@ -0,0 +1,158 @@
+"""
+WanVideo Wakawave LoRA Stack Merge
+Deterministic CPU merge of a whole LoRA stack into one cached delta file
+"""
+
+import os
+import re
+import json
+import hashlib
+import threading
+from typing import Any, Dict, List, Tuple
+
+from .WanVideoWakawaveLoraIndex import get_lora_index
+from .WanVideoWakawaveHashing import get_hasher, sha256_file
+from .WanVideoWakawaveFileCache import get_file_cache
+
+# Bump when the merged file layout changes so old cache entries are not reused
+MERGE_FORMAT_VERSION = 1
+
+# <module>.<part> for every tensor kind the merge understands
+_PART_RE = re.compile(
+    r"^(?P<module>.+?)\.(?P<part>"
+    r"(?:lora_down|lora_A|lora\.down)(?:\.[A-Za-z_]+)?\.weight|"
+    r"(?:lora_up|lora_B|lora\.up)(?:\.[A-Za-z_]+)?\.weight|"
+    r"alpha|diff|diff_b)$"
+)
+
+
+class LoraMergeError(ValueError):
+    """Raised when a stack contains something that cannot be merged exactly."""
+
+
+def _part_kind(part: str) -> str:
+    if part in ("alpha", "diff", "diff_b"):
+        return part
+    return "down" if part.startswith(("lora_down", "lora_A", "lora.down")) else "up"
+
+
+# Hashes of files outside the LoRA index (merged stacks, ...), keyed by (path, size, mtime_ns)
+_unindexed_hashes: Dict[Tuple[str, int, int], str] = {}
+_unindexed_lock = threading.Lock()
+
+
+def content_hash(item: Dict[str, Any]) -> str:
+    """
+    Content identity of a WANVIDLORA item's file: the item's own content_hash
+    when a transform (slim extract, dtype conversion) swapped its path, else
+    the file's SHA-256 from the hash index, or hashed once per (path, size,
+    mtime) for files the index doesn't know.
+    """
+    if item.get("content_hash"):
+        return item["content_hash"]
+    index = get_lora_index()
+    entry = index.lookup(item.get("name", "")) if item.get("name") else None
+    if entry is not None and entry.path == item.get("path"):
+        return get_hasher().hash_now(entry)
+    st = os.stat(item["path"])
+    key = (item["path"], st.st_size, st.st_mtime_ns)
+    with _unindexed_lock:
+        cached = _unindexed_hashes.get(key)
+    if cached is None:
+        cached = sha256_file(item["path"])
+        with _unindexed_lock:
+            _unindexed_hashes[key] = cached
+    return cached
+
+
+def stack_cache_key(lora_list: List[Dict[str, Any]]) -> str:
+    """Cache key for a stack: hash of every file's (content hash, strength, position)."""
+    stack = [[position, content_hash(item), repr(float(item.get("strength", 1.0)))]
+             for position, item in enumerate(lora_list)]
+    payload = json.dumps({"version": MERGE_FORMAT_VERSION, "stack": stack}, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def can_merge(lora_list: List[Dict[str, Any]]) -> Tuple[bool, str]:
+    """Whether a stack can be merged into a single file (and why not)."""
+    if len(lora_list) < 2:
+        return False, "fewer than 2 LoRAs"
+    for item in lora_list:
+        if item.get("blocks") or item.get("layer_filter"):
+            return False, f"{item.get('name', '?')} uses block/layer filtering"
+        if not str(item.get("path", "")).endswith(".safetensors"):
+            return False, f"{item.get('name', '?')} is not a safetensors file"
+    return True, ""
+
+
+def merge_lora_files(items: List[Tuple[str, float]], out_path: str, metadata: Dict[str, str]) -> None:
+    """Merge (path, strength) LoRAs into one exact delta file at out_path.
+
+    Low-rank pairs targeting the same module are concatenated along the rank
+    dimension with strength * alpha / rank folded into the up matrix, so
+    up @ down equals the sum of the scaled deltas. Full diffs are summed.
+    The merged alpha equals the merged rank (scale 1.0). Math runs in float32
+    on CPU; output keeps the input dtype when all inputs agree, else float32.
+    """
+    import torch
+    from safetensors.torch import load_file, save_file
+
+    modules: Dict[str, Dict[str, Any]] = {}
+    dtypes = set()
+
+    for path, strength in items:
+        state_dict = load_file(path, device="cpu")
+        grouped: Dict[str, Dict[str, Any]] = {}
+        for key, tensor in state_dict.items():
+            match = _PART_RE.match(key)
+            if match is None:
+                raise LoraMergeError(f"unsupported tensor '{key}' in {path}")
+            grouped.setdefault(match.group("module"), {})[_part_kind(match.group("part"))] = tensor
+            if tensor.is_floating_point() and tensor.dim() > 0:
+                dtypes.add(tensor.dtype)
+
+        for module, parts in grouped.items():
+            merged = modules.setdefault(module, {"down": [], "up": [], "diff": None, "diff_b": None})
+            if ("down" in parts) != ("up" in parts):
+                raise LoraMergeError(f"module '{module}' in {path} has only one LoRA half")
+            if "down" in parts:
+                down = parts["down"].float()
+                rank = down.shape[0]
+                alpha = float(parts["alpha"].item()) if "alpha" in parts else float(rank)
+                merged["down"].append(down)
+                merged["up"].append(parts["up"].float() * (strength * alpha / rank))
+            for kind in ("diff", "diff_b"):
+                if kind in parts:
+                    scaled = parts[kind].float() * strength
+                    merged[kind] = scaled if merged[kind] is None else merged[kind] + scaled
+        del state_dict
+
+    out_dtype = dtypes.pop() if len(dtypes) == 1 else torch.float32
+    tensors = {}
+    for module in sorted(modules):
+        merged = modules[module]
+        if merged["down"]:
+            down = torch.cat(merged["down"], dim=0)
+            tensors[f"{module}.lora_down.weight"] = down.to(out_dtype).contiguous()
+            tensors[f"{module}.lora_up.weight"] = torch.cat(merged["up"], dim=1).to(out_dtype).contiguous()
+            tensors[f"{module}.alpha"] = torch.tensor(float(down.shape[0]))
+        for kind in ("diff", "diff_b"):
+            if merged[kind] is not None:
+                tensors[f"{module}.{kind}"] = merged[kind].to(out_dtype).contiguous()
+
+    save_file(tensors, out_path, metadata=metadata)
+
+
+def merge_lora_stack(lora_list: List[Dict[str, Any]]) -> Tuple[str, bool]:
+    """Return (merged file path, cache hit) for a stack, merging on a cache miss."""
+    cache = get_file_cache("merged")
+    key = stack_cache_key(lora_list)
+    hits_before = cache.hits
+    metadata = {
+        "wakawave_merge_version": str(MERGE_FORMAT_VERSION),
+        "wakawave_merged_from": json.dumps([[item.get("name", ""), float(item.get("strength", 1.0))]
+                                            for item in lora_list]),
+    }
+    path = cache.get_or_create(key, lambda tmp_path: merge_lora_files(
+        [(item["path"], float(item.get("strength", 1.0))) for item in lora_list], tmp_path, metadata))
+    return path, cache.hits > hits_before
@@ -0,0 +1,184 @@
+"""
+WanVideo Wakawave LoRA Search
+In-memory trigram + token-prefix search over the LoRA index, for the picker and missing-file suggestions
+"""
+
+import os
+import re
+import heapq
+import bisect
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .WanVideoWakawaveLoraIndex import LoraIndex, get_lora_index
+
+# Word separators in LoRA names: folders, underscores, dashes, dots, spaces
+_SEPARATOR_RE = re.compile(r"[\s/\\_\-.]+")
+
+# Extensions are noise for matching ("safetensors" would match every name)
+_EXTENSION_RE = re.compile(r"\.(safetensors|ckpt|pt|pth|bin|sft|gguf)$", re.IGNORECASE)
+
+# Fraction of the query's trigrams a name must share to count as a fuzzy match
+_MIN_TRIGRAM_OVERLAP = 0.5
+
+
+def _normalize(text: str) -> str:
+    """Lowercase, drop the extension and collapse separators to single spaces."""
+    return _SEPARATOR_RE.sub(" ", _EXTENSION_RE.sub("", text).lower()).strip()
+
+
+def _trigrams(text: str) -> Set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class LoraSearchIndex:
+    """
+    Trigram and token-prefix index over the names in a LoraIndex.
+
+    Synced lazily: every query compares the LoRA index's version with the
+    one last indexed and applies only the added/removed names, so keeping
+    up with a refresh costs a set difference rather than a rebuild.
+
+    Ranking, highest first: exact name (with or without its folder), name
+    starts with the query, query
+    is a substring, every query word prefixes a name word, then trigram
+    overlap. Ties go to shorter names, then alphabetical order.
+    """
+
+    def __init__(self, index: LoraIndex):
+        self.index = index
+        self._lock = threading.Lock()
+        self._version = -1
+        self._ids: Dict[str, int] = {}
+        self._names: Dict[int, str] = {}
+        self._keys: Dict[int, str] = {}
+        self._base_keys: Dict[int, str] = {}  # Normalized file name without folders
+        self._gram_counts: Dict[int, int] = {}
+        self._free_ids: List[int] = []
+        self._trigrams: Dict[str, Set[int]] = {}
+        self._tokens: List[Tuple[str, int]] = []  # Sorted (token, id) pairs for prefix lookups
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def sync(self) -> None:
+        """Apply names added to / removed from the LoRA index since the last sync."""
+        version = self.index.version
+        if version == self._version:
+            return
+        with self._lock:
+            if version == self._version:
+                return
+            current = {entry.name for entry in self.index.entries()}
+            removed = [name for name in self._ids if name not in current]
+            added = [name for name in current if name not in self._ids]
+            for name in removed:
+                self._remove(name)
+            if removed:
+                # Before adding, since added names may reuse the freed ids
+                self._tokens = [(token, i) for token, i in self._tokens if i in self._names]
+            for name in added:
+                self._add(name)
+            if added:
+                self._tokens.sort()
+            self._version = version
+
+    def _add(self, name: str) -> None:
+        i = self._free_ids.pop() if self._free_ids else len(self._ids) + len(self._free_ids)
+        key = _normalize(name)
+        self._ids[name] = i
+        self._names[i] = name
+        self._keys[i] = key
+        self._base_keys[i] = _normalize(name.rpartition("/")[2])
+        grams = _trigrams(key)
+        self._gram_counts[i] = len(grams)
+        for gram in grams:
+            self._trigrams.setdefault(gram, set()).add(i)
+        self._tokens.extend((token, i) for token in set(key.split()))
+
+    def _remove(self, name: str) -> None:
+        i = self._ids.pop(name)
+        del self._names[i]
+        del self._gram_counts[i]
+        del self._base_keys[i]
+        for gram in _trigrams(self._keys.pop(i)):
+            ids = self._trigrams.get(gram)
+            if ids is not None:
+                ids.discard(i)
+                if not ids:
+                    del self._trigrams[gram]
+        self._free_ids.append(i)
+
+    def _prefix_ids(self, prefix: str) -> Set[int]:
+        start = bisect.bisect_left(self._tokens, (prefix, -1))
+        ids = set()
+        for token, i in self._tokens[start:]:
+            if not token.startswith(prefix):
+                break
+            ids.add(i)
+        return ids
+
+    def search(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """Top-limit names for query as [{"name", "score"}], best first."""
+        self.sync()
+        q = _normalize(query)
+        if not q or limit <= 0:
+            return []
+        words = q.split()
+
+        with self._lock:
+            # Names where every query word prefixes some name word
+            prefix_ids: Optional[Set[int]] = None
+            for word in words:
+                ids = self._prefix_ids(word)
+                prefix_ids = ids if prefix_ids is None else prefix_ids & ids
+            prefix_ids = prefix_ids or set()
+
+            overlap: Counter = Counter()
+            grams = _trigrams(q) if len(q) >= 3 else set()
+            for gram in grams:
+                for i in self._trigrams.get(gram, ()):
+                    overlap[i] += 1
+
+            min_overlap = max(1, int(len(grams) * _MIN_TRIGRAM_OVERLAP)) if grams else 0
+            candidates = prefix_ids | {i for i, count in overlap.items() if count >= min_overlap}
+
+            scored = []
+            for i in candidates:
+                key = self._keys[i]
+                base = self._base_keys[i]
+                if base == q or key == q:
+                    score = 4.0
+                elif base.startswith(q) or key.startswith(q):
+                    score = 3.0
+                elif q in key:
+                    score = 2.0
+                elif i in prefix_ids:
+                    score = 1.0
+                else:
+                    score = 0.0
+                if grams:
+                    shared = overlap[i]
+                    score += shared / (self._gram_counts[i] + len(grams) - shared)  # Jaccard, in [0, 1]
+                scored.append((-score, len(base), self._names[i]))
+
+        best = heapq.nsmallest(limit, scored)
+        return [{"name": name, "score": round(-neg_score, 4)} for neg_score, _, name in best]
+
+    def similar(self, name: str, limit: int = 3) -> List[str]:
+        """Indexed names that look like name (used to suggest fixes for a missing LoRA)."""
+        stem = os.path.splitext(os.path.basename(name))[0]
+        return [hit["name"] for hit in self.search(stem, limit) if hit["name"] != name]
+
+
+_search_index: Optional[LoraSearchIndex] = None
+
+
+def get_search_index() -> LoraSearchIndex:
+    """Return the process-wide search index over the shared LoRA index."""
+    global _search_index
+    if _search_index is None:
+        _search_index = LoraSearchIndex(get_lora_index())
+    return _search_index
@@ -0,0 +1,178 @@
+"""
+WanVideo Wakawave Slim LoRA Extraction
+Block/layer-filtered copies of LoRA files, written by byte-range copy and cached on disk
+"""
+
+import re
+import json
+import struct
+import hashlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from .WanVideoWakawaveSafetensors import read_safetensors_header, tensor_specs, tensor_nbytes
+from .WanVideoWakawaveLoraMerge import content_hash
+from .WanVideoWakawaveFileCache import get_file_cache
+
+# Bump when the slim file layout or the filter rules change so old cache entries are not reused
+SLIM_FORMAT_VERSION = 1
+
+# Transformer block index in a tensor name ("diffusion_model.blocks.12.self_attn..." or "lora_unet_blocks_12_...")
+_BLOCK_RE = re.compile(r"(?:^|[._])blocks[._](\d+)(?=[._])")
+
+# "0-9, 20" style block lists
+_BLOCK_RANGE_RE = re.compile(r"^(\d+)\s*(?:-\s*(\d+))?$")
+
+_COPY_CHUNK = 8 * 1024 * 1024
+
+
+def parse_blocks(value: Any) -> Dict[str, bool]:
+    """
+    WanVideo's {"blocks.N.": True} mapping from a bundle's blocks field, which
+    may be a string ("0-9, 20"), a list of indices, or that mapping itself.
+    Raises ValueError for anything else.
+    """
+    if not value:
+        return {}
+    if isinstance(value, dict):
+        indices = []
+        for key, enabled in value.items():
+            if not enabled:
+                continue
+            key = str(key)
+            index = int(key) if key.isdigit() else block_index(key.rstrip(".") + ".")
+            if index is None:
+                raise ValueError(f"invalid block key '{key}'")
+            indices.append(index)
+    elif isinstance(value, str):
+        indices = []
+        for part in value.split(","):
+            part = part.strip()
+            if not part:
+                continue
+            match = _BLOCK_RANGE_RE.match(part)
+            if match is None:
+                raise ValueError(f"invalid block range '{part}'")
+            start, end = int(match.group(1)), int(match.group(2) or match.group(1))
+            indices.extend(range(min(start, end), max(start, end) + 1))
+    elif isinstance(value, list):
+        indices = [int(i) for i in value]
+    else:
+        raise ValueError(f"blocks must be a string, list or object, got {type(value).__name__}")
+    return {f"blocks.{i}.": True for i in sorted(set(indices))}
+
+
+def parse_layer_filter(value: Any) -> List[str]:
+    """Layer name fragments to leave out, from a comma-separated string or a list."""
+    if not value:
+        return []
+    parts = value.split(",") if isinstance(value, str) else [str(v) for v in value]
+    return [part.strip() for part in parts if part.strip()]
+
+
+def block_index(tensor_name: str) -> Optional[int]:
+    match = _BLOCK_RE.search(tensor_name)
+    return int(match.group(1)) if match else None
+
+
+def keep_tensor(tensor_name: str, blocks: Dict[str, bool], layer_filter: List[str]) -> bool:
+    """
+    Same rule as WanVideo's block filtering: tensors whose name contains a
+    layer_filter fragment are dropped, block tensors are kept only for
+    selected blocks, and tensors outside the blocks are always kept.
+    """
+    if any(fragment in tensor_name for fragment in layer_filter):
+        return False
+    index = block_index(tensor_name)
+    return index is None or not blocks or f"blocks.{index}." in blocks
+
+
+def file_blocks(path: str) -> Dict[str, bool]:
+    """Every block a LoRA file touches, as a WanVideo blocks mapping."""
+    indices = {block_index(name) for name in tensor_specs(read_safetensors_header(path))}
+    return {f"blocks.{i}.": True for i in sorted(i for i in indices if i is not None)}
+
+
+def filtered_tensor_bytes(path: str, blocks: Dict[str, bool], layer_filter: List[str]) -> Tuple[int, int]:
+    """(total, largest) tensor bytes left after filtering, from the header alone."""
+    sizes = [tensor_nbytes(spec) for name, spec in tensor_specs(read_safetensors_header(path)).items()
+             if keep_tensor(name, blocks, layer_filter)]
+    return sum(sizes), max(sizes, default=0)
+
+
+def extract_tensors(path: str, out_path: str, blocks: Dict[str, bool], layer_filter: List[str],
+                    metadata: Optional[Dict[str, str]] = None) -> Tuple[int, int]:
+    """
+    Write a safetensors file with only the kept tensors of path.
+
+    Tensor bytes are copied range by range from the source, so nothing is
+    deserialized and the work scales with the kept tensors only. Returns
+    (tensors kept, tensors in the source).
+    """
+    header = read_safetensors_header(path)
+    specs = tensor_specs(header)
+    kept = sorted((name for name in specs if keep_tensor(name, blocks, layer_filter)),
+                  key=lambda name: specs[name]["data_offsets"][0])
+
+    out_header: Dict[str, Any] = {}
+    source_metadata = header.get("__metadata__")
+    merged_metadata = dict(source_metadata) if isinstance(source_metadata, dict) else {}
+    merged_metadata.update(metadata or {})
+    if merged_metadata:
+        out_header["__metadata__"] = merged_metadata
+    offset = 0
+    for name in kept:
+        start, end = specs[name]["data_offsets"]
+        out_header[name] = {**specs[name], "data_offsets": [offset, offset + end - start]}
+        offset += end - start
+
+    raw = json.dumps(out_header, separators=(",", ":")).encode("utf-8")
+    raw += b" " * (-len(raw) % 8)  # Pad so tensor data stays 8-byte aligned
+
+    with open(path, "rb") as src, open(out_path, "wb") as dst:
+        (header_size,) = struct.unpack("<Q", src.read(8))
+        data_start = 8 + header_size
+        dst.write(struct.pack("<Q", len(raw)))
+        dst.write(raw)
+        for name in kept:
+            start, end = specs[name]["data_offsets"]
+            src.seek(data_start + start)
+            remaining = end - start
+            while remaining > 0:
+                chunk = src.read(min(_COPY_CHUNK, remaining))
+                if not chunk:
+                    raise OSError(f"unexpected end of file in {path}")
+                dst.write(chunk)
+                remaining -= len(chunk)
+    return len(kept), len(specs)
+
+
+def slim_cache_key(item: Dict[str, Any], blocks: Dict[str, bool], layer_filter: List[str]) -> str:
+    """Cache key for a slim extract: hash of the file's content hash and the normalized filter."""
+    payload = json.dumps({
+        "version": SLIM_FORMAT_VERSION,
+        "source": content_hash(item),
+        "blocks": sorted(blocks),
+        "layer_filter": sorted(layer_filter),
+    }, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def extract_slim_lora(item: Dict[str, Any]) -> Tuple[str, str, bool]:
+    """
+    Return (slim file path, cache key, cache hit) for a WANVIDLORA item with
+    blocks and/or layer_filter. The key identifies the slim file's content.
+    """
+    blocks = parse_blocks(item.get("blocks"))
+    layer_filter = parse_layer_filter(item.get("layer_filter"))
+    cache = get_file_cache("slim")
+    hits_before = cache.hits
+    metadata = {
+        "wakawave_slim_version": str(SLIM_FORMAT_VERSION),
+        "wakawave_slim_source": item.get("name", ""),
+        "wakawave_slim_blocks": json.dumps(sorted(blocks)),
+        "wakawave_slim_layer_filter": json.dumps(layer_filter),
+    }
+    key = slim_cache_key(item, blocks, layer_filter)
+    path = cache.get_or_create(key, lambda tmp_path: extract_tensors(
+        item["path"], tmp_path, blocks, layer_filter, metadata))
+    return path, key, cache.hits > hits_before
@@ -0,0 +1,101 @@
+"""
+WanVideo Wakawave Local Model Info
+CivitAI-style model info for a LoRA, assembled from local sidecar files only (no network calls)
+"""
+
+import os
+import json
+from typing import Any, Dict, List, Optional
+
+from .WanVideoWakawaveLoraIndex import LoraEntry, LoraIndex
+from .WanVideoWakawaveHashing import LoraHasher, autov2_hash
+from .WanVideoWakawaveSafetensors import get_header_info
+
+# Sidecars larger than this are ignored (CivitAI info files are a few KB to a few hundred KB)
+_MAX_SIDECAR_SIZE = 4 * 1024 * 1024
+
+# __metadata__ keys that carry trigger words
+_METADATA_TRIGGER_KEYS = ("modelspec.trigger_phrase", "ss_trigger_words", "trigger_words")
+
+
+def _read_json_sidecar(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        if os.path.getsize(path) > _MAX_SIDECAR_SIZE:
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _split_words(value: Any) -> List[str]:
+    """Trigger words from a list or comma-separated string."""
+    if isinstance(value, list):
+        words = [str(v.get("word", "")) if isinstance(v, dict) else str(v) for v in value]
+    elif isinstance(value, str):
+        words = value.split(",")
+    else:
+        return []
+    return [w.strip() for w in words if w and w.strip()]
+
+
+def get_local_model_info(index: LoraIndex, hasher: LoraHasher, entry: LoraEntry) -> Dict[str, Any]:
+    """Build model info for entry from, in order of precedence:
+
+    1. <stem>.civitai.info (CivitAI Helper format, returned as-is)
+    2. <stem>.json (A1111 extra-networks format: "activation text", "preferred weight", ...)
+    3. The safetensors __metadata__ block
+
+    Hashes are included when already computed; otherwise the file is queued
+    for background hashing and "hash_pending" is set.
+    """
+    stem = os.path.splitext(entry.path)[0]
+    info: Dict[str, Any] = {}
+    sources: List[str] = []
+    trained_words: List[str] = []
+
+    civitai = _read_json_sidecar(stem + ".civitai.info")
+    if civitai is not None:
+        info.update(civitai)
+        trained_words = _split_words(civitai.get("trainedWords"))
+        sources.append("civitai.info")
+
+    user_json = _read_json_sidecar(stem + ".json")
+    if user_json is not None:
+        sources.append("json")
+        if not trained_words:
+            trained_words = _split_words(user_json.get("trainedWords", user_json.get("activation text")))
+        for key, out_key in (("description", "description"), ("preferred weight", "preferredWeight"),
+                             ("sd version", "baseModel"), ("notes", "notes")):
+            if key in user_json and out_key not in info:
+                info[out_key] = user_json[key]
+
+    header = get_header_info(index, entry)
+    metadata = header.get("metadata") or {}
+    if metadata:
+        sources.append("safetensors")
+        if not trained_words:
+            for key in _METADATA_TRIGGER_KEYS:
+                trained_words = _split_words(metadata.get(key))
+                if trained_words:
+                    break
+        if "baseModel" not in info:
+            base_model = metadata.get("modelspec.architecture") or metadata.get("ss_base_model_version")
+            if base_model:
+                info["baseModel"] = base_model
+
+    sha256 = hasher.get(entry)
+    if sha256 is None:
+        hasher.submit(entry)
+        info["hash_pending"] = True
+    else:
+        hashes = info.get("hashes") if isinstance(info.get("hashes"), dict) else {}
+        info["hashes"] = {**hashes, "SHA256": sha256.upper(), "AutoV2": autov2_hash(sha256)}
+
+    info["name"] = entry.name
+    info["trainedWords"] = trained_words
+    info["sources"] = sources
+    if "rank" not in info and header.get("rank") is not None:
+        info["rank"] = header["rank"]
+    return info
@@ -0,0 +1,338 @@
+"""
+WanVideo Wakawave Preset Store
+File-backed LoRA and prompt presets: one JSON file per preset, an in-memory name index, NDJSON import/export
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Preset kinds and the list field whose length is reported in summaries
+PRESET_KINDS = {"lora": "loras", "prompt": None}
+
+# Small scalar fields copied into listing summaries (the preset body is never listed)
+_SUMMARY_FIELDS = ("description", "tags", "favorite", "usageCount", "version")
+
+# Characters of a prompt preset's positive text kept as its summary "preview" (the modal shows 60 and "...")
+_PREVIEW_CHARS = 64
+
+_UNSAFE_FILENAME_RE = re.compile(r"[^A-Za-z0-9_-]+")
+
+# Trailing ", weight: 1.2" on a prompt preset line (same rule as updateBundles in web/prompt_extension.js)
+_PROMPT_WEIGHT_RE = re.compile(r",\s*weight:\s*([\d.]+)\s*$", re.IGNORECASE)
+
+
+class PresetError(ValueError):
+    """Raised for invalid preset names, kinds or bodies."""
+
+
+def _preset_filename(name: str) -> str:
+    """Readable, collision-free file name for any preset name (including slashes or unicode)."""
+    slug = _UNSAFE_FILENAME_RE.sub("_", name).strip("_")[:60] or "preset"
+    return f"{slug}-{hashlib.sha1(name.encode('utf-8')).hexdigest()[:10]}.json"
+
+
+class PresetStore:
+    """
+    Presets of one kind stored as <directory>/<slug>-<hash>.json.
+
+    Each file holds {"name", "created", "modified", "preset"}. The name index
+    (name -> file and summary) is built from the files on first use and kept
+    current by every write, so listings never re-read preset bodies. Writes
+    go to a temporary file that is renamed into place, touching only the one
+    preset being saved.
+
+    get_cached() keeps parsed records in memory keyed by the file's
+    (mtime, size), so node executions that reference a preset read it from
+    disk once, and again only after the file is edited.
+    """
+
+    def __init__(self, directory: str, kind: str):
+        if kind not in PRESET_KINDS:
+            raise PresetError(f"unknown preset kind '{kind}'")
+        self.directory = directory
+        self.kind = kind
+        self._lock = threading.RLock()
+        self._index: Optional[Dict[str, Dict[str, Any]]] = None
+        self._dir_mtime: Optional[int] = None
+        self._records: Dict[str, Tuple[Tuple[int, int], Dict[str, Any]]] = {}
+
+    def _load_index(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            if self._index is not None:
+                return self._index
+            index: Dict[str, Dict[str, Any]] = {}
+            self._dir_mtime = self._directory_mtime()
+            try:
+                with os.scandir(self.directory) as it:
+                    files = [e.path for e in it if e.is_file() and e.name.endswith(".json")]
+            except FileNotFoundError:
+                files = []
+            for path in files:
+                record = self._read(path)
+                if record is not None:
+                    index[record["name"]] = {"file": path, "summary": self._summarize(record, path)}
+            self._index = index
+            return index
+
+    def _directory_mtime(self) -> Optional[int]:
+        try:
+            return os.stat(self.directory).st_mtime_ns
+        except OSError:
+            return None
+
+    @staticmethod
+    def _read(path: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                record = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[Wakawave] Skipping unreadable preset {path}: {e}")
+            return None
+        if not isinstance(record, dict) or not isinstance(record.get("name"), str):
+            return None
+        return record
+
+    def _summarize(self, record: Dict[str, Any], path: str) -> Dict[str, Any]:
+        preset = record.get("preset")
+        summary: Dict[str, Any] = {
+            "name": record["name"],
+            "created": record.get("created"),
+            "modified": record.get("modified"),
+        }
+        try:
+            summary["bytes"] = os.path.getsize(path)
+        except OSError:
+            pass
+        if isinstance(preset, dict):
+            for key in _SUMMARY_FIELDS:
+                if key in preset:
+                    summary[key] = preset[key]
+            list_field = PRESET_KINDS[self.kind]
+            if list_field and isinstance(preset.get(list_field), list):
+                summary["count"] = len(preset[list_field])
+        if self.kind == "prompt":
+            # Old-format prompt presets are a bare positive string
+            positive = preset.get("positive") if isinstance(preset, dict) else preset
+            if isinstance(positive, str):
+                summary["preview"] = positive[:_PREVIEW_CHARS]
+        return summary
+
+    def __len__(self) -> int:
+        return len(self._load_index())
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._load_index()
+
+    def names(self) -> List[str]:
+        return sorted(self._load_index())
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Summaries of every preset, sorted by name."""
+        index = self._load_index()
+        return [index[name]["summary"] for name in sorted(index)]
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        """The full stored record {"name", "created", "modified", "preset"}, or None."""
+        item = self._load_index().get(name)
+        return self._read(item["file"]) if item is not None else None
+
+    def get_cached(self, name: str) -> Optional[Dict[str, Any]]:
+        """Like get(), but served from memory until the preset file changes on disk."""
+        with self._lock:
+            if name not in self._load_index() and self._directory_mtime() != self._dir_mtime:
+                self._index = None  # Files were added or removed outside the API
+            item = self._load_index().get(name)
+            if item is None:
+                self._records.pop(name, None)
+                return None
+            try:
+                st = os.stat(item["file"])
+            except OSError:
+                self._records.pop(name, None)
+                return None
+            state = (st.st_mtime_ns, st.st_size)
+            cached = self._records.get(name)
+            if cached is not None and cached[0] == state:
+                return cached[1]
+            record = self._read(item["file"])
+            if record is not None:
+                self._records[name] = (state, record)
+            return record
+
+    def put(self, name: str, preset: Any, created: Optional[float] = None,
+            modified: Optional[float] = None) -> Dict[str, Any]:
+        """Create or replace one preset. Returns its summary."""
+        if not isinstance(name, str) or not name.strip():
+            raise PresetError("preset name must be a non-empty string")
+        if preset is None:
+            raise PresetError("preset body is missing")
+        now = time.time()
+        with self._lock:
+            index = self._load_index()
+            existing = index.get(name)
+            if created is None:
+                created = existing["summary"].get("created") if existing else None
+            record = {"name": name, "created": created or now, "modified": modified or now, "preset": preset}
+
+            os.makedirs(self.directory, exist_ok=True)
+            path = existing["file"] if existing else os.path.join(self.directory, _preset_filename(name))
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(record, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+            self._records.pop(name, None)
+            index[name] = {"file": path, "summary": self._summarize(record, path)}
+            return index[name]["summary"]
+
+    def delete(self, name: str) -> bool:
+        with self._lock:
+            item = self._load_index().pop(name, None)
+            self._records.pop(name, None)
+            if item is None:
+                return False
+            try:
+                os.remove(item["file"])
+            except FileNotFoundError:
+                pass
+            return True
+
+    def export_records(self, names: Optional[Iterable[str]] = None) -> Iterator[Dict[str, Any]]:
+        """Yield full records one at a time (for streaming export)."""
+        for name in (self.names() if names is None else names):
+            record = self.get(name)
+            if record is not None:
+                yield record
+
+    def import_record(self, record: Any, overwrite: bool = True) -> str:
+        """Import one exported record. Returns "imported", "skipped" or raises PresetError."""
+        if not isinstance(record, dict) or not isinstance(record.get("name"), str):
+            raise PresetError("each line must be an object with a 'name'")
+        name = record["name"]
+        if not overwrite and name in self:
+            return "skipped"
+        self.put(name, record.get("preset"), record.get("created"), record.get("modified"))
+        return "imported"
+
+
+_preset_dir: Optional[str] = None
+_stores: Dict[str, PresetStore] = {}
+
+
+def default_preset_dir() -> str:
+    """ComfyUI's user directory when available, else next to the node."""
+    try:
+        import folder_paths  # type: ignore
+        return os.path.join(folder_paths.get_user_directory(), "wakawave_presets")
+    except (ImportError, AttributeError):
+        return os.path.join(os.path.dirname(os.path.abspath(__file__)), "presets")
+
+
+def configure_presets(directory: Optional[str]) -> None:
+    """Set the base directory for preset stores created afterwards."""
+    global _preset_dir
+    _preset_dir = directory or None
+
+
+def get_preset_store(kind: str) -> PresetStore:
+    """Return the shared store for kind ("lora" or "prompt")."""
+    store = _stores.get(kind)
+    if store is None:
+        if kind not in PRESET_KINDS:
+            raise PresetError(f"unknown preset kind '{kind}'")
+        store = PresetStore(os.path.join(_preset_dir or default_preset_dir(), kind), kind)
+        _stores[kind] = store
+    return store
+
+
+def normalize_lora_template(body: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+    """Name and stored body of a LoRA template as posted by the UI (lora_configs is kept as loras)."""
+    name = body.get("name")
+    if not isinstance(name, str) or not name.strip():
+        raise PresetError("template name is required")
+    preset = {k: v for k, v in body.items() if k not in ("name", "action")}
+    if "loras" not in preset and isinstance(preset.get("lora_configs"), list):
+        preset["loras"] = preset.pop("lora_configs")
+    if not isinstance(preset.get("loras"), list):
+        raise PresetError("template needs a 'loras' list")
+    return name, preset
+
+
+def is_preset_reference(value: Any) -> bool:
+    """True for a compact bundle of the form {"preset": "name", "overrides": {...}}."""
+    return isinstance(value, dict) and isinstance(value.get("preset"), str)
+
+
+def _apply_overrides(entries: List[Dict[str, Any]], overrides: Any, key: str) -> List[Dict[str, Any]]:
+    """
+    Copies of entries with overrides applied. overrides maps an entry's key
+    (LoRA name or prompt text) to fields merged into that entry; keys that
+    match no entry are appended as new, enabled entries.
+    """
+    entries = [dict(entry) for entry in entries if isinstance(entry, dict)]
+    if not overrides:
+        return entries
+    if not isinstance(overrides, dict):
+        raise PresetError("'overrides' must be an object")
+    by_key = {entry.get(key): entry for entry in entries}
+    for name, fields in overrides.items():
+        if not isinstance(fields, dict):
+            raise PresetError(f"override for '{name}' must be an object")
+        entry = by_key.get(name)
+        if entry is None:
+            entry = {key: name, "enabled": True}
+            entries.append(entry)
+            by_key[name] = entry
+        entry.update(fields)
+    return entries
+
+
+def _referenced_preset(kind: str, reference: Dict[str, Any]) -> Any:
+    record = get_preset_store(kind).get_cached(reference["preset"])
+    if record is None:
+        raise PresetError(f"{kind} preset '{reference['preset']}' not found")
+    return record.get("preset")
+
+
+def resolve_lora_reference(reference: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """LoRA bundle entries of the referenced template, with per-LoRA overrides applied."""
+    preset = _referenced_preset("lora", reference)
+    loras = preset.get("loras") if isinstance(preset, dict) else None
+    if not isinstance(loras, list):
+        raise PresetError(f"lora preset '{reference['preset']}' has no 'loras' list")
+    return _apply_overrides(loras, reference.get("overrides"), "lora")
+
+
+def prompt_text_to_entries(text: str) -> List[Dict[str, Any]]:
+    """Prompt bundle entries for preset text: one per non-empty line, with an optional ", weight: x" suffix."""
+    entries = []
+    for line in text.split("\n"):
+        line = line.strip()
+        if not line:
+            continue
+        weight = 1.0
+        match = _PROMPT_WEIGHT_RE.search(line)
+        if match:
+            try:
+                weight = float(match.group(1))
+            except ValueError:
+                pass
+            line = line[:match.start()].strip()
+        entries.append({"text": line, "weight": weight, "enabled": True})
+    return entries
+
+
+def resolve_prompt_reference(reference: Dict[str, Any], side: str) -> List[Dict[str, Any]]:
+    """Prompt bundle entries for the positive or negative side of the referenced preset, with overrides applied."""
+    preset = _referenced_preset("prompt", reference)
+    if isinstance(preset, str):
+        text = preset if side == "positive" else ""  # Old format: a single positive string
+    elif isinstance(preset, dict):
+        text = preset.get(side) or ""
+    else:
+        raise PresetError(f"prompt preset '{reference['preset']}' is not a preset object")
+    return _apply_overrides(prompt_text_to_entries(str(text)), reference.get("overrides"), "text")
@@ -3,8 +3,299 @@ WanVideo Wakawave Prompt Builder
 Advanced prompt management with save/load presets and segment-based control
 """
 
+import re
 import json
-from typing import Union, List, Dict, Any
+import hashlib
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Union, List, Dict, Any, NamedTuple, Optional, Tuple
+
+from .WanVideoWakawavePresets import PresetError, is_preset_reference, resolve_prompt_reference, get_preset_store
+from .WanVideoWakawaveWildcards import expand_prompt, get_wildcard_index
+
+# "segment 0: prompt text", "seg 0: prompt text", "0: prompt text" or a range, "0-11: prompt text"
+_SEGMENT_RE = re.compile(r'^(?:segment|seg)?\s*(\d+)(?:\s*-\s*(\d+))?\s*:\s*(.+)', re.IGNORECASE)
+
+# Weight keyframes anywhere in the text: "[w 1.0@0 → 1.4@20]" (weight@segment, "->" or "," also separate)
+_KEYFRAME = r'(-?\d+(?:\.\d+)?)\s*@\s*(\d+)'
+_KEYFRAMES_RE = re.compile(r'\[\s*w\s+(' + _KEYFRAME + r'(?:\s*(?:→|->|,)?\s*' + _KEYFRAME + r')*)\s*\]',
+                           re.IGNORECASE)
+_KEYFRAME_RE = re.compile(_KEYFRAME)
+
+# Upper bound on segment indices, so a typo like "0-99999:" can't allocate a huge schedule
+MAX_SEGMENTS = 10000
+
+
+class SegmentSchedule(NamedTuple):
+    """
+    Every segment entry of a bundle laid out as a matrix: row r is active in
+    segment s when coverage[r, s], with weight weights[r, s]. Shared through
+    the bundle cache, so the arrays must not be modified.
+    """
+    texts: List[str]
+    configs: List[Dict]
+    coverage: np.ndarray  # bool, rows x segments
+    weights: np.ndarray  # float, rows x segments
+    keyframed: np.ndarray  # bool per row: weight comes from keyframes rather than the entry's weight
+
+    @property
+    def count(self) -> int:
+        return self.coverage.shape[1]
+
+    def to_json(self, count: int) -> Dict[str, Any]:
+        """Enabled rows as {"texts": [...], "weights": [[weight or None per text] per segment]} over count segments."""
+        if not self.count:
+            return {"texts": [], "weights": [[] for _ in range(count)]}
+        enabled = np.array([bool(config.get('enabled', True)) for config in self.configs], dtype=bool)
+        columns = np.minimum(np.arange(count), self.count - 1)  # Past the last segment the last one is reused
+        weights = np.round(self.weights[enabled][:, columns], 4).T.astype(object)
+        weights[~self.coverage[enabled][:, columns].T] = None
+        return {"texts": [text for text, keep in zip(self.texts, enabled) if keep], "weights": weights.tolist()}
+
+
+def _parse_keyframes(text: str) -> Tuple[str, Optional[List[Tuple[int, float]]]]:
+    """(text without the keyframe marker, [(segment, weight), ...] sorted by segment) or (text, None)."""
+    match = _KEYFRAMES_RE.search(text)
+    if match is None:
+        return text, None
+    keyframes = {}
+    for weight, segment in _KEYFRAME_RE.findall(match.group(1)):
+        keyframes[min(int(segment), MAX_SEGMENTS - 1)] = float(weight)  # A repeated segment keeps the last weight
+    cleaned = (text[:match.start()] + " " + text[match.end():]).strip()
+    return re.sub(r'\s{2,}', ' ', cleaned), sorted(keyframes.items())
+
+
+def parse_schedule(prompt_configs: List[Any]) -> SegmentSchedule:
+    """
+    Lay out the segment entries of a bundle as a SegmentSchedule.
+
+    Supports formats:
+    - "segment 0: prompt text", "seg 0: prompt text", "0: prompt text"
+    - "0-11: prompt text" (segments 0 to 11 inclusive)
+    - "[w 1.0@0 → 1.4@20]" anywhere in the text: the weight is interpolated
+      linearly between keyframes and held before the first / after the last.
+      Without a segment marker the entry spans its first to last keyframe.
+    Entries with neither a marker nor keyframes belong to segment 0.
+
+    Lines are matched in one Python pass; coverage and weights for every
+    segment are then computed with array operations, so the cost of a
+    schedule barely depends on how many segments it spans.
+    """
+    texts, configs, starts, ends, base_weights, keyframe_rows = [], [], [], [], [], []
+
+    for config in prompt_configs:
+        if not isinstance(config, dict):
+            continue
+        text = config.get('text', '')
+        if not isinstance(text, str):
+            text = str(text) if text is not None else ''
+        text = text.strip()
+        if not text:
+            continue
+
+        segment_match = _SEGMENT_RE.match(text)
+        if segment_match:
+            start = int(segment_match.group(1))
+            end = int(segment_match.group(2)) if segment_match.group(2) is not None else start
+            start, end = min(start, end), max(start, end)
+            text = segment_match.group(3).strip()
+        else:
+            start = end = None
+
+        text, keyframes = _parse_keyframes(text)
+        if not text:
+            continue
+        if start is None:
+            # No segment marker - keyframed entries span their keyframes, others are segment 0
+            start, end = (keyframes[0][0], keyframes[-1][0]) if keyframes else (0, 0)
+
+        try:
+            weight = float(config.get('weight', 1.0))
+        except (ValueError, TypeError):
+            weight = 1.0
+        if keyframes:
+            keyframe_rows.append((len(texts), keyframes))
+        texts.append(text)
+        configs.append(config)
+        starts.append(min(start, MAX_SEGMENTS - 1))
+        ends.append(min(end, MAX_SEGMENTS - 1))
+        base_weights.append(weight)
+
+    count = max(ends) + 1 if ends else 0
+    segments = np.arange(count)
+    starts_arr = np.array(starts, dtype=np.int64)[:, None]
+    ends_arr = np.array(ends, dtype=np.int64)[:, None]
+    coverage = (segments >= starts_arr) & (segments <= ends_arr)
+    weights = np.repeat(np.array(base_weights, dtype=np.float64)[:, None], count, axis=1)
+    keyframed = np.zeros(len(texts), dtype=bool)
+    if keyframe_rows and count:
+        # All keyframed rows in one np.interp call: row i's keyframes are shifted to i * MAX_SEGMENTS
+        # and its queries are clamped to its own first/last keyframe, so rows never blend into each other
+        rows = np.array([row for row, _ in keyframe_rows])
+        offsets = np.arange(len(keyframe_rows), dtype=np.float64) * MAX_SEGMENTS
+        frames = np.concatenate([[frame + offset for frame, _ in keyframes]
+                                 for offset, (_, keyframes) in zip(offsets, keyframe_rows)])
+        values = np.concatenate([[value for _, value in keyframes] for _, keyframes in keyframe_rows])
+        first = np.array([keyframes[0][0] for _, keyframes in keyframe_rows])[:, None]
+        last = np.array([keyframes[-1][0] for _, keyframes in keyframe_rows])[:, None]
+        queries = np.clip(segments, first, last) + offsets[:, None]
+        weights[rows] = np.interp(queries.ravel(), frames, values).reshape(queries.shape)
+        keyframed[rows] = True
+    return SegmentSchedule(texts, configs, coverage, weights, keyframed)
+
+
+def parse_segments(prompt_configs: List[Any]) -> Dict[int, List[Dict]]:
+    """
+    Dictionary mapping segment number to its list of prompt configs (see
+    parse_schedule for the formats). Configs come back with the marker
+    removed from their text and, when keyframed, that segment's weight.
+    """
+    return schedule_segments(parse_schedule(prompt_configs))
+
+
+def schedule_segments(schedule: SegmentSchedule) -> Dict[int, List[Dict]]:
+    segment_map: Dict[int, List[Dict]] = {}
+    segments, rows = np.nonzero(schedule.coverage.T)  # Ordered by segment, then by row (bundle order)
+    weights = np.round(schedule.weights[rows, segments], 4).tolist()
+    keyframed = schedule.keyframed[rows].tolist()
+    for segment, row, weight, use_weight in zip(segments.tolist(), rows.tolist(), weights, keyframed):
+        new_config = schedule.configs[row].copy()
+        new_config['text'] = schedule.texts[row]
+        if use_weight:
+            new_config['weight'] = weight
+        segment_map.setdefault(segment, []).append(new_config)
+    return segment_map
+
+
+def _fingerprint_entries(prompt_configs: List[Any]) -> List[List[Any]]:
+    """Enabled entries as [stripped text, weight] pairs, in order - what the output actually depends on."""
+    entries = []
+    for config in prompt_configs:
+        if not isinstance(config, dict) or not config.get('enabled', True):
+            continue
+        text = config.get('text', '')
+        text = (text if isinstance(text, str) else str(text) if text is not None else '').strip()
+        if not text:
+            continue
+        try:
+            weight = float(config.get('weight', 1.0))
+        except (ValueError, TypeError):
+            weight = 1.0
+        entries.append([text, weight])
+    return entries
+
+
+class ParsedBundle(NamedTuple):
+    """
+    A parsed positive/negative bundle. Instances are shared through the
+    bundle cache, so the lists and dicts in them must not be modified.
+    """
+    entries: List[Any]
+    segments: Dict[int, List[Dict]]
+    schedule: SegmentSchedule
+    fingerprint: List[List[Any]]
+    preset: Optional[str]  # Name of the referenced preset, if the bundle was a reference
+
+
+class _BundleCache:
+    """
+    LRU of parsed bundles keyed by a hash of the bundle text and side.
+
+    Entries for preset references remember the preset record they were
+    resolved from and are only reused while the preset store still returns
+    that same record, i.e. until the preset file changes.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[ParsedBundle, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[ParsedBundle]:
+        with self._lock:
+            cached = self._entries.get(key)
+        if cached is not None:
+            parsed, record = cached
+            if parsed.preset is None or get_preset_store("prompt").get_cached(parsed.preset) is record:
+                with self._lock:
+                    if key in self._entries:
+                        self._entries.move_to_end(key)
+                    self.hits += 1
+                return parsed
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, parsed: ParsedBundle, record: Any = None) -> None:
+        with self._lock:
+            self._entries[key] = (parsed, record)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+_bundle_cache = _BundleCache()
+
+
+def configure_bundle_cache(max_entries: int) -> None:
+    """Set how many parsed bundles are kept (0 disables the cache)."""
+    _bundle_cache.max_entries = max(0, int(max_entries))
+    if not _bundle_cache.max_entries:
+        _bundle_cache.clear()
+
+
+def bundle_cache_stats() -> Dict[str, Any]:
+    return _bundle_cache.stats()
+
+
+def load_bundle(prompt_bundle: Union[str, None], side: str) -> Tuple[Optional[ParsedBundle], bool]:
+    """
+    (parsed bundle, cache hit) for one side's bundle text; the bundle is None
+    when the text is empty. Raises PresetError for a broken preset reference
+    and ValueError (including json.JSONDecodeError) for a malformed bundle.
+    """
+    if not prompt_bundle or not isinstance(prompt_bundle, str) or not prompt_bundle.strip():
+        return None, False
+
+    key = hashlib.sha256(f"{side}\0{prompt_bundle}".encode("utf-8")).hexdigest()
+    parsed = _bundle_cache.get(key) if _bundle_cache.max_entries else None
+    if parsed is not None:
+        return parsed, True
+
+    prompt_configs = json.loads(prompt_bundle)
+    preset, record = None, None
+    if is_preset_reference(prompt_configs):
+        preset = prompt_configs['preset']
+        record = get_preset_store("prompt").get_cached(preset)
+        prompt_configs = resolve_prompt_reference(prompt_configs, side)
+    if not isinstance(prompt_configs, list):
+        raise ValueError(f"bundle is not a list, got {type(prompt_configs).__name__}")
+
+    schedule = parse_schedule(prompt_configs)
+    parsed = ParsedBundle(prompt_configs, schedule_segments(schedule), schedule, _fingerprint_entries(prompt_configs),
+                          preset)
+    if _bundle_cache.max_entries:
+        _bundle_cache.put(key, parsed, record)
+    return parsed, False
+
 
 class WanVideoWakawavePromptBuilder:
     """
@@ -27,22 +318,63 @@ class WanVideoWakawavePromptBuilder:
                 "separator": (["none", "comma", "newline", "space", "pipe", "double_slash"], {"default": "none"}),
                 "use_weights": ("BOOLEAN", {"default": True}),
                 "segment_mode": ("BOOLEAN", {"default": False, "tooltip": "Enable segment-based prompting for different video segments"}),
-                "segment_number": ("INT", {"default": 0, "min": 0, "max": 100, "step": 1, "tooltip": "Current segment number (0-based)"}),
+                "segment_number": ("INT", {"default": 0, "min": 0, "max": MAX_SEGMENTS - 1, "step": 1, "tooltip": "Current segment number (0-based)"}),
+                "all_segments": ("BOOLEAN", {"default": False, "tooltip": "Segment mode: also output every segment's prompt as a list (positive_segments / negative_segments) from a single execution"}),
+                "expand_dynamic": ("BOOLEAN", {"default": False, "tooltip": "Also expand {a|b|c} and __wildcards__ in the positive/negative and segment outputs (the batch outputs are always expanded)"}),
+                "seed": ("INT", {"default": 0, "min": 0, "max": 0xffffffffffffffff, "tooltip": "Seed for {a|b|c} alternations and __wildcard__ picks (same seed, same prompts)"}),
+                "batch_count": ("INT", {"default": 1, "min": 1, "max": 1000, "step": 1, "tooltip": "Number of expanded positive/negative pairs in positive_batch / negative_batch"}),
             },
             "hidden": {
                 "positive_prompts": "STRING",  # Direct text from the text widget (serialized)
                 "negative_prompts": "STRING",  # Direct text from the text widget (serialized)
-                "positive_bundle": "STRING",   # JSON from Wakawave UI - positive prompts (backup)
-                "negative_bundle": "STRING",   # JSON from Wakawave UI - negative prompts (backup)
+                "positive_bundle": "STRING",   # JSON from Wakawave UI - positive prompts (backup), or {"preset": name}
+                "negative_bundle": "STRING",   # JSON from Wakawave UI - negative prompts (backup), or {"preset": name}
             }
         }
 
-    RETURN_TYPES = ("STRING", "STRING")
-    RETURN_NAMES = ("positive", "negative")
+    RETURN_TYPES = ("STRING", "STRING", "STRING", "STRING", "STRING", "STRING", "STRING")
+    RETURN_NAMES = ("positive", "negative", "positive_segments", "negative_segments", "schedule",
+                    "positive_batch", "negative_batch")
+    OUTPUT_IS_LIST = (False, False, True, True, False, True, True)
     FUNCTION = "build_prompt"
     CATEGORY = "WanVideo/Prompts"
     DESCRIPTION = "Wakawave-style prompt builder with save/load presets and segment control"
 
+    @classmethod
+    def IS_CHANGED(
+        cls,
+        separator: str = "none",
+        use_weights: bool = True,
+        segment_mode: bool = False,
+        segment_number: int = 0,
+        all_segments: bool = False,
+        expand_dynamic: bool = False,
+        seed: int = 0,
+        batch_count: int = 1,
+        positive_bundle: Union[str, None] = None,
+        negative_bundle: Union[str, None] = None,
+        **kwargs
+    ) -> str:
+        """
+        Fingerprint of the settings and the enabled prompt entries after
+        normalisation (stripped text and weight, in order), so bundles that
+        differ only in key order, whitespace or disabled rows fingerprint
+        the same. Preset references are resolved first, so editing the
+        referenced preset changes the fingerprint.
+        """
+        def normalize(bundle, side):
+            try:
+                parsed, _ = load_bundle(bundle, side)
+            except ValueError:
+                return bundle
+            return parsed.fingerprint if parsed is not None else []
+
+        state = [separator, bool(use_weights), bool(segment_mode), segment_number, bool(all_segments), bool(expand_dynamic), seed, batch_count,
+                 normalize(positive_bundle, "positive"), normalize(negative_bundle, "negative")]
+        if "__" in json.dumps(state[-2:], default=str):
+            state.append(get_wildcard_index().signature())  # Edited wildcard files change the expansion
+        return hashlib.sha256(json.dumps(state, separators=(",", ":"), default=str).encode("utf-8")).hexdigest()
+
     def build_prompt(
         self,
         prev_positive: Union[str, None] = None,
@@ -51,6 +383,10 @@ class WanVideoWakawavePromptBuilder:
         use_weights: bool = True,
         segment_mode: bool = False,
         segment_number: int = 0,
+        all_segments: bool = False,
+        expand_dynamic: bool = False,
+        seed: int = 0,
+        batch_count: int = 1,
         positive_prompts: Union[str, None] = None,
         negative_prompts: Union[str, None] = None,
         positive_bundle: Union[str, None] = None,
@@ -67,10 +403,29 @@ class WanVideoWakawavePromptBuilder:
             use_weights: Whether to apply weights like (text:1.2)
             segment_mode: Enable segment-based prompting
             segment_number: Current segment number (for segment mode)
+            all_segments: Also output every segment's prompt as a list (segment mode only)
+            expand_dynamic: Expand alternations and wildcards in the main and segment outputs too
+            seed: Seed for {a|b|c} alternations and __wildcard__ picks
+            batch_count: Number of expanded positive/negative pairs in the batch outputs
             positive_prompts: Direct text from the text widget (serialized)
             negative_prompts: Direct text from the text widget (serialized)
             positive_bundle: JSON string from Wakawave UI containing positive prompt configs (backup)
             negative_bundle: JSON string from Wakawave UI containing negative prompt configs (backup)
+
+        Either bundle may instead reference a saved prompt preset,
+        {"preset": "name", "overrides": {"prompt text": {"weight": 1.2}}},
+        which uses that side (positive or negative) of the preset.
+
+        Alternations and wildcards are expanded after the prompts are built.
+        The batch outputs always hold batch_count expanded variants of the
+        current prompts; the other outputs are expanded only with
+        expand_dynamic (then with the same picks as the first variant), so
+        existing prompts come out unchanged by default.
+
+        In segment mode the schedule output is a JSON summary of every
+        segment: {"segments": N, "current": segment_number, "positive":
+        {"texts": [...], "weights": [[weight or null per text] per segment]},
+        "negative": {...}}.
         """
 
         print("\n" + "="*75)
@@ -84,25 +439,109 @@ class WanVideoWakawavePromptBuilder:
             segment_number = 0
             print(f"⚠️  Invalid segment_number, using default: 0")
 
+        # Each bundle is parsed once (or taken from the bundle cache); all_segments below reuses the same parse
+
         # Build positive prompt
         print("\n📝 Building POSITIVE prompt:")
+        positive_parsed = self._parse_bundle(positive_bundle, "positive")
         positive_prompt = self._build_single_prompt(
-            positive_bundle, prev_positive, separator, use_weights, segment_mode, segment_number, "positive"
+            positive_parsed, prev_positive, separator, use_weights, segment_mode, segment_number, "positive"
         )
 
         # Build negative prompt
         print("\n📝 Building NEGATIVE prompt:")
+        negative_parsed = self._parse_bundle(negative_bundle, "negative")
         negative_prompt = self._build_single_prompt(
-            negative_bundle, prev_negative, separator, use_weights, segment_mode, segment_number, "negative"
+            negative_parsed, prev_negative, separator, use_weights, segment_mode, segment_number, "negative"
         )
 
+        positive_segments = [positive_prompt]
+        negative_segments = [negative_prompt]
+        schedule = ""
+        if segment_mode:
+            positive_map = positive_parsed.segments if positive_parsed is not None else {}
+            negative_map = negative_parsed.segments if negative_parsed is not None else {}
+            segment_count = max(list(positive_map) + list(negative_map) + [0]) + 1
+            schedule = json.dumps({
+                "segments": segment_count,
+                "current": segment_number,
+                "positive": (positive_parsed.schedule.to_json(segment_count) if positive_parsed is not None
+                             else {"texts": [], "weights": [[] for _ in range(segment_count)]}),
+                "negative": (negative_parsed.schedule.to_json(segment_count) if negative_parsed is not None
+                             else {"texts": [], "weights": [[] for _ in range(segment_count)]}),
+            }, separators=(",", ":"))
+        if segment_mode and all_segments:
+            print(f"\n🎞️  All segments: building {segment_count} positive/negative pairs")
+            positive_segments = [
+                self._format_prompt(self._select_segment(positive_map, i, verbose=False),
+                                    prev_positive, separator, use_weights, "positive", verbose=False)
+                for i in range(segment_count)
+            ]
+            negative_segments = [
+                self._format_prompt(self._select_segment(negative_map, i, verbose=False),
+                                    prev_negative, separator, use_weights, "negative", verbose=False)
+                for i in range(segment_count)
+            ]
+            for i, (pos, neg) in enumerate(zip(positive_segments, negative_segments)):
+                print(f"  {i:3d}. + {pos[:60]}{'...' if len(pos) > 60 else ''} | - {len(neg)} chars")
+
+        # Expand {a|b|c} and __wildcards__ (the schedule keeps the unexpanded text)
+        try:
+            seed = int(seed)
+        except (ValueError, TypeError):
+            seed = 0
+        try:
+            batch_count = max(1, int(batch_count))
+        except (ValueError, TypeError):
+            batch_count = 1
+        missing = set()
+        positive_template, negative_template = positive_prompt, negative_prompt
+        if expand_dynamic:
+            positive_prompt = expand_prompt(positive_template, seed, 0, "positive", missing)
+            negative_prompt = expand_prompt(negative_template, seed, 0, "negative", missing)
+            positive_segments = [expand_prompt(text, seed, 0, "positive", missing) for text in positive_segments]
+            negative_segments = [expand_prompt(text, seed, 0, "negative", missing) for text in negative_segments]
+        positive_batch = [expand_prompt(positive_template, seed, i, "positive", missing) for i in range(batch_count)]
+        negative_batch = [expand_prompt(negative_template, seed, i, "negative", missing) for i in range(batch_count)]
+        if batch_count > 1:
+            print(f"\n🎲 Batch: {batch_count} variants (seed {seed}), {len(set(zip(positive_batch, negative_batch)))} distinct")
+            for i, pos in enumerate(positive_batch[:10]):
+                print(f"  {i:3d}. + {pos[:60]}{'...' if len(pos) > 60 else ''}")
+            if batch_count > 10:
+                print(f"  ... and {batch_count - 10} more")
+        if positive_prompt != positive_template or negative_prompt != negative_template:
+            print(f"\n🎲 Expanded (seed {seed}): {positive_prompt[:100]}{'...' if len(positive_prompt) > 100 else ''}")
+        if missing:
+            print(f"  ⚠️  Unresolved wildcards left as-is: {', '.join(sorted(missing))} "
+                  f"(looked in {get_wildcard_index().directory})")
+
         print("="*75 + "\n")
 
-        return (positive_prompt, negative_prompt)
+        return (positive_prompt, negative_prompt, positive_segments, negative_segments, schedule,
+                positive_batch, negative_batch)
+
+    def _parse_bundle(self, prompt_bundle: Union[str, None], prompt_type: str) -> Optional[ParsedBundle]:
+        """Parsed positive/negative bundle (resolving preset references), or None if there are no entries."""
+        if not prompt_bundle or not isinstance(prompt_bundle, str) or prompt_bundle.strip() == "":
+            print(f"  ⚠️  No {prompt_type} bundle received from UI")
+            return None
+
+        try:
+            parsed, hit = load_bundle(prompt_bundle, prompt_type)
+        except PresetError as e:
+            # A missing preset must not silently produce an empty prompt
+            raise ValueError(f"Wakawave Prompt Builder: {e}") from e
+        except ValueError as e:
+            print(f"  ❌ Failed to parse {prompt_type} bundle: {e}")
+            return None
+        if parsed.preset is not None:
+            print(f"  📚 Using saved preset '{parsed.preset}'")
+        print(f"  📦 Parsed {len(parsed.entries)} {prompt_type} entries from bundle{' (cached)' if hit else ''}")
+        return parsed
 
     def _build_single_prompt(
         self,
-        prompt_bundle: Union[str, None],
+        parsed: Optional[ParsedBundle],
         prev_prompt: Union[str, None],
         separator: str,
         use_weights: bool,
@@ -110,55 +549,66 @@ class WanVideoWakawavePromptBuilder:
         segment_number: int,
         prompt_type: str  # "positive" or "negative"
     ) -> str:
-        """Helper method to build a single prompt (positive or negative)"""
+        """Helper method to build a single prompt (positive or negative) from parsed bundle entries"""
 
-        # Start with previous prompt if provided
-        prompt_parts = []
-        if prev_prompt:
-            prompt_parts.append(prev_prompt)
-            print(f"  📌 Previous {prompt_type}: {prev_prompt[:50]}...")
-
-        # Parse the bundle from Wakawave UI
-        if not prompt_bundle or not isinstance(prompt_bundle, str) or prompt_bundle.strip() == "":
-            print(f"  ⚠️  No {prompt_type} bundle received from UI")
-            return prev_prompt or ""
-
-        try:
-            prompt_configs = json.loads(prompt_bundle)
-            if not isinstance(prompt_configs, list):
-                print(f"  ❌ {prompt_type} bundle is not a list, got {type(prompt_configs).__name__}")
-                return prev_prompt or ""
-            print(f"  📦 Parsed {len(prompt_configs)} {prompt_type} entries from bundle")
-        except (json.JSONDecodeError, ValueError) as e:
-            print(f"  ❌ Failed to parse {prompt_type} bundle: {e}")
+        if parsed is None:
+            if prev_prompt:
+                print(f"  📌 Previous {prompt_type}: {prev_prompt[:50]}...")
             return prev_prompt or ""
 
         # Segment mode handling
         if segment_mode:
             print(f"  🎬 Segment mode enabled - Using segment {segment_number}")
-            segment_prompts = self._parse_segments(prompt_configs)
-
-            if segment_number in segment_prompts:
-                selected_configs = segment_prompts[segment_number]
+            prompt_configs = self._select_segment(parsed.segments, segment_number)
+        else:
+            prompt_configs = parsed.entries
+
+        return self._format_prompt(prompt_configs, prev_prompt, separator, use_weights, prompt_type)
+
+    @staticmethod
+    def _select_segment(segment_prompts: Dict[int, List[Dict]], segment_number: int, verbose: bool = True) -> List[Dict]:
+        """Entries for one segment; past the last segment, the highest segment is reused."""
+        if segment_number in segment_prompts:
+            selected_configs = segment_prompts[segment_number]
+            if verbose:
                 print(f"  ✅ Found {len(selected_configs)} prompts for segment {segment_number}")
-            else:
-                # Fallback to highest segment if requested segment doesn't exist
-                max_segment = max(segment_prompts.keys()) if segment_prompts else 0
-                if max_segment >= 0 and segment_number > max_segment:
-                    print(f"  ⚠️  Segment {segment_number} not found, using segment {max_segment}")
-                    selected_configs = segment_prompts.get(max_segment, [])
-                else:
-                    print(f"  ⚠️  No prompts found for segment {segment_number}")
-                    selected_configs = []
+            return selected_configs
+
+        # Fallback to highest segment if requested segment doesn't exist
+        max_segment = max(segment_prompts.keys()) if segment_prompts else 0
+        if max_segment >= 0 and segment_number > max_segment:
+            if verbose:
+                print(f"  ⚠️  Segment {segment_number} not found, using segment {max_segment}")
+            return segment_prompts.get(max_segment, [])
+        if verbose:
+            print(f"  ⚠️  No prompts found for segment {segment_number}")
+        return []
+
+    @staticmethod
+    def _format_prompt(
+        prompt_configs: List[Any],
+        prev_prompt: Union[str, None],
+        separator: str,
+        use_weights: bool,
+        prompt_type: str,
+        verbose: bool = True
+    ) -> str:
+        """Join the enabled entries (weighted if requested) after the previous prompt."""
 
-            prompt_configs = selected_configs
+        # Start with previous prompt if provided
+        prompt_parts = []
+        if prev_prompt:
+            prompt_parts.append(prev_prompt)
+            if verbose:
+                print(f"  📌 Previous {prompt_type}: {prev_prompt[:50]}...")
 
         # Process each prompt entry
         enabled_count = 0
         for idx, config in enumerate(prompt_configs, 1):
             # Validate config is a dictionary
             if not isinstance(config, dict):
-                print(f"    ⚠️  Skipping invalid config (not a dict): {config}")
+                if verbose:
+                    print(f"    ⚠️  Skipping invalid config (not a dict): {config}")
                 continue
             
             # Check if enabled
@@ -175,7 +625,8 @@ class WanVideoWakawavePromptBuilder:
             try:
                 weight = float(config.get('weight', 1.0))
             except (ValueError, TypeError):
-                print(f"    ⚠️  Invalid weight value, using default 1.0")
+                if verbose:
+                    print(f"    ⚠️  Invalid weight value, using default 1.0")
                 weight = 1.0
 
             # Format with weight if enabled
@@ -188,10 +639,9 @@ class WanVideoWakawavePromptBuilder:
             enabled_count += 1
 
             # Print with truncation for long prompts
-            display_text = text[:50] + "..." if len(text) > 50 else text
-            print(f"    ✅ {enabled_count}. {display_text:48s} @ {weight:.2f}")
-
-        print(f"  ✅ Total enabled: {enabled_count} {prompt_type} prompts")
+            if verbose:
+                display_text = text[:50] + "..." if len(text) > 50 else text
+                print(f"    ✅ {enabled_count}. {display_text:48s} @ {weight:.2f}")
 
         # Join prompts based on separator
         if separator == "comma":
@@ -209,62 +659,12 @@ class WanVideoWakawavePromptBuilder:
 
         final_prompt = sep.join(prompt_parts)
 
-        print(f"  📤 Final {prompt_type} ({len(final_prompt)} chars): {final_prompt[:100]}...")
+        if verbose:
+            print(f"  ✅ Total enabled: {enabled_count} {prompt_type} prompts")
+            print(f"  📤 Final {prompt_type} ({len(final_prompt)} chars): {final_prompt[:100]}...")
 
         return final_prompt
 
-    def _parse_segments(self, prompt_configs: List[Dict]) -> Dict[int, List[Dict]]:
-        """
-        Parse segment-based prompts from configs.
-
-        Supports formats:
-        - "segment 0: prompt text"
-        - "seg 0: prompt text"
-        - "0: prompt text" (if starts with digit)
-
-        Args:
-            prompt_configs: List of prompt config dictionaries
-
-        Returns:
-            Dictionary mapping segment number to list of prompt configs
-        """
-        import re
-
-        segment_map = {}
-
-        for config in prompt_configs:
-            if not isinstance(config, dict):
-                continue
-            text = config.get('text', '')
-            if not isinstance(text, str):
-                text = str(text) if text is not None else ''
-            text = text.strip()
-            if not text:
-                continue
-
-            # Try to parse segment number from text
-            # Format: "segment 0: prompt" or "seg 0: prompt" or "0: prompt"
-            segment_match = re.match(r'^(?:segment|seg)?\s*(\d+)\s*:\s*(.+)', text, re.IGNORECASE)
-
-            if segment_match:
-                segment_num = int(segment_match.group(1))
-                prompt_text = segment_match.group(2).strip()
-
-                # Create new config with cleaned text
-                new_config = config.copy()
-                new_config['text'] = prompt_text
-
-                if segment_num not in segment_map:
-                    segment_map[segment_num] = []
-                segment_map[segment_num].append(new_config)
-            else:
-                # No segment marker - treat as segment 0
-                if 0 not in segment_map:
-                    segment_map[0] = []
-                segment_map[0].append(config)
-
-        return segment_map
-
 
 # Register the node
 NODE_CLASS_MAPPINGS = {
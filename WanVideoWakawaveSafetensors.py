@@ -0,0 +1,150 @@
+"""
+WanVideo Wakawave Safetensors Helpers
+Header-only inspection of .safetensors LoRA files (no tensor data is loaded)
+"""
+
+import os
+import re
+import json
+import struct
+from collections import Counter
+from typing import Any, Dict
+
+from .WanVideoWakawaveLoraIndex import LoraEntry, LoraIndex
+
+# First read covers the 8-byte length prefix plus typical headers in one call
+_HEADER_READ_SIZE = 256 * 1024
+
+# Refuse headers larger than this (the format caps them at 100MB)
+_MAX_HEADER_SIZE = 100 * 1024 * 1024
+
+# Bytes per element for every safetensors dtype
+DTYPE_SIZES = {
+    "BOOL": 1, "U8": 1, "I8": 1, "F8_E4M3": 1, "F8_E5M2": 1,
+    "I16": 2, "U16": 2, "F16": 2, "BF16": 2,
+    "I32": 4, "U32": 4, "F32": 4,
+    "I64": 8, "U64": 8, "F64": 8,
+}
+
+# Suffixes that name the LoRA half / auxiliary tensor rather than the targeted module
+_LORA_SUFFIX_RE = re.compile(
+    r"\.(?:lora_down|lora_up|lora_A|lora_B|lora\.down|lora\.up|lora_mid|alpha|diff|diff_b|dora_scale)"
+    r"(?:\.[A-Za-z_]+)?(?:\.weight|\.bias)?$"
+)
+_DOWN_RE = re.compile(r"\.(?:lora_down|lora_A|lora\.down)(?:\.[A-Za-z_]+)?\.weight$")
+_INDEX_RE = re.compile(r"\.\d+(?=\.|$)")
+
+
+class SafetensorsHeaderError(ValueError):
+    """Raised when a file does not have a readable safetensors header."""
+
+
+def read_safetensors_header(path: str) -> Dict[str, Any]:
+    """Read and parse the JSON header of a .safetensors file.
+
+    Reads the 8-byte little-endian length prefix and the header in a single
+    bounded read (a second read only for headers over 256KB). Tensor data is
+    never touched.
+    """
+    with open(path, "rb") as f:
+        head = f.read(_HEADER_READ_SIZE)
+        if len(head) < 8:
+            raise SafetensorsHeaderError("file too small for a safetensors header")
+        (header_size,) = struct.unpack("<Q", head[:8])
+        if header_size == 0 or header_size > _MAX_HEADER_SIZE:
+            raise SafetensorsHeaderError(f"invalid header size {header_size}")
+        raw = head[8:8 + header_size]
+        if len(raw) < header_size:
+            raw += f.read(header_size - len(raw))
+        if len(raw) < header_size:
+            raise SafetensorsHeaderError("truncated header")
+
+    try:
+        header = json.loads(raw)
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise SafetensorsHeaderError(f"header is not valid JSON: {e}") from e
+    if not isinstance(header, dict):
+        raise SafetensorsHeaderError("header is not a JSON object")
+    return header
+
+
+def tensor_specs(header: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Return {tensor_name: {"dtype", "shape", "data_offsets"}} without the __metadata__ entry."""
+    return {k: v for k, v in header.items() if k != "__metadata__" and isinstance(v, dict)}
+
+
+def tensor_nbytes(spec: Dict[str, Any]) -> int:
+    """Byte size of one tensor from its header spec (shape x dtype, data_offsets for unknown dtypes)."""
+    dtype_size = DTYPE_SIZES.get(spec.get("dtype", ""))
+    if dtype_size is None:
+        offsets = spec.get("data_offsets")
+        if isinstance(offsets, list) and len(offsets) == 2:
+            return int(offsets[1]) - int(offsets[0])
+        dtype_size = 4
+    count = 1
+    for dim in spec.get("shape", []):
+        count *= int(dim)
+    return count * dtype_size
+
+
+def module_prefix(tensor_name: str) -> str:
+    """Targeted module of a LoRA tensor with block indices collapsed, e.g. 'blocks.*.self_attn.q'."""
+    return _INDEX_RE.sub(".*", _LORA_SUFFIX_RE.sub("", tensor_name))
+
+
+def summarize_header(header: Dict[str, Any]) -> Dict[str, Any]:
+    """Summarize a parsed header: tensor count, dtypes, LoRA rank(s), targeted modules and metadata."""
+    specs = tensor_specs(header)
+    dtypes: Counter = Counter()
+    dtype_bytes: Counter = Counter()
+    ranks: Counter = Counter()
+    modules = set()
+    max_tensor_bytes = 0
+
+    for name, spec in specs.items():
+        dtype = spec.get("dtype", "?")
+        nbytes = tensor_nbytes(spec)
+        dtypes[dtype] += 1
+        dtype_bytes[dtype] += nbytes
+        max_tensor_bytes = max(max_tensor_bytes, nbytes)
+        modules.add(module_prefix(name))
+        shape = spec.get("shape") or []
+        if _DOWN_RE.search(name) and shape:
+            ranks[int(shape[0])] += 1
+
+    metadata = header.get("__metadata__")
+    return {
+        "format": "safetensors",
+        "tensor_count": len(specs),
+        "dtypes": dict(dtypes),
+        "dtype_bytes": dict(dtype_bytes),
+        "tensor_bytes": sum(dtype_bytes.values()),
+        "max_tensor_bytes": max_tensor_bytes,
+        "rank": ranks.most_common(1)[0][0] if ranks else None,
+        "ranks": sorted(ranks),
+        "modules": sorted(modules),
+        "metadata": metadata if isinstance(metadata, dict) else {},
+    }
+
+
+def get_header_info(index: LoraIndex, entry: LoraEntry) -> Dict[str, Any]:
+    """Header summary for an indexed LoRA, cached in the index by (path, size, mtime).
+
+    Non-safetensors files and unreadable headers produce a summary with an
+    "error" key instead of raising, so batch callers can report per file.
+    """
+    cached = index.cache_get("header", entry)
+    if cached is not None:
+        return cached
+
+    if os.path.splitext(entry.path)[1].lower() != ".safetensors":
+        info: Dict[str, Any] = {"format": os.path.splitext(entry.path)[1].lstrip(".").lower(),
+                                "error": "not a safetensors file"}
+    else:
+        try:
+            info = summarize_header(read_safetensors_header(entry.path))
+        except (OSError, SafetensorsHeaderError) as e:
+            # Don't cache failures - the file may still be mid-copy
+            return {"format": "safetensors", "error": str(e)}
+    index.cache_put("header", entry, info)
+    return info
@@ -0,0 +1,254 @@
+"""
+WanVideo Wakawave Text Encode
+Text embeddings cached in memory and on disk by (encoder identity, exact prompt text)
+"""
+
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .WanVideoWakawaveFileCache import get_file_cache
+
+# Bump when the cached embedding layout changes so old cache entries are not reused
+EMBED_FORMAT_VERSION = 1
+
+
+def embedding_key(identity: str, text: str) -> str:
+    """Cache key of one prompt's embedding: hash of the encoder identity and the exact text."""
+    payload = json.dumps({"version": EMBED_FORMAT_VERSION, "encoder": identity, "text": text},
+                         separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def encoder_identity(t5: Dict[str, Any]) -> str:
+    """
+    Stable identity of a WANTEXTENCODER: model name, dtype, quantization and
+    the names/shapes/dtypes of its parameters, so two encoders only share
+    cache entries when they are the same model loaded the same way.
+    """
+    encoder = t5.get("model") if isinstance(t5, dict) else t5
+    module = getattr(encoder, "model", encoder)
+    parameters = []
+    named_parameters = getattr(module, "named_parameters", None)
+    if callable(named_parameters):
+        parameters = [[name, list(param.shape), str(param.dtype)] for name, param in named_parameters()]
+    payload = json.dumps({
+        "class": type(encoder).__name__,
+        "name": t5.get("name") if isinstance(t5, dict) else None,
+        "dtype": str(t5.get("dtype")) if isinstance(t5, dict) else None,
+        "quantization": str(getattr(encoder, "quantization", "")),
+        "parameters": parameters,
+    }, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Memory LRU of prompt embeddings (capped in bytes) in front of the
+    "embeds" FileCache on disk. Tensors are kept on the CPU; callers get the
+    cached tensor itself and must not modify it in place.
+    """
+
+    def __init__(self, max_bytes: int = 512 * 1024 ** 2):
+        self.max_bytes = max_bytes
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _nbytes(tensor: Any) -> int:
+        return tensor.numel() * tensor.element_size()
+
+    def _remember(self, key: str, tensor: Any) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return
+            self._entries[key] = tensor
+            self._bytes += self._nbytes(tensor)
+            while self._bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= self._nbytes(evicted)
+
+    def get(self, key: str, disk: bool = True) -> Optional[Any]:
+        """Cached embedding for key from memory, then disk, or None."""
+        with self._lock:
+            tensor = self._entries.get(key)
+            if tensor is not None:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return tensor
+        if disk:
+            path = get_file_cache("embeds").get(key)
+            if path is not None:
+                from safetensors.torch import load_file
+                try:
+                    tensor = load_file(path)["embeds"]
+                except Exception as e:
+                    print(f"⚠️  Unreadable cached embedding {path}: {e}")
+                    tensor = None
+                if tensor is not None:
+                    with self._lock:
+                        self.disk_hits += 1
+                    self._remember(key, tensor)
+                    return tensor
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, tensor: Any, disk: bool = True, metadata: Optional[Dict[str, str]] = None) -> Any:
+        """Store a CPU copy of tensor (in memory and, if disk, in the file cache). Returns the stored tensor."""
+        tensor = tensor.detach().to("cpu").contiguous()
+        if self.max_bytes > 0:
+            self._remember(key, tensor)
+        if disk:
+            from safetensors.torch import save_file
+            try:
+                get_file_cache("embeds").get_or_create(
+                    key, lambda tmp_path: save_file({"embeds": tensor}, tmp_path, metadata=metadata or {}))
+            except OSError as e:
+                print(f"⚠️  Could not write embedding cache entry: {e}")
+        return tensor
+
+    def encode(self, encode: Callable[[List[str]], List[Any]], identity: str, texts: List[str],
+               disk: bool = True) -> Tuple[List[Any], int]:
+        """
+        (embedding per text, cache hits) - only the texts missing from both
+        caches are passed to encode, in one call, and repeated texts are
+        encoded once. encode takes a list of strings and returns one tensor
+        per string.
+        """
+        keys = [embedding_key(identity, text) for text in texts]
+        found: Dict[str, Any] = {}
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key in found or key in missing:
+                continue
+            tensor = self.get(key, disk=disk)
+            if tensor is None:
+                missing[key] = text
+            else:
+                found[key] = tensor
+        hits = len(found)
+
+        if missing:
+            encoded = encode(list(missing.values()))
+            if len(encoded) != len(missing):
+                raise ValueError(f"encoder returned {len(encoded)} embeddings for {len(missing)} prompts")
+            for (key, text), tensor in zip(missing.items(), encoded):
+                found[key] = self.put(key, tensor, disk=disk, metadata={
+                    "wakawave_embed_version": str(EMBED_FORMAT_VERSION), "wakawave_encoder": identity, "text": text})
+        return [found[key] for key in keys], hits
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else None,
+            }
+
+
+_embedding_cache: Optional[EmbeddingCache] = None
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    global _embedding_cache
+    if _embedding_cache is None:
+        _embedding_cache = EmbeddingCache()
+    return _embedding_cache
+
+
+def configure_embedding_cache(max_bytes: int) -> None:
+    """Set the memory cap of the embedding LRU (0 keeps embeddings on disk only)."""
+    cache = get_embedding_cache()
+    cache.max_bytes = max(0, int(max_bytes))
+    if not cache.max_bytes:
+        cache.clear()
+
+
+class WanVideoWakawaveTextEncode:
+    """
+    WanVideo Wakawave Text Encode
+
+    Encodes prompts with a WanVideo T5 text encoder, caching each prompt's
+    embedding by (encoder identity, exact text) in memory and on disk. When
+    every prompt is cached the encoder is never moved to the GPU.
+    """
+
+    CATEGORY = "WanVideo/Prompts"
+    RETURN_TYPES = ("WANVIDEOTEXTEMBEDS",)
+    RETURN_NAMES = ("text_embeds",)
+    FUNCTION = "encode"
+    DESCRIPTION = "T5 text encode with an in-memory and on-disk embedding cache keyed by encoder and prompt text"
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "t5": ("WANTEXTENCODER",),
+                "positive_prompt": ("STRING", {"forceInput": True}),
+                "negative_prompt": ("STRING", {"forceInput": True}),
+            },
+            "optional": {
+                "force_offload": ("BOOLEAN", {"default": True, "tooltip": "Move the encoder back to the offload device after encoding"}),
+                "device": (["gpu", "cpu"], {"default": "gpu", "tooltip": "Device to encode on when a prompt is not cached"}),
+                "disk_cache": ("BOOLEAN", {"default": True, "tooltip": "Also keep embeddings on disk, so they survive restarts"}),
+            },
+        }
+
+    def encode(self, t5, positive_prompt, negative_prompt, force_offload=True, device="gpu", disk_cache=True):
+        cache = get_embedding_cache()
+        identity = encoder_identity(t5)
+        texts = [positive_prompt or "", negative_prompt or ""]
+
+        embeds, hits = cache.encode(lambda missing: self._run_encoder(t5, missing, device, force_offload),
+                                    identity, texts, disk=disk_cache)
+        print(f"🧬 Wakawave Text Encode: {hits}/{len(set(texts))} prompts from cache")
+        return ({"prompt_embeds": [embeds[0]], "negative_prompt_embeds": [embeds[1]]},)
+
+    @staticmethod
+    def _run_encoder(t5: Dict[str, Any], texts: List[str], device: str, force_offload: bool) -> List[Any]:
+        import torch
+        import comfy.model_management as mm
+
+        encoder = t5["model"]
+        encode_device = mm.get_torch_device() if device == "gpu" else torch.device("cpu")
+        offload_device = mm.unet_offload_device()
+        quantized = getattr(encoder, "quantization", "disabled") != "disabled"
+
+        encoder.model.to(encode_device)
+        try:
+            with torch.no_grad(), torch.autocast(device_type=mm.get_autocast_device(encode_device),
+                                                 dtype=t5.get("dtype", torch.bfloat16), enabled=quantized):
+                embeds = encoder(texts, encode_device)
+        finally:
+            if force_offload:
+                encoder.model.to(offload_device)
+                mm.soft_empty_cache()
+        return [embed.to(offload_device) for embed in embeds]
+
+
+# Register the node
+NODE_CLASS_MAPPINGS = {
+    "WanVideoWakawaveTextEncode": WanVideoWakawaveTextEncode
+}
+
+NODE_DISPLAY_NAME_MAPPINGS = {
+    "WanVideoWakawaveTextEncode": "🌊 WanVideo Wakawave Text Encode"
+}
@@ -0,0 +1,237 @@
+"""
+WanVideo Wakawave Wildcards
+Seeded {a|b|c} alternation and __name__ wildcard expansion from an mtime-invalidated index of wildcard files
+"""
+
+import os
+import re
+import random
+import threading
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple, Union
+
+# "__name__" or "__folder/name__" (a wildcard file's path relative to the wildcards directory, without .txt)
+_WILDCARD_RE = re.compile(r"__([\w\-./]+?)__")
+
+# Wildcards that expand to other wildcards are followed this deep, so a self-referencing file can't loop
+MAX_WILDCARD_DEPTH = 10
+
+# A compiled template is a tuple of parts: literal text, ("alt", (template, ...)) or ("wild", name, original text)
+Template = Tuple[Union[str, Tuple], ...]
+
+
+def _parse_sequence(text: str, pos: int, nested: bool) -> Tuple[Template, int]:
+    parts: List[Union[str, Tuple]] = []
+    literal: List[str] = []
+
+    def flush():
+        if literal:
+            parts.append("".join(literal))
+            literal.clear()
+
+    while pos < len(text):
+        char = text[pos]
+        if nested and char in "|}":
+            break
+        if char == "{":
+            options, end = _parse_group(text, pos + 1)
+            if options is not None:
+                flush()
+                parts.append(("alt", options))
+                pos = end
+                continue
+        elif char == "_":
+            match = _WILDCARD_RE.match(text, pos)
+            if match:
+                flush()
+                parts.append(("wild", match.group(1).lower(), match.group(0)))
+                pos = match.end()
+                continue
+        literal.append(char)  # Includes a "{" that doesn't open a {a|b} group, which stays literal text
+        pos += 1
+    flush()
+    return tuple(parts), pos
+
+
+def _parse_group(text: str, pos: int) -> Tuple[Optional[Tuple[Template, ...]], int]:
+    """
+    Options of a {a|b|c} group starting after its "{", or None if it is never
+    closed or has a single option - "{masterpiece}" or JSON-like braces are
+    ordinary text, not alternations.
+    """
+    options = []
+    while True:
+        option, pos = _parse_sequence(text, pos, nested=True)
+        options.append(option)
+        if pos >= len(text):
+            return None, pos
+        if text[pos] == "}":
+            return (tuple(options), pos + 1) if len(options) > 1 else (None, pos + 1)
+        pos += 1  # Skip the "|"
+
+
+@lru_cache(maxsize=4096)
+def compile_template(text: str) -> Template:
+    """Parse {a|b|c} groups (nestable) and __name__ wildcards once; later expansions only walk the result."""
+    return _parse_sequence(text, 0, nested=False)[0]
+
+
+def has_dynamic_syntax(text: str) -> bool:
+    return bool(text) and ("{" in text or "__" in text)
+
+
+class WildcardIndex:
+    """
+    Wildcard files (*.txt, one option per line, "#" comments) under a
+    directory, compiled once and kept in memory.
+
+    A lookup stats only the one file it needs and re-reads it when its
+    (mtime, size) changed; the directory listing is rebuilt when a name is
+    missing and a directory's mtime changed, so new files are picked up
+    without a restart.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._files: Optional[Dict[str, str]] = None
+        self._dir_mtimes: Dict[str, int] = {}
+        self._entries: Dict[str, Tuple[Tuple[int, int], Tuple[Template, ...]]] = {}
+
+    def _scan(self) -> Dict[str, str]:
+        files: Dict[str, str] = {}
+        dir_mtimes: Dict[str, int] = {}
+        for root, dirs, names in os.walk(self.directory):
+            dirs.sort()
+            try:
+                dir_mtimes[root] = os.stat(root).st_mtime_ns
+            except OSError:
+                continue
+            for name in sorted(names):
+                if name.lower().endswith(".txt"):
+                    path = os.path.join(root, name)
+                    key = os.path.relpath(path, self.directory)[:-4].replace(os.sep, "/").lower()
+                    files[key] = path
+        if not dir_mtimes:
+            try:
+                dir_mtimes[self.directory] = os.stat(self.directory).st_mtime_ns
+            except OSError:
+                dir_mtimes[self.directory] = -1  # Picked up once the directory is created
+        self._files, self._dir_mtimes = files, dir_mtimes
+        return files
+
+    def _directories_changed(self) -> bool:
+        for directory, mtime in self._dir_mtimes.items():
+            try:
+                if os.stat(directory).st_mtime_ns != mtime:
+                    return True
+            except OSError:
+                if mtime != -1:
+                    return True
+        return False
+
+    def _listing(self, name: Optional[str] = None) -> Dict[str, str]:
+        files = self._files
+        if files is None or ((name is None or name not in files) and self._directories_changed()):
+            files = self._scan()
+        return files
+
+    def get(self, name: str) -> Optional[Tuple[Template, ...]]:
+        """Compiled options of wildcard name, or None if there is no such file (or it has no options)."""
+        with self._lock:
+            path = self._listing(name).get(name)
+            if path is None:
+                return None
+            try:
+                st = os.stat(path)
+            except OSError:
+                self._entries.pop(name, None)
+                return None
+            state = (st.st_mtime_ns, st.st_size)
+            cached = self._entries.get(name)
+            if cached is not None and cached[0] == state:
+                return cached[1] or None
+            try:
+                with open(path, "r", encoding="utf-8", errors="replace") as f:
+                    lines = [line.strip() for line in f]
+            except OSError:
+                return None
+            options = tuple(compile_template(line) for line in lines if line and not line.startswith("#"))
+            self._entries[name] = (state, options)
+            return options or None
+
+    def names(self) -> List[str]:
+        with self._lock:
+            return sorted(self._listing())
+
+    def signature(self) -> List[Tuple[str, int, int]]:
+        """(name, mtime, size) of every wildcard file - changes whenever any wildcard would expand differently."""
+        with self._lock:
+            files = self._listing()
+        result = []
+        for name, path in sorted(files.items()):
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            result.append((name, st.st_mtime_ns, st.st_size))
+        return result
+
+
+def _expand(template: Template, rng: random.Random, index: WildcardIndex, depth: int, missing: set) -> str:
+    out = []
+    for part in template:
+        if isinstance(part, str):
+            out.append(part)
+        elif part[0] == "alt":
+            out.append(_expand(rng.choice(part[1]), rng, index, depth, missing))
+        else:
+            options = index.get(part[1]) if depth < MAX_WILDCARD_DEPTH else None
+            if options is None:
+                missing.add(part[1])
+                out.append(part[2])
+            else:
+                out.append(_expand(rng.choice(options), rng, index, depth + 1, missing))
+    return "".join(out)
+
+
+def expand_prompt(text: str, seed: int, variant: int = 0, stream: str = "",
+                  missing: Optional[set] = None) -> str:
+    """
+    Expand the alternations and wildcards in text. The choice depends only
+    on (seed, variant, stream, text), so the same inputs always give the
+    same prompt. Unknown (or too deeply nested) wildcards are left in
+    place and added to missing.
+    """
+    if not has_dynamic_syntax(text):
+        return text
+    rng = random.Random(f"wakawave:{seed}:{variant}:{stream}")
+    return _expand(compile_template(text), rng, get_wildcard_index(),
+                   0, missing if missing is not None else set())
+
+
+_wildcards_dir: Optional[str] = None
+_index: Optional[WildcardIndex] = None
+
+
+def default_wildcards_dir() -> str:
+    """ComfyUI's user directory when available, else next to the node."""
+    try:
+        import folder_paths  # type: ignore
+        return os.path.join(folder_paths.get_user_directory(), "wakawave_wildcards")
+    except (ImportError, AttributeError):
+        return os.path.join(os.path.dirname(os.path.abspath(__file__)), "wildcards")
+
+
+def configure_wildcards(directory: Optional[str]) -> None:
+    """Set the wildcards directory (the index is rebuilt on next use)."""
+    global _wildcards_dir, _index
+    _wildcards_dir = directory or None
+    _index = None
+
+
+def get_wildcard_index() -> WildcardIndex:
+    global _index
+    if _index is None:
+        _index = WildcardIndex(_wildcards_dir or default_wildcards_dir())
+    return _index
@@ -3,7 +3,11 @@ WanVideo Wakawave - Advanced LoRA & Prompt Tools
 """
 
 import traceback
+import asyncio
+import bisect
+import hashlib
 import os
+import time
 import json
 import folder_paths
 from aiohttp import web
@@ -41,184 +45,882 @@ except Exception as e:
     print(f"❌ Failed to load WanVideoWakawavePromptBuilder: {e}")
     traceback.print_exc()
 
+# Import WanVideoWakawaveTextEncode (cached T5 text encode)
+try:
+    from .WanVideoWakawaveTextEncode import (
+        NODE_CLASS_MAPPINGS as WAKAWAVE_ENCODE_MAPPINGS,
+        NODE_DISPLAY_NAME_MAPPINGS as WAKAWAVE_ENCODE_DISPLAY_MAPPINGS
+    )
+    NODE_CLASS_MAPPINGS.update(WAKAWAVE_ENCODE_MAPPINGS)
+    NODE_DISPLAY_NAME_MAPPINGS.update(WAKAWAVE_ENCODE_DISPLAY_MAPPINGS)
+    print("✅ WanVideoWakawaveTextEncode loaded")
+except Exception as e:
+    print(f"❌ Failed to load WanVideoWakawaveTextEncode: {e}")
+    traceback.print_exc()
+
 # Web directory for JavaScript
 WEB_DIRECTORY = "./web"
 
 # Cache verbose output toggle - set to True to see every cached LoRA file
 WAKAWAVE_CACHE_VERBOSE = False
 
-# Global cache for LoRA file sizes - populated on server startup
-_lora_sizes_cache = {}
+# Seconds between incremental LoRA index refreshes (0 disables the background refresher)
+WAKAWAVE_RESCAN_INTERVAL = float(os.environ.get("WAKAWAVE_RESCAN_INTERVAL", "60"))
+
+# Persisted LoRA index - loaded instantly on startup, then validated in the background
+WAKAWAVE_INDEX_PATH = os.environ.get(
+    "WAKAWAVE_INDEX_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "lora_index.sqlite"))
+
+# Skip the blocking import-time scan when there is no persisted index (scan runs in the background instead)
+WAKAWAVE_SKIP_STARTUP_SCAN = os.environ.get("WAKAWAVE_SKIP_STARTUP_SCAN", "").lower() in ("1", "true", "yes")
+
+# Seconds a single loras root may take to scan before it is marked unavailable (0 waits forever)
+WAKAWAVE_ROOT_TIMEOUT = float(os.environ.get("WAKAWAVE_ROOT_TIMEOUT", "30"))
+
+# Thread count for filesystem work (parallel stats, API handlers)
+WAKAWAVE_FS_WORKERS = int(os.environ.get("WAKAWAVE_FS_WORKERS", "8"))
+
+# Background hashing threads, and whether to hash every LoRA (and every new one) automatically
+WAKAWAVE_HASH_WORKERS = int(os.environ.get("WAKAWAVE_HASH_WORKERS", "2"))
+WAKAWAVE_HASH_ON_STARTUP = os.environ.get("WAKAWAVE_HASH_ON_STARTUP", "").lower() in ("1", "true", "yes")
+
+# Directory for derived LoRA files (merged stacks, slim extracts, ...) and the per-kind cache size caps
+WAKAWAVE_CACHE_DIR = os.environ.get(
+    "WAKAWAVE_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache"))
+WAKAWAVE_MERGE_CACHE_GB = float(os.environ.get("WAKAWAVE_MERGE_CACHE_GB", "20"))
+WAKAWAVE_SLIM_CACHE_GB = float(os.environ.get("WAKAWAVE_SLIM_CACHE_GB", "10"))
+WAKAWAVE_DTYPE_CACHE_GB = float(os.environ.get("WAKAWAVE_DTYPE_CACHE_GB", "20"))
+WAKAWAVE_EMBED_CACHE_GB = float(os.environ.get("WAKAWAVE_EMBED_CACHE_GB", "5"))
+
+# Memory cap of the Text Encode node's in-process embedding LRU (0 keeps embeddings on disk only)
+WAKAWAVE_EMBED_MEMORY_MB = float(os.environ.get("WAKAWAVE_EMBED_MEMORY_MB", "512"))
+
+# Convert fp32 LoRAs to a cached "fp16" or "bf16" copy unless a LoRA Options node says otherwise ("" = off)
+WAKAWAVE_CONVERT_DTYPE = os.environ.get("WAKAWAVE_CONVERT_DTYPE", "").lower()
+
+# Max bytes of LoRA files read ahead into the page cache per request (0 disables prefetch)
+WAKAWAVE_PREFETCH_GB = float(os.environ.get("WAKAWAVE_PREFETCH_GB", "16"))
+
+# Seconds over which LoRA index changes are coalesced into one WebSocket message (0 disables the push)
+WAKAWAVE_PUSH_INTERVAL = float(os.environ.get("WAKAWAVE_PUSH_INTERVAL", "1"))
+
+# Directory for saved LoRA templates and prompt presets (default: <ComfyUI user dir>/wakawave_presets)
+WAKAWAVE_PRESETS_DIR = os.environ.get("WAKAWAVE_PRESETS_DIR", "")
+
+# Directory of __name__ wildcard files for the Prompt Builder (default: <ComfyUI user dir>/wakawave_wildcards)
+WAKAWAVE_WILDCARDS_DIR = os.environ.get("WAKAWAVE_WILDCARDS_DIR", "")
+
+# Parsed prompt bundles kept in memory by the Prompt Builder (0 disables the cache)
+WAKAWAVE_PROMPT_CACHE_SIZE = int(os.environ.get("WAKAWAVE_PROMPT_CACHE_SIZE", "256"))
+
+# Shared LoRA index - populated on server startup
+from .WanVideoWakawaveLoraIndex import (
+    get_lora_index, get_refresher, initialize_lora_index, startup_timings, configure_fs_workers, run_fs
+)
+from .WanVideoWakawaveSafetensors import get_header_info
+from .WanVideoWakawaveHashing import get_hasher
+from .WanVideoWakawaveModelInfo import get_local_model_info
+from .WanVideoWakawaveFileCache import configure_file_caches, all_cache_stats, get_file_cache
+from .WanVideoWakawavePrefetch import get_prefetcher
+from .WanVideoWakawaveLoraDtype import configure_dtype_conversion
+from .WanVideoWakawaveLoraSearch import get_search_index
+from .WanVideoWakawaveEvents import IndexChangeBroadcaster
+from .WanVideoWakawavePresets import (
+    PRESET_KINDS, PresetError, configure_presets, get_preset_store, normalize_lora_template
+)
+
+configure_file_caches(WAKAWAVE_CACHE_DIR, {
+    "merged": int(WAKAWAVE_MERGE_CACHE_GB * 1024 ** 3),
+    "slim": int(WAKAWAVE_SLIM_CACHE_GB * 1024 ** 3),
+    "dtype": int(WAKAWAVE_DTYPE_CACHE_GB * 1024 ** 3),
+    "embeds": int(WAKAWAVE_EMBED_CACHE_GB * 1024 ** 3),
+})
+configure_dtype_conversion(WAKAWAVE_CONVERT_DTYPE)
+configure_presets(WAKAWAVE_PRESETS_DIR)
+get_prefetcher().budget_bytes = int(WAKAWAVE_PREFETCH_GB * 1024 ** 3)
+
+# Prompt-side modules are optional here like their nodes above: if one fails to import,
+# the LoRA loader and its routes still load and only that module's config/stats are skipped
+try:
+    from .WanVideoWakawavePromptBuilder import configure_bundle_cache, bundle_cache_stats
+    configure_bundle_cache(WAKAWAVE_PROMPT_CACHE_SIZE)
+except Exception as e:
+    print(f"⚠️  Prompt bundle cache unavailable: {e}")
+    bundle_cache_stats = None
 
-def _scan_and_cache_lora_sizes():
-    """Scan all configured LoRAs directories (using ComfyUI's folder_paths) and cache file sizes."""
-    global _lora_sizes_cache
+try:
+    from .WanVideoWakawaveWildcards import configure_wildcards
+    configure_wildcards(WAKAWAVE_WILDCARDS_DIR)
+except Exception as e:
+    print(f"⚠️  Wildcards unavailable: {e}")
+
+try:
+    from .WanVideoWakawaveTextEncode import configure_embedding_cache, get_embedding_cache
+    configure_embedding_cache(int(WAKAWAVE_EMBED_MEMORY_MB * 1024 ** 2))
+except Exception as e:
+    print(f"⚠️  Embedding cache unavailable: {e}")
+    get_embedding_cache = None
+
+_hash_listener_added = []
+_index_broadcaster = []
+
+def _send_to_clients(event, data):
+    """Push an event to every connected browser (no-op before the server exists)."""
+    import server as server_module
+    if server_module.PromptServer.instance is not None:
+        server_module.PromptServer.instance.send_sync(event, data)
+
+def _init_lora_index():
+    """Load or scan the shared LoRA index (only the first call does any work)."""
     try:
-        print("[Wakawave] Scanning all configured LoRAs directories...")
-        
-        # Get all loras directories from ComfyUI's folder_paths
-        # ComfyUI loads extra_model_paths.yaml into folder_names_and_paths
-        loras_dirs = []
-        
-        # Check if folder_names_and_paths exists (it should in ComfyUI)
-        if hasattr(folder_paths, 'folder_names_and_paths'):
-            print("[Wakawave] Using ComfyUI's folder_names_and_paths...")
-            
-            # folder_names_and_paths is a dict where:
-            # key = folder type (e.g., "loras")
-            # value = (list_of_paths, list_of_extensions)
-            if 'loras' in folder_paths.folder_names_and_paths:
-                paths_tuple = folder_paths.folder_names_and_paths['loras']
-                if isinstance(paths_tuple, (tuple, list)):
-                    # Extract the paths list (first element of tuple)
-                    paths_list = paths_tuple[0] if isinstance(paths_tuple[0], (list, tuple)) else paths_tuple
-                    
-                    if isinstance(paths_list, (list, tuple)):
-                        for path in paths_list:
-                            if os.path.exists(path):
-                                loras_dirs.append(path)
-                                print(f"[Wakawave]   ✓ {path}")
-                            else:
-                                print(f"[Wakawave]   ✗ {path} (not found)")
-            else:
-                print("[Wakawave] No 'loras' entry in folder_names_and_paths, falling back to default")
-                default_loras_dir = os.path.join(folder_paths.models_dir, "loras")
-                if os.path.exists(default_loras_dir):
-                    loras_dirs.append(default_loras_dir)
-                    print(f"[Wakawave]   ✓ {default_loras_dir}")
+        print("[Wakawave] Initializing LoRA index...")
+        configure_fs_workers(WAKAWAVE_FS_WORKERS)
+        timings = initialize_lora_index(
+            WAKAWAVE_INDEX_PATH, WAKAWAVE_RESCAN_INTERVAL,
+            skip_startup_scan=WAKAWAVE_SKIP_STARTUP_SCAN, verbose=WAKAWAVE_CACHE_VERBOSE,
+            root_timeout=WAKAWAVE_ROOT_TIMEOUT)
+        if timings.get("source") == "persisted":
+            print(f"[Wakawave] ✅ Loaded {timings['entries']} LoRAs from {WAKAWAVE_INDEX_PATH} "
+                  f"in {timings['load_seconds']}s (validating in background)")
+        elif timings.get("source") == "deferred":
+            print("[Wakawave] ⏩ Startup scan skipped, scanning in background")
         else:
-            print("[Wakawave] folder_names_and_paths not available, using fallback method")
-            default_loras_dir = os.path.join(folder_paths.models_dir, "loras")
-            if os.path.exists(default_loras_dir):
-                loras_dirs.append(default_loras_dir)
-                print(f"[Wakawave]   ✓ {default_loras_dir}")
-        
-        if not loras_dirs:
-            print("[Wakawave] ⚠️  No LoRAs directories found!")
-            return
-        
-        # Scan all directories
-        total_cached = 0
-        for loras_dir in loras_dirs:
-            try:
-                if not os.path.exists(loras_dir):
-                    continue
-                
-                lora_files = [f for f in os.listdir(loras_dir) if os.path.isfile(os.path.join(loras_dir, f))]
-                
-                for lora_file in lora_files:
-                    try:
-                        lora_path = os.path.join(loras_dir, lora_file)
-                        size = os.path.getsize(lora_path)
-                        _lora_sizes_cache[lora_file] = size
-                        total_cached += 1
-                    except Exception as e:
-                        if WAKAWAVE_CACHE_VERBOSE:
-                            print(f"[Wakawave] Error caching {lora_file}: {e}")
-            except Exception as e:
-                print(f"[Wakawave] Error scanning {loras_dir}: {e}")
-        
-        print(f"[Wakawave] ✅ Cached {total_cached} LoRA file sizes")
+            print(f"[Wakawave] ✅ Cached {timings.get('entries', 0)} LoRA file sizes in {timings.get('scan_seconds', 0)}s")
+        print(f"[Wakawave] Startup blocked for {timings.get('blocking_seconds', 0)}s")
+
+        hasher = get_hasher()
+        hasher.workers = WAKAWAVE_HASH_WORKERS
+        if WAKAWAVE_HASH_ON_STARTUP and not _hash_listener_added:
+            _hash_listener_added.append(True)
+            index = get_lora_index()
+            # Hash what is indexed now, plus anything added/changed by later refreshes
+            index.add_listener(lambda changes: hasher.submit_all(
+                e for e in map(index.get, changes["added"] + changes["updated"]) if e is not None))
+            queued = hasher.submit_all(index.entries())
+            print(f"[Wakawave] Queued {queued} LoRAs for background hashing")
+
+        if WAKAWAVE_PUSH_INTERVAL > 0 and not _index_broadcaster:
+            # Push coalesced index diffs (new/changed/removed files, finished hashes) to the UI
+            broadcaster = IndexChangeBroadcaster(get_lora_index(), _send_to_clients, WAKAWAVE_PUSH_INTERVAL)
+            get_lora_index().add_listener(broadcaster.on_index_change)
+            hasher.add_listener(broadcaster.on_hashed)
+            _index_broadcaster.append(broadcaster)
     except Exception as e:
-        print(f"[Wakawave] Error in _scan_and_cache_lora_sizes: {e}")
-        import traceback
+        print(f"[Wakawave] Error in _init_lora_index: {e}")
         traceback.print_exc()
 
 # API Routes
 async def get_lora_file_sizes(request):
-    """Get file sizes for LoRA files (from cache or by scanning)."""
+    """Get file sizes for LoRA files (from the LoRA index). Prefer the POST form for many names."""
     try:
         lora_names_param = request.rel_url.query.get('names', '')
         lora_names = [n.strip() for n in lora_names_param.split(',') if n.strip()]
         
         if not lora_names:
-            print("[Wakawave API] No names provided in request")
             return web.json_response({})
         
-        print(f"[Wakawave API] Requesting sizes for LoRAs: {lora_names}")
-        print(f"[Wakawave API] Cache contains {len(_lora_sizes_cache)} entries")
-        
-        sizes = {}
-        loras_dir = os.path.join(folder_paths.models_dir, "loras")
-        
-        for lora_name in lora_names:
-            # Try cache first
-            if lora_name in _lora_sizes_cache:
-                sizes[lora_name] = _lora_sizes_cache[lora_name]
-                print(f"[Wakawave API] ✅ Cache hit for '{lora_name}'")
-            else:
-                # Try to find the file and calculate size on-demand
-                try:
-                    # Try direct path first
-                    lora_path = os.path.join(loras_dir, lora_name)
-                    if os.path.isfile(lora_path):
-                        size = os.path.getsize(lora_path)
-                        sizes[lora_name] = size
-                        _lora_sizes_cache[lora_name] = size  # Cache it for next time
-                        print(f"[Wakawave API] ✅ Calculated on-demand for '{lora_name}': {size} bytes")
-                    else:
-                        # Try using ComfyUI's path resolver
-                        try:
-                            resolved_path = folder_paths.get_full_path("loras", lora_name)
-                            size = os.path.getsize(resolved_path)
-                            sizes[lora_name] = size
-                            _lora_sizes_cache[lora_name] = size
-                            print(f"[Wakawave API] ✅ Resolved path for '{lora_name}': {size} bytes")
-                        except Exception as e2:
-                            print(f"[Wakawave API] ⚠️  Could not resolve '{lora_name}': {e2}")
-                except Exception as e:
-                    print(f"[Wakawave API] ⚠️  Error getting size for '{lora_name}': {e}")
-        
-        print(f"[Wakawave API] Returning {len(sizes)} sizes: {list(sizes.keys())}")
+        index = get_lora_index()
+        # Hits are re-stat'ed (a file overwritten in place keeps its directory mtime)
+        # and misses fall back to folder_paths + stat, so resolve off the event loop
+        entries = await run_fs(lambda: [index.lookup(name, verify=True) for name in lora_names])
+        sizes = {name: entry.size for name, entry in zip(lora_names, entries) if entry is not None}
         return web.json_response(sizes)
     except Exception as e:
         print(f"[Wakawave API] Error in get_lora_file_sizes: {e}")
-        import traceback
         traceback.print_exc()
         return web.json_response({})
 
+async def post_lora_file_sizes(request):
+    """
+    Batch size lookup: POST {"names": [...], "header": false}.
+
+    Returns {"files": {name: {"size", "mtime", "missing"}}}, plus a header
+    summary per file when "header" is true. Meant for one request covering
+    every loader node in a workflow.
+    """
+    try:
+        body = await request.json()
+        if not isinstance(body, dict):
+            return web.json_response({"error": "expected a JSON object"}, status=400)
+        names = body.get("names", [])
+        if not isinstance(names, list):
+            return web.json_response({"error": "'names' must be a list"}, status=400)
+        if len(names) > WAKAWAVE_MAX_BATCH:
+            return web.json_response({"error": f"at most {WAKAWAVE_MAX_BATCH} names per request"}, status=413)
+        names = list(dict.fromkeys(n for n in names if isinstance(n, str)))
+        with_header = bool(body.get("header", False))
+
+        index = get_lora_index()
+        def resolve():
+            files = {}
+            for name in names:
+                entry = index.lookup(name, verify=True)
+                if entry is None:
+                    files[name] = {"size": None, "mtime": None, "missing": True}
+                    continue
+                info = {"size": entry.size, "mtime": entry.mtime, "missing": False}
+                if with_header:
+                    header = get_header_info(index, entry)
+                    info["header"] = {k: header[k] for k in _CATALOG_HEADER_FIELDS if k in header}
+                files[name] = info
+            return files
+
+        files = await run_fs(resolve)
+        return web.json_response({"files": files, "missing": sum(1 for f in files.values() if f["missing"])})
+    except json.JSONDecodeError:
+        return web.json_response({"error": "invalid JSON body"}, status=400)
+    except Exception as e:
+        print(f"[Wakawave API] Error in post_lora_file_sizes: {e}")
+        traceback.print_exc()
+        return web.json_response({"error": str(e)}, status=500)
+
+def _startup_report():
+    """Startup timing breakdown, including the background validation once it has run."""
+    report = dict(startup_timings)
+    refresher = get_refresher()
+    if refresher is not None and refresher.initial_stats is not None:
+        report["background_refresh"] = refresher.initial_stats
+    return report
+
 async def get_lora_cache_debug(request):
-    """Debug endpoint - shows what's in the cache and what exists in the directory."""
+    """Debug endpoint - shows what's in the LoRA index and which roots were scanned."""
     try:
-        loras_dir = os.path.join(folder_paths.models_dir, "loras")
-        
-        # Get all files from disk
-        disk_files = []
-        if os.path.exists(loras_dir):
-            disk_files = [f for f in os.listdir(loras_dir) if os.path.isfile(os.path.join(loras_dir, f))]
+        index = get_lora_index()
+        entries = index.entries()
+        root_status = index.root_status
         
         return web.json_response({
-            "cache_count": len(_lora_sizes_cache),
-            "cache_keys": list(_lora_sizes_cache.keys()),
-            "cache_sizes": {k: v for k, v in _lora_sizes_cache.items()},
-            "disk_count": len(disk_files),
-            "disk_files": disk_files,
-            "loras_dir": loras_dir,
-            "dir_exists": os.path.exists(loras_dir)
+            "cache_count": len(entries),
+            "cache_keys": [entry.name for entry in entries],
+            "cache_sizes": {entry.name: entry.size for entry in entries},
+            "roots": [
+                {
+                    "path": root,
+                    "count": sum(1 for entry in entries if entry.root == root),
+                    # Availability and scan latency from the last scan/refresh (no filesystem access here)
+                    **root_status.get(root, {"available": None, "seconds": None, "error": None})
+                }
+                for root in index.roots
+            ],
+            "scanned": index.scanned,
+            "last_refresh": index.last_refresh,
+            "rescan_interval": WAKAWAVE_RESCAN_INTERVAL,
+            "index_path": WAKAWAVE_INDEX_PATH,
+            "startup": _startup_report()
         })
     except Exception as e:
         print(f"[Wakawave Debug] Error: {e}")
-        import traceback
         traceback.print_exc()
         return web.json_response({"error": str(e)})
 
+async def rescan_loras(request):
+    """Refresh the LoRA index on demand (incremental; pass ?full=1 for a full walk)."""
+    try:
+        index = get_lora_index()
+        full = request.rel_url.query.get('full', '').lower() in ('1', 'true', 'yes')
+        if full:
+            count = await run_fs(index.scan, verbose=WAKAWAVE_CACHE_VERBOSE)
+            return web.json_response({"full": True, "entries": count, "roots": index.root_status})
+        stats = await run_fs(index.refresh)
+        return web.json_response(stats)
+    except Exception as e:
+        print(f"[Wakawave API] Error in rescan_loras: {e}")
+        traceback.print_exc()
+        return web.json_response({"error": str(e)}, status=500)
+
+# Largest number of names accepted by one batched request
+WAKAWAVE_MAX_BATCH = 2000
+
+async def get_lora_metadata(request):
+    """Batched safetensors header info: POST {"names": [...], "metadata": true} -> {name: info}.
+
+    Only the header is read (never tensor data) and results are cached in the
+    LoRA index, so the picker can show rank/dtype for hundreds of files in one round trip.
+    """
+    try:
+        body = await request.json()
+        if not isinstance(body, dict):
+            return web.json_response({"error": "expected a JSON object"}, status=400)
+        names = body.get("names", [])
+        if not isinstance(names, list):
+            return web.json_response({"error": "'names' must be a list"}, status=400)
+        if len(names) > WAKAWAVE_MAX_BATCH:
+            return web.json_response({"error": f"at most {WAKAWAVE_MAX_BATCH} names per request"}, status=413)
+        names = [n for n in dict.fromkeys(n for n in names if isinstance(n, str)) if n]
+        include_metadata = bool(body.get("metadata", True))
+        index = get_lora_index()
+
+        def header_for(name):
+            entry = index.lookup(name)
+            if entry is None:
+                return {"missing": True}
+            info = get_header_info(index, entry)
+            if not include_metadata:
+                info = {k: v for k, v in info.items() if k != "metadata"}
+            return {"missing": False, "size": entry.size, "mtime": entry.mtime, **info}
+
+        results = await asyncio.gather(*(run_fs(header_for, name) for name in names))
+        return web.json_response(dict(zip(names, results)))
+    except json.JSONDecodeError:
+        return web.json_response({"error": "invalid JSON body"}, status=400)
+    except Exception as e:
+        print(f"[Wakawave API] Error in get_lora_metadata: {e}")
+        traceback.print_exc()
+        return web.json_response({"error": str(e)}, status=500)
+
+async def get_civitai_info(request):
+    """Model info for one LoRA from local sidecars only: POST {"lora_filename": name}.
+
+    Serves the route the LoRA widget already calls. Returns 404 when the LoRA
+    itself cannot be found.
+    """
+    try:
+        body = await request.json()
+        lora_name = body.get("lora_filename") if isinstance(body, dict) else None
+        if not isinstance(lora_name, str) or not lora_name or lora_name == "None":
+            return web.json_response({"error": "'lora_filename' is required"}, status=400)
+        index = get_lora_index()
+        entry = await run_fs(index.lookup, lora_name)
+        if entry is None:
+            return web.json_response({"error": f"LoRA not found: {lora_name}"}, status=404)
+        info = await run_fs(get_local_model_info, index, get_hasher(), entry)
+        return web.json_response(info)
+    except json.JSONDecodeError:
+        return web.json_response({"error": "invalid JSON body"}, status=400)
+    except Exception as e:
+        print(f"[Wakawave API] Error in get_civitai_info: {e}")
+        traceback.print_exc()
+        return web.json_response({"error": str(e)}, status=500)
+
+async def queue_lora_hashes(request):
+    """Queue background hashing: POST {"names": [...]} or {"all": true}."""
+    try:
+        body = await request.json()
+        if not isinstance(body, dict):
+            return web.json_response({"error": "expected a JSON object"}, status=400)
+        index = get_lora_index()
+        hasher = get_hasher()
+        if body.get("all"):
+            entries = index.entries()
+        else:
+            names = body.get("names", [])
+            if not isinstance(names, list):
+                return web.json_response({"error": "'names' must be a list"}, status=400)
+            entries = await run_fs(lambda: [index.lookup(n) for n in names[:WAKAWAVE_MAX_BATCH] if isinstance(n, str)])
+        queued = hasher.submit_all(e for e in entries if e is not None)
+        return web.json_response({"queued": queued, "pending": hasher.pending,
+                                  "hashed": hasher.hashed_count, "hashed_bytes": hasher.hashed_bytes})
+    except json.JSONDecodeError:
+        return web.json_response({"error": "invalid JSON body"}, status=400)
+    except Exception as e:
+        print(f"[Wakawave API] Error in queue_lora_hashes: {e}")
+        traceback.print_exc()
+        return web.json_response({"error": str(e)}, status=500)
+
+async def get_lora_duplicates(request):
+    """Groups of identical LoRA files stored under different names (same-size files are hashed in the background)."""
+    try:
+        queue_missing = request.rel_url.query.get('hash', '1').lower() not in ('0', 'false', 'no')
+        return web.json_response(get_hasher().find_duplicates(queue_missing=queue_missing))
+    except Exception as e:
+        print(f"[Wakawave API] Error in get_lora_duplicates: {e}")
+        traceback.print_exc()
+        return web.json_response({"error": str(e)}, status=500)
+
+async def get_file_cache_stats(request):
+    """Hit/miss counters and disk usage of the derived-file caches (merged stacks, ...)."""
+    try:
+        return web.json_response(await run_fs(all_cache_stats))
+    except Exception as e:
+        print(f"[Wakawave API] Error in get_file_cache_stats: {e}")
+        traceback.print_exc()
+        return web.json_response({"error": str(e)}, status=500)
+
+async def get_prompt_cache_stats(request):
+    """Hit/miss counters of the Prompt Builder's parsed-bundle cache."""
+    try:
+        if bundle_cache_stats is None:
+            return web.json_response({"error": "prompt builder not loaded"}, status=503)
+        return web.json_response(bundle_cache_stats())
+    except Exception as e:
+        print(f"[Wakawave API] Error in get_prompt_cache_stats: {e}")
+        traceback.print_exc()
+        return web.json_response({"error": str(e)}, status=500)
+
+async def get_embedding_cache_stats(request):
+    """Memory and disk hit/miss counters of the Text Encode node's embedding cache."""
+    try:
+        if get_embedding_cache is None:
+            return web.json_response({"error": "text encode node not loaded"}, status=503)
+        stats = get_embedding_cache().stats()
+        stats["disk"] = await run_fs(get_file_cache("embeds").stats)
+        return web.json_response(stats)
+    except Exception as e:
+        print(f"[Wakawave API] Error in get_embedding_cache_stats: {e}")
+        traceback.print_exc()
+        return web.json_response({"error": str(e)}, status=500)
+
+async def prefetch_loras(request):
+    """Start page-cache readahead: POST {"names": [...], "budget_gb": optional cap for this request}."""
+    try:
+        body = await request.json()
+        if not isinstance(body, dict):
+            return web.json_response({"error": "expected a JSON object"}, status=400)
+        names = body.get("names", [])
+        if not isinstance(names, list):
+            return web.json_response({"error": "'names' must be a list"}, status=400)
+        budget_gb = body.get("budget_gb")
+        budget = int(float(budget_gb) * 1024 ** 3) if budget_gb is not None else None
+
+        index = get_lora_index()
+        names = [n for n in names[:WAKAWAVE_MAX_BATCH] if isinstance(n, str)]
+        entries = await run_fs(lambda: [(n, index.lookup(n)) for n in names])
+        missing = [n for n, entry in entries if entry is None]
+        result = await run_fs(get_prefetcher().prefetch, [e.path for _, e in entries if e is not None], budget)
+        result["missing"] = missing
+        return web.json_response(result)
+    except (json.JSONDecodeError, ValueError, TypeError):
+        return web.json_response({"error": "invalid JSON body"}, status=400)
+    except Exception as e:
+        print(f"[Wakawave API] Error in prefetch_loras: {e}")
+        traceback.print_exc()
+        return web.json_response({"error": str(e)}, status=500)
+
+async def get_prefetch_status(request):
+    """Prefetch progress, recent jobs and the estimated seconds of cold reads saved."""
+    return web.json_response(get_prefetcher().status())
+
+async def cancel_prefetch(request):
+    """Cancel queued and in-progress readahead."""
+    return web.json_response({"cancelled": get_prefetcher().cancel()})
+
+# Default and max items per /wanvideo/lora/catalog page
+WAKAWAVE_CATALOG_PAGE = 1000
+WAKAWAVE_CATALOG_MAX_PAGE = 5000
+
+# Header fields included with ?metadata=1 (metadata=full adds modules and the __metadata__ block)
+_CATALOG_HEADER_FIELDS = ("format", "tensor_count", "dtypes", "tensor_bytes", "rank", "error")
+
+# Index entries sorted by name, rebuilt only when the index fingerprint changes
+_catalog_sorted = {"fingerprint": None, "entries": [], "names": []}
+
+def _sorted_catalog(index):
+    # Fingerprint first: if the index changes in between, clients get newer data under
+    # the older ETag and simply re-download next time - never stale data under a new one
+    fingerprint = index.fingerprint()
+    if _catalog_sorted["fingerprint"] != fingerprint:
+        entries = sorted(index.entries(), key=lambda e: e.name)
+        _catalog_sorted.update(fingerprint=fingerprint, entries=entries, names=[e.name for e in entries])
+    return fingerprint, _catalog_sorted["entries"], _catalog_sorted["names"]
+
+def _catalog_filter(extensions, folder):
+    folder = folder.replace("\\", "/").strip("/")
+    prefix = folder + "/" if folder else ""
+    def matches(entry):
+        if extensions and os.path.splitext(entry.name)[1].lower() not in extensions:
+            return False
+        return entry.name.startswith(prefix)
+    return matches
+
+def _catalog_page(index, cursor, limit, extensions, folder, metadata):
+    """One page of the catalog: entries sorted by name, starting after cursor."""
+    fingerprint, entries, names = _sorted_catalog(index)
+    matches = _catalog_filter(extensions, folder)
+    start = bisect.bisect_right(names, cursor) if cursor else 0
+    items = []
+    next_cursor = None
+    for entry in entries[start:]:
+        if not matches(entry):
+            continue
+        if len(items) == limit:
+            next_cursor = items[-1]["name"]
+            break
+        item = {"name": entry.name, "size": entry.size, "mtime": entry.mtime}
+        if metadata:
+            header = get_header_info(index, entry)
+            item["header"] = header if metadata == "full" else {k: header[k] for k in _CATALOG_HEADER_FIELDS if k in header}
+        items.append(item)
+    return {
+        "items": items,
+        "next_cursor": next_cursor,
+        "total": sum(1 for entry in entries if matches(entry)),
+        "fingerprint": fingerprint,
+    }
+
+def _parse_extensions(value):
+    return {("." + ext.strip().lstrip(".")).lower() for ext in value.split(",") if ext.strip()}
+
+def _wants_gzip(request):
+    return "gzip" in request.headers.get("Accept-Encoding", "").lower()
+
+def _catalog_etag(request, fingerprint, gzip):
+    """Strong ETag for this query against this index state (gzip is a separate representation)."""
+    query = json.dumps(sorted(request.rel_url.query.items()))
+    tag = hashlib.sha256(f"{fingerprint}|{request.path}|{query}".encode("utf-8")).hexdigest()[:32]
+    return f'"{tag}{"-gzip" if gzip else ""}"'
+
+def _etag_matches(request, etag):
+    header = request.headers.get("If-None-Match", "")
+    if not header:
+        return False
+    candidates = [tag.strip() for tag in header.split(",")]
+    return "*" in candidates or etag in [tag[2:] if tag.startswith("W/") else tag for tag in candidates]
+
+def _cached_json_response(request, payload, etag, gzip):
+    response = web.json_response(payload, headers={
+        "ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"})
+    if gzip:
+        response.enable_compression(web.ContentCoding.gzip)
+    return response
+
+async def get_lora_catalog(request):
+    """
+    Paginated LoRA catalog from the index, with ETag revalidation.
+
+    Query: cursor (last name of the previous page), limit, ext (e.g. ".safetensors,.pt"),
+    folder (subfolder, recursive), metadata (1 for a header summary, "full" for everything).
+    """
+    try:
+        query = request.rel_url.query
+        try:
+            limit = max(1, min(WAKAWAVE_CATALOG_MAX_PAGE, int(query.get("limit", WAKAWAVE_CATALOG_PAGE))))
+        except ValueError:
+            return web.json_response({"error": "'limit' must be an integer"}, status=400)
+        metadata = query.get("metadata", "0").lower()
+        metadata = "full" if metadata == "full" else ("summary" if metadata in ("1", "true", "yes") else None)
+
+        index = get_lora_index()
+        gzip = _wants_gzip(request)
+        etag = _catalog_etag(request, await run_fs(index.fingerprint), gzip)
+        if _etag_matches(request, etag):
+            return web.Response(status=304, headers={"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"})
+
+        page = await run_fs(_catalog_page, index, query.get("cursor", ""), limit,
+                            _parse_extensions(query.get("ext", "")), query.get("folder", ""), metadata)
+        return _cached_json_response(request, page, etag, gzip)
+    except Exception as e:
+        print(f"[Wakawave API] Error in get_lora_catalog: {e}")
+        traceback.print_exc()
+        return web.json_response({"error": str(e)}, status=500)
+
+def _folder_files(folder_name, extensions):
+    """File list for a non-LoRA model folder, straight from ComfyUI."""
+    files = []
+    for name in folder_paths.get_filename_list(folder_name):
+        if extensions and os.path.splitext(name)[1].lower() not in extensions:
+            continue
+        full_path = folder_paths.get_full_path(folder_name, name)
+        try:
+            st = os.stat(full_path)
+        except (OSError, TypeError):
+            continue
+        files.append((name.replace("\\", "/"), st.st_size, st.st_mtime))
+    return files
+
+async def get_model_files(request):
+    """File list for the file picker: GET ?folder_name=loras&extensions=.safetensors,.pt"""
+    try:
+        folder_name = request.rel_url.query.get("folder_name", "loras")
+        extensions = _parse_extensions(request.rel_url.query.get("extensions", ""))
+        gzip = _wants_gzip(request)
+        etag = None
+        if folder_name == "loras":
+            index = get_lora_index()
+            etag = _catalog_etag(request, await run_fs(index.fingerprint), gzip)
+            if _etag_matches(request, etag):
+                return web.Response(status=304, headers={"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"})
+            matches = _catalog_filter(extensions, "")
+            _, entries, _ = await run_fs(_sorted_catalog, index)
+            files = [(e.name, e.size, e.mtime) for e in entries if matches(e)]
+        elif folder_name in folder_paths.folder_names_and_paths:
+            files = await run_fs(_folder_files, folder_name, extensions)
+        else:
+            return web.json_response({"error": f"unknown folder '{folder_name}'"}, status=404)
+
+        payload = {"files": [{
+            "name": os.path.basename(name),
+            "path": name,
+            "relative_path": name,
+            "extension": os.path.splitext(name)[1].lower(),
+            "size": size,
+            "modified": mtime,
+        } for name, size, mtime in files], "total": len(files)}
+        if etag is None:
+            return web.json_response(payload)
+        return _cached_json_response(request, payload, etag, gzip)
+    except Exception as e:
+        print(f"[Wakawave API] Error in get_model_files: {e}")
+        traceback.print_exc()
+        return web.json_response({"error": str(e)}, status=500)
+
+async def search_loras(request):
+    """Ranked LoRA name search: GET ?q=...&limit=20 (max 2000)."""
+    try:
+        query = request.rel_url.query.get("q", "")
+        try:
+            limit = max(1, min(2000, int(request.rel_url.query.get("limit", "20"))))
+        except ValueError:
+            return web.json_response({"error": "'limit' must be an integer"}, status=400)
+        index = get_lora_index()
+        started = time.perf_counter()
+        hits = await run_fs(get_search_index().search, query, limit)
+        for hit in hits:
+            entry = index.get(hit["name"])
+            hit["size"] = entry.size if entry is not None else None
+        return web.json_response({
+            "query": query,
+            "results": hits,
+            "ms": round((time.perf_counter() - started) * 1000, 2),
+        })
+    except Exception as e:
+        print(f"[Wakawave API] Error in search_loras: {e}")
+        traceback.print_exc()
+        return web.json_response({"error": str(e)}, status=500)
+
+# Records read per thread hop while streaming a preset export
+_PRESET_EXPORT_BATCH = 200
+
+def _preset_store(request):
+    """Store for the {kind} path segment, or None for an unknown kind."""
+    kind = request.match_info.get("kind", "lora")
+    return get_preset_store(kind) if kind in PRESET_KINDS else None
+
+async def list_presets(request):
+    """Preset summaries (no bodies): GET /wanvideo/presets/{kind}."""
+    store = _preset_store(request)
+    if store is None:
+        return web.json_response({"error": "unknown preset kind"}, status=404)
+    try:
+        presets = await run_fs(store.list)
+        return web.json_response({"presets": presets, "total": len(presets)})
+    except Exception as e:
+        print(f"[Wakawave API] Error in list_presets: {e}")
+        traceback.print_exc()
+        return web.json_response({"error": str(e)}, status=500)
+
+async def get_preset(request):
+    """One full preset: GET /wanvideo/presets/{kind}/preset?name=..."""
+    store = _preset_store(request)
+    if store is None:
+        return web.json_response({"error": "unknown preset kind"}, status=404)
+    try:
+        record = await run_fs(store.get, request.rel_url.query.get("name", ""))
+        if record is None:
+            return web.json_response({"error": "preset not found"}, status=404)
+        return web.json_response(record)
+    except Exception as e:
+        print(f"[Wakawave API] Error in get_preset: {e}")
+        traceback.print_exc()
+        return web.json_response({"error": str(e)}, status=500)
+
+async def put_preset(request):
+    """Create or replace one preset: PUT /wanvideo/presets/{kind}/preset?name=... with the preset as the body."""
+    store = _preset_store(request)
+    if store is None:
+        return web.json_response({"error": "unknown preset kind"}, status=404)
+    try:
+        preset = await request.json()
+        summary = await run_fs(store.put, request.rel_url.query.get("name", ""), preset)
+        return web.json_response(summary)
+    except json.JSONDecodeError:
+        return web.json_response({"error": "invalid JSON body"}, status=400)
+    except PresetError as e:
+        return web.json_response({"error": str(e)}, status=400)
+    except Exception as e:
+        print(f"[Wakawave API] Error in put_preset: {e}")
+        traceback.print_exc()
+        return web.json_response({"error": str(e)}, status=500)
+
+async def delete_preset(request):
+    """Delete one preset: DELETE /wanvideo/presets/{kind}/preset?name=..."""
+    store = _preset_store(request)
+    if store is None:
+        return web.json_response({"error": "unknown preset kind"}, status=404)
+    try:
+        deleted = await run_fs(store.delete, request.rel_url.query.get("name", ""))
+        return web.json_response({"deleted": deleted}, status=200 if deleted else 404)
+    except Exception as e:
+        print(f"[Wakawave API] Error in delete_preset: {e}")
+        traceback.print_exc()
+        return web.json_response({"error": str(e)}, status=500)
+
+async def export_presets(request):
+    """Stream every preset as NDJSON, one {"name", "created", "modified", "preset"} record per line."""
+    store = _preset_store(request)
+    if store is None:
+        return web.json_response({"error": "unknown preset kind"}, status=404)
+    response = web.StreamResponse(headers={
+        "Content-Type": "application/x-ndjson",
+        "Content-Disposition": f'attachment; filename="wakawave_{store.kind}_presets.ndjson"',
+        "Cache-Control": "no-store",
+    })
+    await response.prepare(request)
+    names = await run_fs(store.names)
+    for start in range(0, len(names), _PRESET_EXPORT_BATCH):
+        batch = names[start:start + _PRESET_EXPORT_BATCH]
+        records = await run_fs(lambda: list(store.export_records(batch)))
+        lines = "".join(json.dumps(r, ensure_ascii=False, separators=(",", ":")) + "\n" for r in records)
+        await response.write(lines.encode("utf-8"))
+    await response.write_eof()
+    return response
+
+async def import_presets(request):
+    """
+    Import an NDJSON export line by line without buffering the whole upload:
+    POST /wanvideo/presets/{kind}/import?overwrite=1 (0 keeps existing presets).
+    """
+    store = _preset_store(request)
+    if store is None:
+        return web.json_response({"error": "unknown preset kind"}, status=404)
+    overwrite = request.rel_url.query.get("overwrite", "1").lower() not in ("0", "false", "no")
+    result = {"imported": 0, "skipped": 0, "errors": []}
+    try:
+        line_number = 0
+        async for raw in request.content:
+            line_number += 1
+            line = raw.strip()
+            if not line:
+                continue
+            try:
+                outcome = await run_fs(store.import_record, json.loads(line), overwrite)
+                result[outcome] += 1
+            except (ValueError, PresetError) as e:
+                if len(result["errors"]) < 100:
+                    result["errors"].append({"line": line_number, "error": str(e)})
+        result["total"] = len(store)
+        return web.json_response(result)
+    except Exception as e:
+        print(f"[Wakawave API] Error in import_presets: {e}")
+        traceback.print_exc()
+        return web.json_response({"error": str(e)}, status=500)
+
+async def get_lora_templates(request):
+    """LoRA template summaries, or one full template with ?name=... (as {"name", "loras", ...})."""
+    name = request.rel_url.query.get("name") or request.match_info.get("name")
+    store = get_preset_store("lora")
+    try:
+        if not name:
+            templates = await run_fs(store.list)
+            return web.json_response({"templates": templates, "total": len(templates)})
+        record = await run_fs(store.get, name)
+        if record is None:
+            return web.json_response({"error": f"template '{name}' not found"}, status=404)
+        template = dict(record["preset"]) if isinstance(record.get("preset"), dict) else {}
+        template.update(name=record["name"], created=record.get("created"), modified=record.get("modified"))
+        return web.json_response(template)
+    except Exception as e:
+        print(f"[Wakawave API] Error in get_lora_templates: {e}")
+        traceback.print_exc()
+        return web.json_response({"error": str(e)}, status=500)
+
+async def _delete_lora_template(name):
+    if not isinstance(name, str) or not name:
+        return web.json_response({"error": "template name is required"}, status=400)
+    deleted = await run_fs(get_preset_store("lora").delete, name)
+    if not deleted:
+        return web.json_response({"success": False, "error": f"template '{name}' not found"}, status=404)
+    return web.json_response({"success": True})
+
+async def save_lora_template(request):
+    """Save a template: POST {"name", "lora_configs" | "loras", ...}; {"action": "delete"} deletes instead."""
+    try:
+        body = await request.json()
+        if not isinstance(body, dict):
+            return web.json_response({"error": "expected a JSON object"}, status=400)
+        if body.get("action") == "delete":
+            return await _delete_lora_template(body.get("name"))
+        name, preset = normalize_lora_template(body)
+        summary = await run_fs(get_preset_store("lora").put, name, preset)
+        return web.json_response({"success": True, "template": summary})
+    except json.JSONDecodeError:
+        return web.json_response({"error": "invalid JSON body"}, status=400)
+    except PresetError as e:
+        return web.json_response({"error": str(e)}, status=400)
+    except Exception as e:
+        print(f"[Wakawave API] Error in save_lora_template: {e}")
+        traceback.print_exc()
+        return web.json_response({"error": str(e)}, status=500)
+
+async def delete_lora_template(request):
+    """Delete a template by path (/super_lora/templates/{name}) or by JSON body {"name": ...}."""
+    try:
+        name = request.match_info.get("name")
+        if not name and request.can_read_body:
+            body = await request.json()
+            name = body.get("name") if isinstance(body, dict) else None
+        return await _delete_lora_template(name)
+    except json.JSONDecodeError:
+        return web.json_response({"error": "invalid JSON body"}, status=400)
+    except Exception as e:
+        print(f"[Wakawave API] Error in delete_lora_template: {e}")
+        traceback.print_exc()
+        return web.json_response({"error": str(e)}, status=500)
+
+# (method, path, handler) for every API route this package serves
+_WAKAWAVE_ROUTES = [
+    ("GET", "/wanvideo/lora/sizes", get_lora_file_sizes),
+    ("GET", "/api/wanvideo/lora/sizes", get_lora_file_sizes),
+    ("POST", "/wanvideo/lora/sizes", post_lora_file_sizes),
+    ("POST", "/api/wanvideo/lora/sizes", post_lora_file_sizes),
+    ("GET", "/wanvideo/lora/cache/debug", get_lora_cache_debug),
+    ("POST", "/wanvideo/lora/rescan", rescan_loras),
+    ("POST", "/wanvideo/lora/metadata", get_lora_metadata),
+    ("POST", "/super_lora/civitai_info", get_civitai_info),
+    ("POST", "/wanvideo/lora/hash", queue_lora_hashes),
+    ("GET", "/wanvideo/lora/duplicates", get_lora_duplicates),
+    ("GET", "/wanvideo/lora/cache/stats", get_file_cache_stats),
+    ("GET", "/wanvideo/prompt/cache/stats", get_prompt_cache_stats),
+    ("GET", "/wanvideo/prompt/embeds/stats", get_embedding_cache_stats),
+    ("POST", "/wanvideo/lora/prefetch", prefetch_loras),
+    ("GET", "/wanvideo/lora/prefetch", get_prefetch_status),
+    ("DELETE", "/wanvideo/lora/prefetch", cancel_prefetch),
+    ("GET", "/wanvideo/lora/catalog", get_lora_catalog),
+    ("GET", "/super_lora/files", get_model_files),
+    ("GET", "/wanvideo/lora/search", search_loras),
+    ("GET", "/super_lora/templates", get_lora_templates),
+    ("POST", "/super_lora/templates", save_lora_template),
+    ("DELETE", "/super_lora/templates", delete_lora_template),
+    ("POST", "/super_lora/templates/delete", delete_lora_template),
+    ("GET", "/super_lora/templates/{name}", get_lora_templates),
+    ("DELETE", "/super_lora/templates/{name}", delete_lora_template),
+    ("GET", "/wanvideo/presets/{kind}", list_presets),
+    ("GET", "/wanvideo/presets/{kind}/preset", get_preset),
+    ("PUT", "/wanvideo/presets/{kind}/preset", put_preset),
+    ("DELETE", "/wanvideo/presets/{kind}/preset", delete_preset),
+    ("GET", "/wanvideo/presets/{kind}/export", export_presets),
+    ("POST", "/wanvideo/presets/{kind}/import", import_presets),
+]
+
+_registered_routes = set()
+
+def _register_routes(app):
+    """Register every route in _WAKAWAVE_ROUTES on app, skipping ones already added."""
+    for method, path, handler in _WAKAWAVE_ROUTES:
+        key = (id(app), method, path)
+        if key in _registered_routes:
+            continue
+        try:
+            app.router.add_route(method, path, handler)
+            _registered_routes.add(key)
+            print(f"✅ [Wakawave] Route registered: {method} {path}")
+        except Exception as e:
+            print(f"⚠️  [Wakawave] Could not register {method} {path}: {e}")
+
 # Direct route registration using module-level approach
 # Try to get server instance and register route
 try:
     print("[Wakawave] Attempting direct server route registration...")
     import server as server_module
     
-    # First scan and cache LoRA sizes
-    _scan_and_cache_lora_sizes()
+    # First load (or scan) the LoRA index
+    _init_lora_index()
     
     # Check if server is initialized
     if hasattr(server_module, 'PromptServer') and server_module.PromptServer.instance:
         print("[Wakawave] PromptServer instance found, registering route...")
         
         # Register using the app's router directly
-        app = server_module.PromptServer.instance.app
-        app.router.add_get('/wanvideo/lora/sizes', get_lora_file_sizes)
-        print("✅ [Wakawave] Route registered: /wanvideo/lora/sizes")
+        _register_routes(server_module.PromptServer.instance.app)
     else:
         print("[Wakawave] Server not yet initialized, will register via add_routes")
 except ImportError:
@@ -233,31 +935,10 @@ def add_routes(app, routes=None):
     """Add routes - called by ComfyUI during initialization."""
     print("[Wakawave] ✅ add_routes function called by ComfyUI!")
     
-    # Scan and cache LoRA sizes if not already done
-    if not _lora_sizes_cache:
-        _scan_and_cache_lora_sizes()
-    
-    try:
-        # Register LoRA sizes API endpoint
-        app.router.add_get('/wanvideo/lora/sizes', get_lora_file_sizes)
-        print("✅ [Wakawave] Successfully registered: /wanvideo/lora/sizes")
-    except Exception as e:
-        print(f"⚠️  [Wakawave] Failed to register /wanvideo/lora/sizes: {e}")
-        traceback.print_exc()
+    # Load the LoRA index if the direct registration above did not
+    _init_lora_index()
     
-    try:
-        # Also try with /api prefix as fallback
-        app.router.add_get('/api/wanvideo/lora/sizes', get_lora_file_sizes)
-        print("✅ [Wakawave] Also registered: /api/wanvideo/lora/sizes")
-    except Exception as e:
-        print(f"⚠️  [Wakawave] Could not register /api/wanvideo/lora/sizes: {e}")
-    
-    try:
-        # Register debug endpoint
-        app.router.add_get('/wanvideo/lora/cache/debug', get_lora_cache_debug)
-        print("✅ [Wakawave] Also registered debug endpoint: /wanvideo/lora/cache/debug")
-    except Exception as e:
-        print(f"⚠️  [Wakawave] Could not register debug endpoint: {e}")
+    _register_routes(app)
 
 print(f"\n✅ Total nodes loaded: {len(NODE_CLASS_MAPPINGS)}")
 for name in NODE_DISPLAY_NAME_MAPPINGS.values():
@@ -1,4 +1,5 @@
 import { app as app$1 } from "/scripts/app.js";
+import { api } from "/scripts/api.js";
 class LoraService {
   constructor() {
     this.availableLoras = [];
@@ -34,7 +35,13 @@ class LoraService {
    */
   async refreshLoraList() {
     try {
-      const response = await fetch("/object_info");
+      const names = await this.fetchLoraCatalog();
+      if (names) {
+        this.availableLoras = names;
+        console.log(`Super LoRA Loader: Found ${this.availableLoras.length} LoRAs`);
+        return;
+      }
+      const response = await fetch("/object_info/LoraLoader");
       const data = await response.json();
       const loraLoader = data.LoraLoader;
       if (loraLoader && loraLoader.input && loraLoader.input.required && loraLoader.input.required.lora_name) {
@@ -52,6 +59,65 @@ class LoraService {
       this.availableLoras = [];
     }
   }
+  /**
+   * Patch the cached LoRA list and per-file metadata from a server-pushed index diff.
+   */
+  applyIndexChanges(diff) {
+    const removed = new Set(diff.removed || []);
+    const known = new Set(this.availableLoras);
+    let added = false;
+    for (const item of diff.changed || []) {
+      this.loraCache.set(item.name, { ...this.loraCache.get(item.name) || {}, size: item.size, mtime: item.mtime });
+      if (!known.has(item.name)) {
+        known.add(item.name);
+        added = true;
+      }
+    }
+    for (const item of diff.hashed || []) {
+      this.loraCache.set(item.name, { ...this.loraCache.get(item.name) || {}, sha256: item.sha256 });
+    }
+    removed.forEach((name) => this.loraCache.delete(name));
+    if (added || removed.size) {
+      this.availableLoras = Array.from(known).filter((name) => !removed.has(name)).sort();
+    }
+  }
+  /**
+   * Ranked server-side name search; returns null if the endpoint is unavailable.
+   */
+  async searchLoras(query, limit = 2e3) {
+    try {
+      const params = new URLSearchParams({ q: query, limit: String(limit) });
+      const response = await fetch(`/wanvideo/lora/search?${params.toString()}`);
+      if (!response.ok) return null;
+      const data = await response.json();
+      return (data.results || []).map((hit) => hit.name);
+    } catch {
+      return null;
+    }
+  }
+  /**
+   * Page through the server's LoRA catalog (names only); returns null if the endpoint is unavailable.
+   * Pages carry ETags, so unchanged pages revalidate with a 304 instead of re-downloading.
+   */
+  async fetchLoraCatalog() {
+    const names = [];
+    let cursor = "";
+    try {
+      do {
+        const params = new URLSearchParams({ limit: "5000" });
+        if (cursor) params.set("cursor", cursor);
+        const response = await fetch(`/wanvideo/lora/catalog?${params.toString()}`, { cache: "no-cache" });
+        if (!response.ok) return null;
+        const page = await response.json();
+        for (const item of page.items || []) names.push(item.name);
+        cursor = page.next_cursor || "";
+      } while (cursor);
+    } catch (error) {
+      console.warn("Super LoRA Loader: LoRA catalog unavailable, falling back to object_info", error);
+      return null;
+    }
+    return names;
+  }
   /**
    * Create a new LoRA configuration with defaults
    */
@@ -444,11 +510,11 @@ class TemplateService {
    */
   async exportTemplate(name) {
     try {
-      const templates = await this.getTemplates();
-      const template = templates.find((t) => t.name === name);
-      if (!template) {
+      const response = await fetch(`/super_lora/templates?name=${encodeURIComponent(name)}`);
+      if (!response.ok) {
         return null;
       }
+      const template = await response.json();
       return JSON.stringify(template, null, 2);
     } catch (error) {
       console.error(`Super LoRA Loader: Failed to export template "${name}":`, error);
@@ -878,9 +944,33 @@ class OverlayService {
     overlay.addEventListener("click", (event) => {
       if (event.target === overlay) closeOverlay();
     });
+    // Large lists are searched server-side (options.remoteSearch) instead of filtered on every keypress
+    const useRemoteSearch = typeof options.remoteSearch === "function" && items.length > OverlayService.REMOTE_SEARCH_MIN_ITEMS;
+    const itemsById = useRemoteSearch ? new Map(items.map((item) => [item.id, item])) : null;
+    let remoteResult = null;
+    let remoteTimer = null;
+    const matchTerm = (query) => {
+      if (!query) return items;
+      if (remoteResult && remoteResult.query === query) return remoteResult.items;
+      return items.filter((item) => item.label.toLowerCase().includes(query));
+    };
+    const runRemoteSearch = (term) => {
+      clearTimeout(remoteTimer);
+      const query = (term || "").trim().toLowerCase();
+      if (!query) {
+        render(term);
+        return;
+      }
+      remoteTimer = setTimeout(async () => {
+        const ids = await options.remoteSearch(query);
+        if ((search.value || "").trim().toLowerCase() !== query) return;
+        remoteResult = ids ? { query, items: ids.map((id) => itemsById.get(id)).filter(Boolean) } : null;
+        render(search.value);
+      }, OverlayService.REMOTE_SEARCH_DEBOUNCE_MS);
+    };
     const getFilteredItems = () => {
       const query = (search.value || "").trim().toLowerCase();
-      const termFiltered = query ? items.filter((item) => item.label.toLowerCase().includes(query)) : items;
+      const termFiltered = matchTerm(query);
       let filtered = termFiltered;
       if (folderFeatureEnabled && activeFolders.size > 0) {
         filtered = termFiltered.filter((item) => {
@@ -1026,7 +1116,7 @@ class OverlayService {
     const render = (term) => {
       list.innerHTML = "";
       const query = (term || "").trim().toLowerCase();
-      const termFiltered = query ? items.filter((item) => item.label.toLowerCase().includes(query)) : items;
+      const termFiltered = matchTerm(query);
       if (folderFeatureEnabled) {
         const folderCounts = {};
         termFiltered.forEach((item) => {
@@ -1246,7 +1336,7 @@ class OverlayService {
     panel.appendChild(footer);
     overlay.appendChild(panel);
     document.body.appendChild(overlay);
-    search.addEventListener("input", () => render(search.value));
+    search.addEventListener("input", () => useRemoteSearch ? runRemoteSearch(search.value) : render(search.value));
     setTimeout(() => {
       try {
         search.focus();
@@ -1573,6 +1663,8 @@ class OverlayService {
     return `superlora_subfolder_filters${suffix}`;
   }
 }
+OverlayService.REMOTE_SEARCH_MIN_ITEMS = 2e3;
+OverlayService.REMOTE_SEARCH_DEBOUNCE_MS = 120;
 class UpdateService {
   constructor() {
     this.status = null;
@@ -2699,7 +2791,8 @@ class SuperLoraWidget extends SuperLoraBaseWidget {
       const fileSizeLeft = loraLeft + nameWidth + 4;
       ctx.font = "11px 'Segoe UI', Arial, sans-serif";
       ctx.fillStyle = this.value.enabled ? "#aaa" : "#666";
-      const fileSizeDisplayText = this.value.file_size ? this.formatFileSize(this.value.file_size) : "—";
+      const fileSizeDisplayText = this.value.missing ? "missing" : this.value.file_size ? this.formatFileSize(this.value.file_size) : "—";
+      if (this.value.missing) ctx.fillStyle = "#d66";
       ctx.textAlign = "left";
       ctx.fillText(fileSizeDisplayText, fileSizeLeft, posY + midY);
     }
@@ -2990,63 +3083,18 @@ class SuperLoraWidget extends SuperLoraBaseWidget {
   }
   async fetchLoraFileSize(loraName) {
     if (loraName === "None" || !loraName) return;
-    
     try {
-      console.log(`[Wakawave] Fetching file size for LoRA: ${loraName}`);
-      
-      const endpoints = [
-        `/wanvideo/lora/sizes?names=${encodeURIComponent(loraName)}`,
-        `/api/wanvideo/lora/sizes?names=${encodeURIComponent(loraName)}`
-      ];
-      
-      for (const endpoint of endpoints) {
-        try {
-          console.log(`[Wakawave] Attempting endpoint: ${endpoint}`);
-          const response = await fetch(endpoint, { timeout: 5000 });
-          
-          console.log(`[Wakawave] Response status: ${response.status} for ${endpoint}`);
-          
-          if (!response.ok) {
-            console.warn(`[Wakawave] ${endpoint} returned ${response.status}`);
-            continue;
-          }
-          
-          const data = await response.json();
-          console.log(`[Wakawave] API response data:`, data);
-          
-          if (data && typeof data === 'object') {
-            // Check for exact match or any key that matches
-            let fileSize = data[loraName];
-            
-            if (!fileSize) {
-              // Try to find a key that contains or matches the lora name
-              for (const key in data) {
-                if (key.toLowerCase().includes(loraName.toLowerCase()) || 
-                    loraName.toLowerCase().includes(key.toLowerCase())) {
-                  fileSize = data[key];
-                  console.log(`[Wakawave] Found fuzzy match: "${key}" for "${loraName}"`);
-                  break;
-                }
-              }
-            }
-            
-            if (typeof fileSize === 'number' && fileSize > 0) {
-              this.value.file_size = fileSize;
-              const sizeStr = this.formatFileSize(fileSize);
-              console.log(`[Wakawave] ✅ File size for "${loraName}": ${fileSize} bytes (${sizeStr})`);
-              // Force canvas redraw to display the new file size
-              if (this.canvas) {
-                this.canvas.setDirty(true);
-              }
-              return;
-            }
-          }
-        } catch (err) {
-          console.warn(`[Wakawave] Failed to fetch from ${endpoint}: ${err.message}`);
+      const files = await _SuperLoraNode.requestLoraSizes([loraName]);
+      const info = files[loraName];
+      if (info && !info.missing && info.size > 0) {
+        this.value.file_size = info.size;
+        // Force canvas redraw to display the new file size
+        if (this.canvas) {
+          this.canvas.setDirty(true);
         }
+      } else {
+        console.log(`[Wakawave] Could not fetch file size for: ${loraName}`);
       }
-      
-      console.log(`[Wakawave] Could not fetch file size for: ${loraName}`);
     } catch (err) {
       console.error(`[Wakawave] Error in fetchLoraFileSize:`, err);
     }
@@ -3793,6 +3841,7 @@ const _SuperLoraNode = class _SuperLoraNode {
         title: "Add LoRA",
         placeholder: "Search LoRAs...",
         items,
+        remoteSearch: (query) => _SuperLoraNode.loraService.searchLoras(query),
         onChoose: (id) => {
           if (this.isDuplicateLora(node, id)) {
             this.showToast("⚠️ Already added to the list", "warning");
@@ -4231,45 +4280,83 @@ const _SuperLoraNode = class _SuperLoraNode {
       const loraNames = loraWidgets
         .map((w) => w.value?.lora)
         .filter((name) => name && name !== "None");
-      
-      console.log(`[Wakawave] Fetching sizes for ${loraNames.length} LoRAs:`, loraNames);
       if (loraNames.length === 0) return;
-      
-      // Try multiple endpoints
-      const endpoints = [
-        `/wanvideo/lora/sizes?names=${loraNames.map(encodeURIComponent).join(',')}`,
-        `/api/wanvideo/lora/sizes?names=${loraNames.map(encodeURIComponent).join(',')}`
-      ];
-      
-      for (const endpoint of endpoints) {
-        try {
-          console.log(`[Wakawave] Trying batch endpoint: ${endpoint}`);
-          const response = await fetch(endpoint);
-          if (response.ok) {
-            const sizes = await response.json();
-            console.log(`[Wakawave] Batch fetch result from ${endpoint}:`, sizes);
-            loraWidgets.forEach((widget) => {
-              if (widget.value?.lora && sizes[widget.value.lora]) {
-                widget.value.file_size = sizes[widget.value.lora];
-                console.log(`[Wakawave] Updated ${widget.value.lora}: ${sizes[widget.value.lora]} bytes`);
-              }
-            });
-            node.setDirtyCanvas(true, false);
-            return;
-          } else {
-            console.log(`[Wakawave] Batch endpoint ${endpoint} returned ${response.status}`);
-          }
-        } catch (err) {
-          console.log(`[Wakawave] Batch endpoint ${endpoint} failed:`, err.message);
-          continue;
+      const files = await this.requestLoraSizes(loraNames);
+      loraWidgets.forEach((widget) => {
+        const info = files[widget.value?.lora];
+        if (info) {
+          widget.value.missing = !!info.missing;
+          if (!info.missing) widget.value.file_size = info.size;
         }
-      }
-      
-      console.log(`[Wakawave] No batch file size endpoints available`);
+      });
+      node.setDirtyCanvas(true, false);
     } catch (err) {
       console.warn("[Wakawave] Failed to fetch LoRA file sizes:", err);
     }
   }
+  /**
+   * Apply a pushed LoRA index diff: patch sizes and availability of every loader node in place.
+   * A "reset" diff (too many changes to send) re-fetches the list and all sizes instead.
+   */
+  static applyIndexChanges(diff) {
+    if (!diff) return;
+    if (diff.reset) {
+      this.loraService.refreshLoraList();
+    } else {
+      this.loraService.applyIndexChanges(diff);
+    }
+    const changed = new Map((diff.changed || []).map((item) => [item.name, item]));
+    const removed = new Set(diff.removed || []);
+    const nodes = (app$1.graph?._nodes || []).filter((n) => n.type === NODE_TYPE || n.type === WANVIDEO_NODE_TYPE);
+    for (const node of nodes) {
+      if (diff.reset) {
+        this.fetchAllLoraFileSizes(node);
+        continue;
+      }
+      let dirty = false;
+      for (const widget of node.customWidgets?.filter((w) => w instanceof SuperLoraWidget) || []) {
+        const name = widget.value?.lora;
+        if (changed.has(name)) {
+          widget.value.file_size = changed.get(name).size;
+          widget.value.missing = false;
+          dirty = true;
+        } else if (removed.has(name)) {
+          widget.value.file_size = 0;
+          widget.value.missing = true;
+          dirty = true;
+        }
+      }
+      if (dirty) node.setDirtyCanvas(true, false);
+    }
+  }
+  /**
+   * Resolve LoRA file sizes with one POST per burst: every call made within SIZE_BATCH_DELAY_MS
+   * (e.g. all loader nodes restoring on workflow load) shares a single request.
+   * Resolves to { name: { size, mtime, missing } }.
+   */
+  static requestLoraSizes(names) {
+    const batch = this.pendingSizeBatch || (this.pendingSizeBatch = { names: /* @__PURE__ */ new Set(), promise: null });
+    names.forEach((name) => batch.names.add(name));
+    if (!batch.promise) {
+      batch.promise = new Promise((resolve) => {
+        setTimeout(async () => {
+          this.pendingSizeBatch = null;
+          try {
+            const response = await fetch("/wanvideo/lora/sizes", {
+              method: "POST",
+              headers: { "Content-Type": "application/json" },
+              body: JSON.stringify({ names: Array.from(batch.names) })
+            });
+            resolve(response.ok ? (await response.json()).files || {} : {});
+          } catch (err) {
+            console.warn("[Wakawave] Failed to fetch LoRA file sizes:", err);
+            resolve({});
+          }
+        }, _SuperLoraNode.SIZE_BATCH_DELAY_MS);
+      });
+    }
+    return batch.promise;
+  }
   /**
    * (THE BRIDGE) Syncs data from custom lora widgets to invisible execution widgets.
    */
@@ -4578,6 +4665,7 @@ const _SuperLoraNode = class _SuperLoraNode {
 };
 _SuperLoraNode.NODE_WIDGET_TOP_OFFSET = 68;
 _SuperLoraNode.MARGIN_SMALL = 2;
+_SuperLoraNode.SIZE_BATCH_DELAY_MS = 50;
 _SuperLoraNode.loraService = LoraService.getInstance();
 _SuperLoraNode.templateService = TemplateService.getInstance();
 _SuperLoraNode.initialized = false;
@@ -6227,6 +6315,18 @@ const superLoraExtension = {
       }
     }
   ],
+  /**
+   * Listen for LoRA index changes pushed by the server
+   */
+  setup() {
+    api.addEventListener("wakawave.lora_index", (event) => {
+      try {
+        SuperLoraNode.applyIndexChanges(event.detail);
+      } catch (err) {
+        console.warn("[Wakawave] Failed to apply LoRA index changes:", err);
+      }
+    });
+  },
   /**
    * Called before a node type is registered
    */
@@ -11,8 +11,13 @@ link.rel = "stylesheet";
 link.href = new URL("./prompt_preset_modal.css", import.meta.url).href;
 document.head.appendChild(link);
 
-// Load/save presets
-function loadPresets() {
+// Presets live in the server-side store (one file per preset); localStorage is only a fallback
+const PRESETS_API = "/wanvideo/presets/prompt";
+
+// Whether the last load reached the server; when false the modal works on the localStorage presets
+let presetsOnServer = false;
+
+function loadLocalPresets() {
     try {
         const stored = localStorage.getItem(PRESETS_KEY);
         return stored ? JSON.parse(stored) : {};
@@ -22,7 +27,7 @@ function loadPresets() {
     }
 }
 
-function savePresets(presets) {
+function saveLocalPresets(presets) {
     try {
         localStorage.setItem(PRESETS_KEY, JSON.stringify(presets));
     } catch (e) {
@@ -30,9 +35,132 @@ function savePresets(presets) {
     }
 }
 
+function presetUrl(name) {
+    return `${PRESETS_API}/preset?name=${encodeURIComponent(name)}`;
+}
+
+// One-time move of presets saved by older versions from localStorage to the server
+async function migrateLocalPresets() {
+    const local = loadLocalPresets();
+    const names = Object.keys(local);
+    if (names.length === 0) return;
+    const body = names.map(name => JSON.stringify({ name, preset: local[name] })).join("\n");
+    const response = await fetch(`${PRESETS_API}/import?overwrite=0`, {
+        method: "POST",
+        headers: { "Content-Type": "application/x-ndjson" },
+        body
+    });
+    if (!response.ok) throw new Error(`HTTP ${response.status}`);
+    localStorage.removeItem(PRESETS_KEY);
+    console.log(`WanVideo Wakawave: Moved ${names.length} prompt preset(s) to the server`);
+}
+
+// Preset list for the modal: server summaries (no bodies; fetched per preset by getPreset),
+// or the full presets from localStorage when the server is unreachable
+async function loadPresets() {
+    try {
+        const response = await fetch(PRESETS_API);
+        if (!response.ok) throw new Error(`HTTP ${response.status}`);
+        const { presets: summaries } = await response.json();
+        presetsOnServer = true;
+        const toIso = (seconds) => seconds ? new Date(seconds * 1000).toISOString() : undefined;
+        return Object.fromEntries(summaries.map(summary => [summary.name, {
+            ...summary,
+            created: toIso(summary.created),
+            modified: toIso(summary.modified)
+        }]));
+    } catch (e) {
+        console.error("Failed to load presets from server, using browser storage:", e);
+        presetsOnServer = false;
+        return loadLocalPresets();
+    }
+}
+
+// Full body of one preset; entry is its list entry from loadPresets
+async function getPreset(name, entry) {
+    if (!presetsOnServer) return entry;
+    const response = await fetch(presetUrl(name));
+    if (response.status === 404) return null;
+    if (!response.ok) throw new Error(`HTTP ${response.status}`);
+    return (await response.json()).preset;
+}
+
+// Write the presets the modal changed (name -> preset) and delete the removed names (one PUT or DELETE each)
+async function savePresetChanges(changed = {}, removed = []) {
+    if (!presetsOnServer) {
+        const presets = loadLocalPresets();
+        Object.assign(presets, changed);
+        removed.forEach(name => delete presets[name]);
+        saveLocalPresets(presets);
+        return;
+    }
+    const requests = [
+        ...Object.entries(changed).map(([name, preset]) => fetch(presetUrl(name), {
+            method: "PUT",
+            headers: { "Content-Type": "application/json" },
+            body: JSON.stringify(preset)
+        })),
+        ...removed.map(name => fetch(presetUrl(name), { method: "DELETE" }))
+    ];
+    try {
+        const failed = (await Promise.all(requests)).filter(r => !r.ok && r.status !== 404);
+        if (failed.length) throw new Error(`${failed.length} preset(s) failed to save (HTTP ${failed[0].status})`);
+    } catch (e) {
+        console.error("Failed to save presets:", e);
+    }
+}
+
+// Create or update a single preset without downloading the rest. Returns true if it already existed.
+async function updatePreset(name, update) {
+    const url = presetUrl(name);
+    try {
+        const response = await fetch(url);
+        if (!response.ok && response.status !== 404) throw new Error(`HTTP ${response.status}`);
+        const existing = response.ok ? (await response.json()).preset : undefined;
+        const saved = await fetch(url, {
+            method: "PUT",
+            headers: { "Content-Type": "application/json" },
+            body: JSON.stringify(update(existing))
+        });
+        if (!saved.ok) throw new Error(`HTTP ${saved.status}`);
+        return !!existing;
+    } catch (e) {
+        console.error("Failed to save preset to server, using browser storage:", e);
+        const presets = loadLocalPresets();
+        const existed = !!presets[name];
+        presets[name] = update(presets[name]);
+        saveLocalPresets(presets);
+        return existed;
+    }
+}
+
+// Server-side preset access used by the preset modal: per-preset bodies and bulk import/export
+const presetTransfer = {
+    exportUrl: `${PRESETS_API}/export`,
+    getPreset,
+    async importFile(file, overwrite) {
+        const response = await fetch(`${PRESETS_API}/import?overwrite=${overwrite ? 1 : 0}`, {
+            method: "POST",
+            headers: { "Content-Type": "application/x-ndjson" },
+            body: file
+        });
+        if (!response.ok) throw new Error(`HTTP ${response.status}`);
+        const result = await response.json();
+        return { result, presets: await loadPresets() };
+    }
+};
+
 app.registerExtension({
     name: "WanVideo.WakawavePromptBuilder",
 
+    async setup() {
+        try {
+            await migrateLocalPresets();
+        } catch (e) {
+            console.error("Failed to move prompt presets to the server:", e);
+        }
+    },
+
     async beforeRegisterNodeDef(nodeType, nodeData, app) {
         if (nodeData.name !== PROMPT_NODE_TYPE) return;
 
@@ -96,36 +224,30 @@ app.registerExtension({
             addBtn.serialize = false;
 
             // Save Preset button
-            const saveBtn = this.addWidget("button", "💾 Save", null, () => {
+            const saveBtn = this.addWidget("button", "💾 Save", null, async () => {
                 const name = prompt("Enter preset name:");
                 if (!name) return;
 
-                const presets = loadPresets();
                 const now = new Date().toISOString();
 
-                // Check if updating existing preset
-                const isUpdate = !!presets[name];
-
-                // Store with enhanced metadata
-                presets[name] = {
+                // Store with enhanced metadata (only this preset is fetched and written)
+                const isUpdate = await updatePreset(name, (existing) => ({
                     positive: node.positiveWidget.value,
                     negative: node.negativeWidget.value,
-                    created: isUpdate ? (presets[name].created || now) : now,
+                    created: existing?.created || now,
                     modified: now,
-                    usageCount: isUpdate ? (presets[name].usageCount || 0) : 0,
-                    description: presets[name]?.description || "",
-                    tags: presets[name]?.tags || [],
-                    favorite: presets[name]?.favorite || false
-                };
-
-                savePresets(presets);
+                    usageCount: existing?.usageCount || 0,
+                    description: existing?.description || "",
+                    tags: existing?.tags || [],
+                    favorite: existing?.favorite || false
+                }));
                 alert(`Preset "${name}" ${isUpdate ? 'updated' : 'saved'}!`);
             });
             saveBtn.serialize = false;
 
             // Load Preset button - Use visual modal
-            const loadBtn = this.addWidget("button", "📂 Load", null, () => {
-                const presets = loadPresets();
+            const loadBtn = this.addWidget("button", "📂 Load", null, async () => {
+                const presets = await loadPresets();
 
                 if (Object.keys(presets).length === 0) {
                     alert("No presets saved yet!");
@@ -178,18 +300,15 @@ app.registerExtension({
 
                     node.updateBundles();
 
-                    // Save updated presets (with updated usage count)
-                    savePresets(presets);
-                }, () => {
-                    // Save callback for modal operations (rename, duplicate, delete)
-                    savePresets(presets);
-                });
+                    // Save the updated usage count (only this preset is written)
+                    if (typeof preset === 'object') savePresetChanges({ [name]: preset });
+                }, savePresetChanges, presetTransfer);
             });
             loadBtn.serialize = false;
 
             // Manage Preset button - Opens modal for preset management
-            const deleteBtn = this.addWidget("button", "🗑 Manage", null, () => {
-                const presets = loadPresets();
+            const deleteBtn = this.addWidget("button", "🗑 Manage", null, async () => {
+                const presets = await loadPresets();
 
                 if (Object.keys(presets).length === 0) {
                     alert("No presets to manage!");
@@ -233,11 +352,8 @@ app.registerExtension({
                     }
 
                     node.updateBundles();
-                    savePresets(presets);
-                }, () => {
-                    // Save callback for modal operations (rename, duplicate, delete)
-                    savePresets(presets);
-                });
+                    if (typeof preset === 'object') savePresetChanges({ [name]: preset });
+                }, savePresetChanges, presetTransfer);
             });
             deleteBtn.serialize = false;
 
@@ -8,7 +8,9 @@ export class PresetModal {
         this.modal = null;
         this.selectedPreset = null;
         this.presets = {};
+        this.bodies = new Map();
         this.onLoadCallback = null;
+        this.transfer = null;
         this.searchTerm = "";
         this.keydownHandler = null;
         this.dropdownClickHandler = null;
@@ -16,11 +18,20 @@ export class PresetModal {
 
     /**
      * Show the preset browser modal
+     *
+     * presets maps names to full presets or to list summaries; onSave(changed, removed)
+     * receives only the presets an action changed (name -> preset) and the names it removed.
+     *
+     * transfer (optional): { exportUrl, importFile(file, overwrite), getPreset(name, entry) } for
+     * server-side NDJSON import/export and fetching a preset body the first time it is needed;
+     * without it, import/export use JSON files in the browser and presets are full bodies.
      */
-    show(presets, onLoad, onSave) {
+    show(presets, onLoad, onSave, transfer = null) {
         this.presets = presets;
+        this.bodies = new Map();
         this.onLoadCallback = onLoad;
         this.onSaveCallback = onSave;
+        this.transfer = transfer;
         this.selectedPreset = null;
         this.searchTerm = "";
 
@@ -284,7 +295,7 @@ export class PresetModal {
         if (!preset) {
             return '<em>Empty</em>';
         }
-        const positive = typeof preset === 'string' ? preset : (preset.positive || '');
+        const positive = typeof preset === 'string' ? preset : (preset.preview ?? preset.positive ?? '');
         const preview = positive.substring(0, 60);
         return preview ? this.escapeHtml(preview) + (positive.length > 60 ? '...' : '') : '<em>Empty</em>';
     }
@@ -308,10 +319,34 @@ export class PresetModal {
         }
     }
 
+    /**
+     * Full preset body for name, fetched through transfer.getPreset the first time
+     * it is previewed or applied (the list may only hold summaries); null if missing
+     */
+    async resolvePreset(name) {
+        if (this.bodies.has(name)) {
+            return this.bodies.get(name);
+        }
+        let preset = this.presets[name];
+        if (this.transfer && this.transfer.getPreset) {
+            try {
+                preset = await this.transfer.getPreset(name, preset);
+            } catch (e) {
+                console.error(`Failed to load preset "${name}":`, e);
+                return null;
+            }
+        }
+        if (!preset) {
+            return null;
+        }
+        this.bodies.set(name, preset);
+        return preset;
+    }
+
     /**
      * Update the preview panel
      */
-    updatePreview() {
+    async updatePreview() {
         const previewContainer = this.modal.querySelector('.preset-preview');
 
         if (!this.selectedPreset) {
@@ -323,7 +358,18 @@ export class PresetModal {
             return;
         }
 
-        const preset = this.presets[this.selectedPreset];
+        const name = this.selectedPreset;
+        if (!this.bodies.has(name) && this.transfer && this.transfer.getPreset) {
+            previewContainer.innerHTML = `
+                <div class="preview-empty">
+                    Loading...
+                </div>
+            `;
+        }
+        const preset = await this.resolvePreset(name);
+        if (!this.modal || this.selectedPreset !== name) {
+            return; // Closed or another preset was selected while this one was loading
+        }
         if (!preset) {
             previewContainer.innerHTML = `
                 <div class="preview-empty">
@@ -409,10 +455,15 @@ export class PresetModal {
      * Load the selected preset
      * @param {string} mode - 'both', 'positive', 'negative', 'append-positive', 'append-negative'
      */
-    loadPreset(mode = 'both') {
+    async loadPreset(mode = 'both') {
         if (!this.selectedPreset) return;
 
-        const preset = this.presets[this.selectedPreset];
+        const name = this.selectedPreset;
+        const preset = await this.resolvePreset(name);
+        if (!preset) {
+            alert(`Failed to load preset "${name}"!`);
+            return;
+        }
 
         // Update usage count
         if (typeof preset === 'object') {
@@ -421,7 +472,7 @@ export class PresetModal {
         }
 
         if (this.onLoadCallback) {
-            this.onLoadCallback(this.selectedPreset, preset, mode);
+            this.onLoadCallback(name, preset, mode);
         }
 
         this.close();
@@ -430,27 +481,36 @@ export class PresetModal {
     /**
      * Rename the selected preset
      */
-    renamePreset() {
+    async renamePreset() {
         if (!this.selectedPreset) return;
 
-        const newName = prompt('Enter new name:', this.selectedPreset);
-        if (!newName || newName === this.selectedPreset) return;
+        const oldName = this.selectedPreset;
+        const newName = prompt('Enter new name:', oldName);
+        if (!newName || newName === oldName) return;
 
         if (this.presets[newName]) {
             alert('A preset with that name already exists!');
             return;
         }
 
+        const preset = await this.resolvePreset(oldName);
+        if (!preset) {
+            alert(`Failed to load preset "${oldName}"!`);
+            return;
+        }
+
         // Rename
-        this.presets[newName] = this.presets[this.selectedPreset];
-        if (typeof this.presets[newName] === 'object') {
-            this.presets[newName].modified = new Date().toISOString();
+        if (typeof preset === 'object') {
+            preset.modified = new Date().toISOString();
         }
-        delete this.presets[this.selectedPreset];
+        this.presets[newName] = preset;
+        this.bodies.set(newName, preset);
+        delete this.presets[oldName];
+        this.bodies.delete(oldName);
 
-        // Save changes to localStorage
+        // Save changes
         if (this.onSaveCallback) {
-            this.onSaveCallback();
+            this.onSaveCallback({ [newName]: preset }, [oldName]);
         }
 
         this.selectedPreset = newName;
@@ -461,9 +521,15 @@ export class PresetModal {
     /**
      * Duplicate the selected preset
      */
-    duplicatePreset() {
+    async duplicatePreset() {
         if (!this.selectedPreset) return;
 
+        const original = await this.resolvePreset(this.selectedPreset);
+        if (!original) {
+            alert(`Failed to load preset "${this.selectedPreset}"!`);
+            return;
+        }
+
         let newName = this.selectedPreset + ' (Copy)';
         let counter = 1;
 
@@ -473,8 +539,7 @@ export class PresetModal {
         }
 
         // Deep copy
-        const original = this.presets[this.selectedPreset];
-        this.presets[newName] = typeof original === 'string'
+        const copy = typeof original === 'string'
             ? original
             : {
                 ...original,
@@ -482,10 +547,12 @@ export class PresetModal {
                 modified: new Date().toISOString(),
                 usageCount: 0
             };
+        this.presets[newName] = copy;
+        this.bodies.set(newName, copy);
 
-        // Save changes to localStorage
+        // Save changes
         if (this.onSaveCallback) {
-            this.onSaveCallback();
+            this.onSaveCallback({ [newName]: copy });
         }
 
         this.renderPresetList();
@@ -502,12 +569,14 @@ export class PresetModal {
             return;
         }
 
-        delete this.presets[this.selectedPreset];
+        const name = this.selectedPreset;
+        delete this.presets[name];
+        this.bodies.delete(name);
         this.selectedPreset = null;
 
-        // Save changes to localStorage
+        // Save changes
         if (this.onSaveCallback) {
-            this.onSaveCallback();
+            this.onSaveCallback({}, [name]);
         }
 
         this.renderPresetList();
@@ -516,17 +585,22 @@ export class PresetModal {
     }
 
     /**
-     * Import presets from a JSON file
+     * Import presets from a JSON file, or an NDJSON export (streamed to the server)
      */
     importPresets() {
         const input = document.createElement('input');
         input.type = 'file';
-        input.accept = '.json';
+        input.accept = this.transfer ? '.json,.ndjson,.jsonl' : '.json';
 
         input.onchange = (e) => {
             const file = e.target.files[0];
             if (!file) return;
 
+            if (this.transfer && /\.(ndjson|jsonl)$/i.test(file.name)) {
+                this.importNdjson(file);
+                return;
+            }
+
             // Validate file size (max 10MB)
             if (file.size > 10 * 1024 * 1024) {
                 alert('File is too large (max 10MB)!');
@@ -582,6 +656,8 @@ export class PresetModal {
                         'Click Cancel to REPLACE all presets.'
                     );
 
+                    let changed = validatedImport;
+                    let removed = [];
                     if (mode) {
                         // Merge - ask about conflicts
                         const conflicts = Object.keys(validatedImport).filter(name => this.presets[name]);
@@ -592,27 +668,27 @@ export class PresetModal {
                                 'Click Cancel to skip them.'
                             );
 
-                            if (overwrite) {
-                                Object.assign(this.presets, validatedImport);
-                            } else {
+                            if (!overwrite) {
                                 // Only add new ones
-                                Object.keys(validatedImport).forEach(name => {
-                                    if (!this.presets[name]) {
-                                        this.presets[name] = validatedImport[name];
-                                    }
-                                });
+                                changed = Object.fromEntries(
+                                    Object.entries(validatedImport).filter(([name]) => !this.presets[name])
+                                );
                             }
-                        } else {
-                            Object.assign(this.presets, validatedImport);
                         }
                     } else {
                         // Replace all
-                        this.presets = validatedImport;
+                        removed = Object.keys(this.presets).filter(name => !(name in validatedImport));
+                        removed.forEach(name => {
+                            delete this.presets[name];
+                            this.bodies.delete(name);
+                        });
                     }
+                    Object.assign(this.presets, changed);
+                    Object.entries(changed).forEach(([name, preset]) => this.bodies.set(name, preset));
 
-                    // Save changes to localStorage
+                    // Save changes
                     if (this.onSaveCallback) {
-                        this.onSaveCallback();
+                        this.onSaveCallback(changed, removed);
                     }
 
                     this.renderPresetList();
@@ -635,7 +711,31 @@ export class PresetModal {
     }
 
     /**
-     * Export all presets to a JSON file
+     * Upload an NDJSON export as-is; the server imports it line by line
+     */
+    async importNdjson(file) {
+        const overwrite = confirm(
+            'Overwrite presets that already exist?\n\n' +
+            'Click OK to overwrite them.\n' +
+            'Click Cancel to skip them.'
+        );
+        try {
+            const { result, presets } = await this.transfer.importFile(file, overwrite);
+            this.presets = presets;
+            this.bodies.clear();
+            this.renderPresetList();
+            this.updatePreview();
+            const errorCount = result.errors ? result.errors.length : 0;
+            alert(`Successfully imported ${result.imported} preset(s)` +
+                `${result.skipped > 0 ? ` (skipped ${result.skipped} existing)` : ''}` +
+                `${errorCount > 0 ? `, ${errorCount} invalid line(s)` : ''}!`);
+        } catch (error) {
+            alert('Failed to import presets: ' + error.message);
+        }
+    }
+
+    /**
+     * Export all presets to a JSON file (NDJSON streamed from the server when available)
      */
     exportAllPresets() {
         if (Object.keys(this.presets).length === 0) {
@@ -643,6 +743,17 @@ export class PresetModal {
             return;
         }
 
+        if (this.transfer) {
+            // The browser saves the response straight to disk; nothing is built in memory here
+            const a = document.createElement('a');
+            a.href = this.transfer.exportUrl;
+            a.download = `wakawave_prompts_${new Date().toISOString().split('T')[0]}.ndjson`;
+            document.body.appendChild(a);
+            a.click();
+            document.body.removeChild(a);
+            return;
+        }
+
         // Prompt for custom filename
         const defaultName = `wakawave_prompts_${new Date().toISOString().split('T')[0]}`;
         const customName = prompt('Enter filename for export (without .json extension):', defaultName);
@@ -658,12 +769,17 @@ export class PresetModal {
     /**
      * Export the selected preset to a JSON file
      */
-    exportSelectedPreset() {
+    async exportSelectedPreset() {
         if (!this.selectedPreset) return;
 
-        const preset = this.presets[this.selectedPreset];
-        const data = { [this.selectedPreset]: preset };
-        const filename = `wakawave_prompt_${this.selectedPreset.replace(/[^a-zA-Z0-9]/g, '_')}.json`;
+        const name = this.selectedPreset;
+        const preset = await this.resolvePreset(name);
+        if (!preset) {
+            alert(`Failed to load preset "${name}"!`);
+            return;
+        }
+        const data = { [name]: preset };
+        const filename = `wakawave_prompt_${name.replace(/[^a-zA-Z0-9]/g, '_')}.json`;
 
         this.downloadJSON(data, filename);
     }